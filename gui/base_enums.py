@@ -0,0 +1,58 @@
+from enum import Enum
+
+# Enums that don't depend on Qt, shared by the display and the
+# command-line tools. enums.py re-exports them and adds the brushes
+# used to paint the Statuses.
+
+
+class FaultPV(str, Enum):
+    """Enum of the PV suffixes monitored for every fault."""
+    STATE = ""
+    BYP = "_SCBYPS"
+    BYP_EXP = "_SCBYP_END"
+    IGN = "_IGNORED"
+    ACT = "_ACTIVE"
+
+    def pv(self, fault_name: str) -> str:
+        return f"{fault_name}{self.value}"
+
+
+class ColKind(Enum):
+    """Enum of the kinds of columns in the LogicTableModel."""
+    DESC = 0
+    STATE = 1
+    DEST = 2
+    COND = 3
+    BYP = 4
+    BYP_EXP = 5
+    IGN = 6
+    ACT = 7
+    BYP_REM = 8
+    # Only in the fault history: a fault's first state after its PVs
+    # reconnected
+    CONN = 9
+
+
+class Statuses(Enum):
+    RED = (3, (255, 0, 0))          # Red:          Major Alarm
+    YEL = (2, (235, 235, 0))        # Yellow:       Minor Alarm
+    MAG = (1, (235, 0, 235))        # Magenta:      Error
+    GRN = (0, (0, 235, 0))          # Green:        No Alarm
+    WHT = (-1, (255, 255, 255))     # White:        Disconnected
+    BGD = (-2, (0, 0, 0, 165))      # Background:   Table Background
+
+    def num(self) -> int:
+        return self.value[0]
+
+    def rgb(self) -> tuple:
+        return self.value[1]
+
+    def faulted(self) -> bool:
+        return self.num() > 0
+
+    def error(self) -> bool:
+        return abs(self.num()) == 1
+
+    @classmethod
+    def max(cls) -> int:
+        return cls.RED.num()
@@ -0,0 +1,94 @@
+"""Measure the time until the Summary is stable after the PVs connect.
+
+Usage (from the gui/ directory):
+    python bench/initial_load.py [--dbfile DB_FILE] [--chunk N] [--seed N]
+
+Opens the full display on the given (or default) database twice and
+plays the first connection wave against it: a first state, bypass,
+bypass expiration, ignore and active value for every fault, in random
+order, N values per pass of the event loop. The first display takes the
+wave in its initial load phase (one reset and one sort per proxy once
+the faults have reported), the second with the phase already over, so
+every value updates the proxies. Prints the database and settings, then
+the time from the first value until the Summary table is stable for both,
+so a quoted result can be reproduced with the same arguments.
+"""
+import sys
+from os import path
+from time import perf_counter
+from random import Random
+from argparse import ArgumentParser
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from qtpy.QtWidgets import QApplication
+
+
+def connection_wave(display, seed: int = 0) -> list:
+    """Return the first values of every fault's PVs in arrival order,
+    as (signal, value, row)."""
+    rnd = Random(seed)
+    tbl = display.tbl_model
+    values = []
+    for row, flt in enumerate(display.model.faults):
+        states = [0] + [s.id for s in flt.fault.states]
+        values += [(tbl.state_signal, rnd.choice(states), row),
+                   (tbl.byp_signal, int(rnd.random() < .1), row),
+                   (tbl.byp_exp_signal, str(1.7e9 + rnd.randrange(10**6)), row),
+                   (tbl.ign_signal, int(rnd.random() < .1), row),
+                   (tbl.act_signal, int(rnd.random() < .95), row)]
+    rnd.shuffle(values)
+    return values
+
+
+def time_to_stable(display, values: list, chunk: int) -> float:
+    """Play the values and return the seconds until the Summary table
+    shows every value."""
+    start = perf_counter()
+    for i in range(0, len(values), chunk):
+        for signal, value, row in values[i:i + chunk]:
+            signal.emit(value, row)
+        QApplication.processEvents()
+    display.initial_load.check()
+    display.summ_model.rowCount()
+    QApplication.processEvents()
+    return perf_counter() - start
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--dbfile", default=None)
+    parser.add_argument("--chunk", type=int, default=50,
+                        help="values per pass of the event loop (default: 50)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    from mps_gui_main import MpsGuiDisplay
+
+    macros = {"P": "SIOC:SYS0:MP03", "T": "TPG:SYS0:1:DST0", "CUD": "False"}
+    if args.dbfile:
+        macros["DB_FILE"] = args.dbfile
+
+    results = {}
+    for mode in ("initial load", "incremental"):
+        display = MpsGuiDisplay(macros=macros)
+        display.show()
+        QApplication.processEvents()
+        if mode == "incremental":
+            display.initial_load.finish()
+        values = connection_wave(display, args.seed)
+        if mode == "initial load":
+            print(f"Database: {display.model.filename}, {len(display.model.faults)} faults, "
+                  f"chunk {args.chunk}, seed {args.seed}")
+        results[mode] = time_to_stable(display, values, args.chunk)
+        rows = display.summ_model.rowCount()
+        print(f"{mode:>12}: {results[mode]:.3f} s for {len(values)} values, "
+              f"{rows} faults in the Summary")
+        display.close()
+
+    print(f"Speedup: {results['incremental'] / results['initial load']:.1f}x")
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
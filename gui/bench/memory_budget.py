@@ -0,0 +1,114 @@
+"""Check that a full-scale session stays within a resident memory budget.
+
+Usage (from the gui/ directory):
+    python bench/memory_budget.py [--dbfile DB_FILE] [--budget MB]
+                                  [--updates N] [--selections N] [--report]
+
+Opens the full display on the given (or default) database, then plays a
+synthetic session against it: random state, bypass, ignore and active
+updates for every fault, an IOC-wide timeout wave, selections in the
+Logic table (each opens a new state PV), and scrolling the App Status
+table (whose delegate creates index widgets). Prints the resident memory
+after startup and after the session, and exits with status 1 if the
+final resident memory is over the budget.
+
+--report enables the display's memory profile (tracemalloc adds its own
+overhead to the resident memory) and prints it before and after the
+session.
+"""
+import sys
+from os import path
+from time import perf_counter
+from random import Random
+from argparse import ArgumentParser
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from qtpy.QtWidgets import QApplication
+from memory_profile import rss_mb
+
+
+def run_session(display, updates: int, selections: int, seed: int = 0):
+    """Play synthetic PV traffic and user interaction against the display."""
+    rnd = Random(seed)
+    tbl = display.tbl_model
+    states = [[0] + [s.id for s in flt.fault.states] for flt in display.model.faults]
+    rows = len(states)
+
+    for i in range(updates):
+        row = rnd.randrange(rows)
+        tbl.state_signal.emit(rnd.choice(states[row]), row)
+        if i % 10 == 0:
+            tbl.byp_signal.emit(rnd.random() < .1, row)
+            tbl.byp_exp_signal.emit(str(1.7e9 + rnd.randrange(10**6)), row)
+            tbl.ign_signal.emit(rnd.random() < .1, row)
+            tbl.act_signal.emit(rnd.random() < .95, row)
+        if i % 1000 == 0:
+            QApplication.processEvents()
+
+    # Every fault of a tenth of the rows times out at once, then recovers
+    wave = sorted(rnd.sample(range(rows), rows // 10))
+    tbl.set_states(wave, -1)
+    QApplication.processEvents()
+    tbl.set_states(wave, 0)
+    QApplication.processEvents()
+
+    logic_tbl = display.ui.logic_tbl
+    for _ in range(selections):
+        logic_tbl.selectRow(rnd.randrange(max(display.logic_model.rowCount(), 1)))
+        QApplication.processEvents()
+
+    app_tbl = display.ui.app_status_tbl
+    display.ui.main_tabs.setCurrentWidget(display.ui.app_status_tab)
+    bar = app_tbl.verticalScrollBar()
+    for value in range(0, bar.maximum() + 1, max(bar.pageStep(), 1)):
+        bar.setValue(value)
+        app_tbl.viewport().grab()
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--dbfile", default=None)
+    parser.add_argument("--budget", type=float, default=1024,
+                        help="resident memory budget in MB (default: 1024)")
+    parser.add_argument("--updates", type=int, default=200000)
+    parser.add_argument("--selections", type=int, default=500)
+    parser.add_argument("--report", action="store_true",
+                        help="print the display's memory profile")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    from mps_gui_main import MpsGuiDisplay
+
+    macros = {"P": "SIOC:SYS0:MP03", "T": "TPG:SYS0:1:DST0", "CUD": "False"}
+    if args.dbfile:
+        macros["DB_FILE"] = args.dbfile
+    if args.report:
+        macros["PROFILE_MEMORY"] = "0"
+
+    start = perf_counter()
+    display = MpsGuiDisplay(macros=macros)
+    display.show()
+    # The session's values update the tables as they would after startup
+    display.initial_load.finish()
+    QApplication.processEvents()
+    startup_rss = rss_mb()
+    print(f"{len(display.model.faults)} faults, startup took "
+          f"{perf_counter() - start:.1f} s, resident memory {startup_rss:.1f} MB")
+
+    start = perf_counter()
+    run_session(display, args.updates, args.selections)
+    final_rss = rss_mb()
+    print(f"Session took {perf_counter() - start:.1f} s, resident memory "
+          f"{final_rss:.1f} MB ({final_rss - startup_rss:+.1f} MB)")
+    if args.report:
+        display.print_memory_report()
+
+    ok = final_rss <= args.budget
+    print(f"{'PASS' if ok else 'FAIL'}: {final_rss:.1f} MB of {args.budget:.0f} MB budget")
+    display.close()
+    app.quit()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
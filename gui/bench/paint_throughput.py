@@ -0,0 +1,94 @@
+"""Measure how fast a large status table repaints.
+
+Usage (from the gui/ directory):
+    python bench/paint_throughput.py [--rows N] [--cols N] [--frames N]
+
+Paints a QTableView backed by a synthetic model that serves brushes the
+same way LogicTableModel does, once with the cached Statuses palette and
+once allocating a new QBrush per call, and prints the throughput of both.
+"""
+import sys
+from os import path
+from time import perf_counter
+from random import Random
+from argparse import ArgumentParser
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from qtpy.QtCore import (Qt, QModelIndex, QAbstractTableModel)
+from qtpy.QtGui import (QBrush, QColor)
+from qtpy.QtWidgets import (QApplication, QTableView)
+from enums import Statuses
+
+
+class BenchTableModel(QAbstractTableModel):
+    """Synthetic table with a random status per row."""
+    def __init__(self, rows: int, cols: int, cached: bool):
+        super(BenchTableModel, self).__init__()
+        rnd = Random(0)
+        self.cols = cols
+        self.cached = cached
+        self.status = [rnd.choice(list(Statuses)[:-1]) for _ in range(rows)]
+        self.brush_calls = 0
+
+    def rowCount(self, index: QModelIndex = QModelIndex()):
+        return len(self.status)
+
+    def columnCount(self, index: QModelIndex = QModelIndex()):
+        return self.cols
+
+    def brush(self, status: Statuses) -> QBrush:
+        self.brush_calls += 1
+        if self.cached:
+            return status.brush()
+        return QBrush(QColor(*status.rgb()))
+
+    def data(self, index: QModelIndex, role: Qt.ItemDataRole):
+        if role == Qt.DisplayRole:
+            return self.status[index.row()].name
+        elif role == Qt.BackgroundRole:
+            return self.brush(Statuses.BGD)
+        elif role == Qt.ForegroundRole:
+            return self.brush(self.status[index.row()])
+
+
+def run(rows: int, cols: int, frames: int, cached: bool) -> dict:
+    """Repaint the whole viewport `frames` times while scrolling."""
+    model = BenchTableModel(rows, cols, cached)
+    view = QTableView()
+    view.setModel(model)
+    view.resize(1600, 1000)
+    view.show()
+    QApplication.processEvents()
+
+    bar = view.verticalScrollBar()
+    start = perf_counter()
+    for i in range(frames):
+        bar.setValue((i * 37) % max(bar.maximum(), 1))
+        view.viewport().grab()
+    elapsed = perf_counter() - start
+    view.close()
+
+    return {"fps": frames / elapsed,
+            "brushes_per_s": model.brush_calls / elapsed}
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--cols", type=int, default=16)
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    Statuses.set_palette()
+
+    for cached in (False, True):
+        res = run(args.rows, args.cols, args.frames, cached)
+        label = "cached palette" if cached else "new QBrush per call"
+        print(f"{label:>20}: {res['fps']:8.1f} frames/s, "
+              f"{res['brushes_per_s']:12.0f} brushes/s")
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from enum import Enum
 from qtpy.QtGui import (QBrush, QColor)
+from base_enums import (FaultPV, ColKind, Statuses)
 
 
 class DevThr(str, Enum):
@@ -17,29 +18,34 @@ class ConfFiles(str, Enum):
     ERR = "resources/conf_err_embed.ui"
 
 
-class Statuses(Enum):
-    RED = (3, (255, 0, 0))          # Red:          Major Alarm
-    YEL = (2, (235, 235, 0))        # Yellow:       Minor Alarm
-    MAG = (1, (235, 0, 235))        # Magenta:      Error
-    GRN = (0, (0, 235, 0))          # Green:        No Alarm
-    WHT = (-1, (255, 255, 255))     # White:        Disconnected
-    BGD = (-2, (0, 0, 0, 165))      # Background:   Table Background
+# Cached brushes indexed by Statuses.num() - Statuses.BGD.num()
+_BRUSHES = []
 
-    def num(self) -> int:
-        return self.value[0]
+# High-contrast colors used by the CUD; statuses not listed keep their color
+CUD_RGB = {"YEL": (255, 255, 0),
+           "MAG": (255, 0, 255),
+           "GRN": (0, 255, 0),
+           "BGD": (0, 0, 0, 255)}
 
-    def rgb(self) -> tuple:
-        return self.value[1]
 
-    def brush(self) -> QBrush:
-        return QBrush(QColor(*self.rgb()))
+def _brush(self: Statuses) -> QBrush:
+    """Return the cached brush for this status. The brush is shared,
+    so callers must not modify it."""
+    if not _BRUSHES:
+        Statuses.set_palette()
+    return _BRUSHES[self.num() - Statuses.BGD.num()]
 
-    def faulted(self) -> bool:
-        return self.num() > 0
 
-    def error(self) -> bool:
-        return abs(self.num()) == 1
+def _set_palette(cls, high_contrast: bool = False):
+    """Build the cached brushes used by the tables. The high-contrast
+    palette is used by the CUD."""
+    brushes = [None] * len(cls)
+    for s in cls:
+        rgb = CUD_RGB.get(s.name, s.rgb()) if high_contrast else s.rgb()
+        brushes[s.num() - cls.BGD.num()] = QBrush(QColor(*rgb))
+    _BRUSHES[:] = brushes
 
-    @classmethod
-    def max(cls) -> int:
-        return cls.RED.num()
+
+# The brushes need Qt, so they are only added to Statuses here
+Statuses.brush = _brush
+Statuses.set_palette = classmethod(_set_palette)
@@ -0,0 +1,178 @@
+import gc
+import tracemalloc
+from os import (path, sysconf)
+from sys import getsizeof
+from functools import lru_cache
+from collections import Counter
+from resource import (getrusage, RUSAGE_SELF)
+from qtpy.QtWidgets import QApplication
+
+GUI_DIR = path.dirname(path.abspath(__file__))
+
+
+def rss_mb() -> float:
+    """Return the resident memory of the process in MB. Falls back to the
+    peak resident memory where /proc isn't available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        return getrusage(RUSAGE_SELF).ru_maxrss / 1024
+
+
+@lru_cache(maxsize=None)
+def subsystem(filename: str) -> str:
+    """Return the subsystem a source file belongs to: the module path for
+    files of this display (e.g. mixins.logic), otherwise the top-level
+    package (e.g. epics, sqlalchemy). Pseudo-files like <string> are
+    returned as is."""
+    if filename.startswith("<"):
+        return filename
+    filename = path.abspath(filename)
+    if filename.startswith(GUI_DIR + path.sep):
+        return path.splitext(path.relpath(filename, GUI_DIR))[0].replace(path.sep, '.')
+
+    parts = filename.split(path.sep)
+    for pkg_dir in ("site-packages", "dist-packages"):
+        if pkg_dir in parts:
+            i = parts.index(pkg_dir) + 1
+            if i < len(parts):
+                return path.splitext(parts[i])[0]
+    return "<python>"
+
+
+def row_list_bytes(tbl_model) -> dict:
+    """Return the approximate size in bytes of each per-fault list of a
+    LogicTableModel, including nested row lists but not shared values."""
+    sizes = {}
+    for name in tbl_model.row_lists:
+        lst = getattr(tbl_model, name, None)
+        if lst is None:
+            continue
+        size = getsizeof(lst)
+        for item in lst:
+            if isinstance(item, list):
+                size += getsizeof(item) + sum(getsizeof(i) for i in item)
+            elif not isinstance(item, (bool, type(None))):
+                size += getsizeof(item)
+        sizes[name] = size
+    return sizes
+
+
+def live_objects() -> Counter:
+    """Count the live epics.PV objects (and how many are connected) and
+    the ORM instances by class."""
+    from epics import PV
+
+    counts = Counter()
+    for obj in gc.get_objects():
+        if isinstance(obj, PV):
+            counts["epics.PV"] += 1
+            if obj.connected:
+                counts["epics.PV (connected)"] += 1
+        elif hasattr(type(obj), "_sa_class_manager"):
+            counts[f"ORM {type(obj).__name__}"] += 1
+    return counts
+
+
+def growth(value, old: dict, key, scale: float = None) -> str:
+    """Return the change of a value since an earlier sample as text,
+    or nothing if there is no earlier sample."""
+    if old is None:
+        return ""
+    if scale:
+        return f"  ({(value - old.get(key, 0)) / scale:+.2f})"
+    return f"  ({value - old.get(key, 0):+d})"
+
+
+def live_widgets() -> Counter:
+    """Count the live widgets by class."""
+    app = QApplication.instance()
+    if app is None:
+        return Counter()
+    return Counter(type(w).__name__ for w in app.allWidgets())
+
+
+class MemoryProfile:
+    """Reports where the display's memory goes: tracemalloc allocations
+    grouped by subsystem, live PVs, widgets and ORM objects, and the size
+    of the LogicTableModel's per-fault lists. Allocations are attributed
+    to the innermost frame in this display's code, so e.g. PVs created by
+    mixins.logic are counted there rather than under epics. Every report
+    after the first also shows the growth since the first one. A
+    disabled profile does nothing."""
+    def __init__(self, enabled: bool = False, frames: int = 10, top: int = 12):
+        self.enabled = enabled
+        self.frames = frames
+        self.top = top
+        self.baseline = None
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+    def by_subsystem(self) -> Counter:
+        """Return the traced bytes allocated by each subsystem. Allocations
+        made while importing a module belong to that module, not to the
+        code that imported it."""
+        # The profile's own allocations are left out
+        own = (__file__, tracemalloc.__file__)
+
+        sizes = Counter()
+        for stat in tracemalloc.take_snapshot().statistics("traceback"):
+            # Frames are ordered from the oldest to the most recent call
+            if stat.traceback[-1].filename in own:
+                continue
+            owner = None
+            for frame in reversed(stat.traceback):
+                if frame.filename.startswith("<frozen importlib"):
+                    owner = owner or "<imports>"
+                    break
+                elif frame.filename.startswith("<"):
+                    continue
+                name = subsystem(frame.filename)
+                if owner is None:
+                    owner = name
+                if frame.filename.startswith(GUI_DIR + path.sep):
+                    owner = name
+                    break
+            sizes[owner or "<python>"] += stat.size
+        return sizes
+
+    def sample(self, tbl_model=None) -> dict:
+        """Return the current measurements."""
+        gc.collect()
+        return {"rss": rss_mb(),
+                "traced": self.by_subsystem(),
+                "objects": live_objects(),
+                "widgets": live_widgets(),
+                "rows": row_list_bytes(tbl_model) if tbl_model is not None else {}}
+
+    def report(self, tbl_model=None) -> str:
+        """Return the memory report as text."""
+        if not self.enabled:
+            return ""
+        sample = self.sample(tbl_model)
+        base = self.baseline
+        if base is None:
+            self.baseline = sample
+        old = base or {}
+
+        traced = sample["traced"]
+        lines = [f"Resident memory: {sample['rss']:.1f} MB"
+                 + growth(sample["rss"], base, "rss", 1),
+                 f"Traced allocations by subsystem ({sum(traced.values()) / 2**20:.1f} MB):"]
+        lines += [f"  {size / 2**20:8.2f} MB  {name}" + growth(size, old.get("traced"), name, 2**20)
+                  for name, size in traced.most_common(self.top)]
+
+        lines.append("Live objects:")
+        lines += [f"  {n:8d}  {name}" + growth(n, old.get("objects"), name)
+                  for name, n in sorted(sample["objects"].items())]
+        widgets = sample["widgets"]
+        lines.append(f"  {sum(widgets.values()):8d}  QWidgets, most common:")
+        lines += [f"  {n:8d}    {name}" + growth(n, old.get("widgets"), name)
+                  for name, n in widgets.most_common(self.top // 2)]
+
+        if sample["rows"]:
+            lines.append("LogicTableModel per-fault lists:")
+            lines += [f"  {size / 2**10:8.1f} kB  {name}"
+                      for name, size in sample["rows"].items()]
+        return "\n".join(lines)
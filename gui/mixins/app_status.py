@@ -1,19 +1,22 @@
 from functools import partial
 from epics import PV
 from epics.dbr import DBE_VALUE
-from qtpy.QtCore import (Qt, Slot)
-from qtpy.QtWidgets import QHeaderView
-from mps_database.models import ApplicationCard
+from qtpy.QtCore import (Qt, Slot, QEvent, QCoreApplication)
+from qtpy.QtWidgets import (QHeaderView, QCheckBox, QTreeView)
+from enums import Statuses
 from models_pkg.logic_model import MPSSortFilterModel
-from models_pkg.app_status_model import (AppStatusTable, RelatedDisplayDelegate)
 
 
 class AppStatusMixin:
     def app_status_init(self):
         """Initializer for the App Status tab."""
-        self.apps = self.model.config.session.query(ApplicationCard).all()
+        # Imported here so displays without this tab (CUD) skip them
+        from models_pkg.app_status_model import (AppStatusTable, AppTreeModel,
+                                                 RelatedDisplayDelegate)
 
-        self.app_tbl_model = AppStatusTable(self, self.model.config.Session, self.apps)
+        self.apps = self.model.db.cards
+
+        self.app_tbl_model = AppStatusTable(self, self.apps)
         self.rd_button_delegate = RelatedDisplayDelegate(self.ui.app_status_tbl)
 
         self.app_model = MPSSortFilterModel(self)
@@ -29,27 +32,99 @@ class AppStatusMixin:
         hdr.setSectionResizeMode(self.app_tbl_model.sind, QHeaderView.Stretch)
         hdr.resizeSection(self.app_tbl_model.gdind, 100)
 
+        # Tree of the online/offline/disconnected counts per group, link
+        # node, and crate. Hidden until the user checks the checkbox
+        self.app_tree_model = AppTreeModel(self, self.app_tbl_model)
+        self.app_tree = QTreeView()
+        self.app_tree.setModel(self.app_tree_model)
+        self.app_tree.setStyleSheet("font-weight: bold;")
+        self.app_tree.setAlternatingRowColors(True)
+        tree_hdr = self.app_tree.header()
+        tree_hdr.setSectionResizeMode(QHeaderView.ResizeToContents)
+        tree_hdr.setSectionResizeMode(0, QHeaderView.Stretch)
+        self.ui.app_status_tab.layout().insertWidget(1, self.app_tree)
+        self.app_tree.hide()
+
+        self.app_tree_chck = QCheckBox("Show Link Node Health")
+        self.ui.app_status_filter_lyt.insertWidget(0, self.app_tree_chck)
+
+        # Like the fault PVs, app PV callbacks find their row by the
+        # status PV's name under the logic tab's row lock
         self.app_pvs = []
+        self.app_rows = {}
 
     def app_status_connections(self):
         """Establish App Status connections with PVs and Signals."""
-        for i, app in enumerate(self.apps):
-            app_pv = PV(f"{app.link_node.get_cn_prefix()}:APP{app.number}_STATUS",
-                        callback=partial(self.send_app_status, row=i),
+        self.add_app_pvs(0)
+
+        self.ui.app_status_filter_edt.textChanged.connect(self.search_app_status)
+        self.ui.app_status_filter_cmbx.currentIndexChanged.connect(self.search_app_status)
+
+        # Establish connections for showing the row count
+        self.app_model.rowsRemoved.connect(self.show_app_row_count)
+        self.app_model.rowsInserted.connect(self.show_app_row_count)
+        self.app_model.layoutChanged.connect(self.show_app_row_count)
+
+        self.app_tree_chck.toggled.connect(self.app_tree.setVisible)
+        self.app_tbl_model.rollup_changed.connect(self.app_outage)
+
+    def add_app_pvs(self, start: int):
+        """Create the status PVs of the apps from row start on."""
+        for row in range(start, len(self.apps)):
+            ch = self.app_tbl_model.channels[row]
+            self.app_rows[ch] = row
+            app_pv = PV(ch,
+                        callback=partial(self.send_app_status, channel=ch),
+                        connection_callback=partial(self.send_app_conn, channel=ch),
                         auto_monitor=DBE_VALUE)
             self.app_pvs.append(app_pv)
 
-            self.ui.app_status_filter_edt.textChanged.connect(self.search_app_status)
-            self.ui.app_status_filter_cmbx.currentIndexChanged.connect(self.search_app_status)
+    def app_status_reload(self, diff):
+        """Apply a reloaded database (self.model) to the App Status tab.
+        The PVs of removed apps are closed and PVs are created for the
+        added apps; the other apps keep their PVs and status."""
+        kept = []
+        for row, new in enumerate(diff.app_rows):
+            if new is None:
+                self.app_pvs[row].disconnect()
+            else:
+                kept.append(self.app_pvs[row])
 
-            # Establish connections for showing the row count
-            self.app_model.rowsRemoved.connect(self.show_app_row_count)
-            self.app_model.rowsInserted.connect(self.show_app_row_count)
-            self.app_model.layoutChanged.connect(self.show_app_row_count)
+        with self.row_lock:
+            QCoreApplication.sendPostedEvents(self.app_tbl_model, QEvent.MetaCall)
+            self.apps = self.model.db.cards
+            self.app_tbl_model.apply_reload(self.apps, diff.app_rows)
+            self.app_pvs = kept
+            self.app_rows = {ch: row for row, ch in
+                             enumerate(self.app_tbl_model.channels[:len(kept)])}
+        self.add_app_pvs(len(kept))
+        self.show_app_row_count()
 
-    def send_app_status(self, value: int, row: int, **kw):
+    def send_app_status(self, value: int, channel: str, **kw):
         """Function to emit the status signal in the model."""
-        self.app_tbl_model.status_signal.emit(value, row)
+        with self.row_lock:
+            row = self.app_rows.get(channel)
+            if row is not None:
+                self.app_tbl_model.status_signal.emit(value, row)
+
+    def send_app_conn(self, conn: bool, channel: str, **kw):
+        """Function to mark the app as disconnected when its PV
+        disconnects. The status callback updates it on reconnect."""
+        if conn:
+            return
+        with self.row_lock:
+            row = self.app_rows.get(channel)
+            if row is not None:
+                self.app_tbl_model.status_signal.emit(-1, row)
+
+    @Slot(int)
+    def app_outage(self, row: int):
+        """Tell the logic model whether the app's card is offline, so
+        the faults that depend on it can be collapsed. Only an OFFLINE
+        status counts: when the status PV is disconnected the card's
+        state is unknown, so its timed out faults stay in the Summary."""
+        down = self.app_tbl_model.status[row] == Statuses.RED
+        self.tbl_model.set_card_down(self.apps[row].id, down)
 
     @Slot()
     def search_app_status(self):
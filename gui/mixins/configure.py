@@ -1,23 +1,29 @@
 from json import dumps
+from functools import partial
 from itertools import groupby
-from qtpy.QtCore import (Qt, Slot, QModelIndex, QSortFilterProxyModel)
-from qtpy.QtWidgets import (QHeaderView, QApplication)
-from mps_database.models import Device
+from qtpy.QtCore import (Qt, Slot, QPoint, QModelIndex)
+from qtpy.QtWidgets import (QHeaderView, QApplication, QMenu)
 from enums import ConfFiles
-from models_pkg.configure_model import ConfigureTableModel
 
 
 class ConfigureMixin:
     def configure_init(self):
         """Initializer for everything in Configure tab: ListViews and
         PyDMEmbeddedDisplay."""
+        # Imported here so displays without this tab (CUD) skip them
+        from models_pkg.configure_model import ConfigureTableModel
+        from models_pkg.device_index import (DeviceIndex, DeviceFilterModel)
+
         self.ui.configure_spltr.setSizes([50, 50])
-        devs = self.model.config.session.query(Device).all()
+        devs = list(self.model.db.devices)
+        self.crate_init()
+
+        # Build the search index used by both tables' filters
+        self.dev_index = DeviceIndex(devs)
 
         # Set model, filter, and header for the All Devices table
         self.all_devs_model = ConfigureTableModel(self, devs)
-        self.all_devs_filter = QSortFilterProxyModel(self)
-        self.all_devs_filter.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.all_devs_filter = DeviceFilterModel(self, self.dev_index)
         self.all_devs_filter.setSourceModel(self.all_devs_model)
         self.ui.all_devs_tbl.setModel(self.all_devs_filter)
         self.ui.all_devs_tbl.sortByColumn(1, Qt.AscendingOrder)
@@ -27,8 +33,7 @@ class ConfigureMixin:
 
         # Set model, filter, and header for the Selected Devices table
         self.sel_devs_model = ConfigureTableModel(self, [], save_type=True)
-        self.sel_devs_filter = QSortFilterProxyModel(self)
-        self.sel_devs_filter.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.sel_devs_filter = DeviceFilterModel(self, self.dev_index)
         self.sel_devs_filter.setSourceModel(self.sel_devs_model)
         self.ui.sel_devs_tbl.setModel(self.sel_devs_filter)
         self.ui.sel_devs_tbl.sortByColumn(1, Qt.AscendingOrder)
@@ -36,19 +41,87 @@ class ConfigureMixin:
         hdr.setSectionResizeMode(0, QHeaderView.Stretch)
         hdr.setSectionResizeMode(1, QHeaderView.ResizeToContents)
 
+        # Context menu for adding sets of devices from the All Devices table
+        self.conf_menu = QMenu(self)
+
     def configure_connections(self):
         """Establish PV and slot connections for the devices model and
         configure tab."""
         # All Devices table and LineEdit
-        self.ui.all_devs_edt.textChanged.connect(self.all_devs_filter.setFilterFixedString)
+        self.ui.all_devs_edt.textChanged.connect(self.all_devs_filter.setQuery)
         self.ui.all_devs_tbl.clicked.connect(self.dev_selected)
+        self.ui.all_add_sel_btn.clicked.connect(self.add_selected_devs)
+        self.ui.all_add_all_btn.clicked.connect(self.add_filtered_devs)
+        self.ui.all_devs_tbl.customContextMenuRequested.connect(
+            self.conf_context_menu)
 
         # Selected Devices table and LineEdit
-        self.ui.sel_devs_edt.textChanged.connect(self.sel_devs_filter.setFilterFixedString)
+        self.ui.sel_devs_edt.textChanged.connect(self.sel_devs_filter.setQuery)
         self.ui.sel_clear_btn.clicked.connect(self.sel_devs_model.clear_data)
         self.ui.sel_devs_tbl.clicked.connect(self.dev_deselect)
         self.sel_devs_model.table_changed.connect(self.reload_embed)
 
+    def configure_reload(self):
+        """Rebuild the Configure tab's devices from a reloaded database
+        (self.model). Selected devices stay selected if they still
+        exist on a card, matched by name."""
+        from models_pkg.device_index import DeviceIndex
+
+        devs = list(self.model.db.devices)
+        self.crate_init()
+        by_name = {d.mps_name: d for d in devs}
+        selected = [self.sel_devs_model.get_device(i)
+                    for i in range(self.sel_devs_model.rowCount())]
+
+        self.all_devs_model.set_data(devs)
+        self.sel_devs_model.set_data([by_name[d.mps_name] for d in selected
+                                      if d.mps_name in by_name
+                                      and by_name[d.mps_name].card is not None])
+        self.dev_index = DeviceIndex(devs)
+        self.all_devs_filter.setIndex(self.dev_index)
+        self.sel_devs_filter.setIndex(self.dev_index)
+
+    def crate_init(self):
+        """Precompute the card number and channel range macros for every
+        crate's slots when the database loads."""
+        self.crate_macros = {}
+        self.dev_macros_cache = {}
+
+        for c in self.model.db.cards:
+            mac = self.crate_macros.get(c.crate.id)
+            if mac is None:
+                mac = {}
+                for i in range(1, 8):
+                    mac[f'AC{i}'] = "Slot Empty"
+                    mac[f'CH{i}'] = ""
+                self.crate_macros[c.crate.id] = mac
+
+            mac[f'AC{c.slot_number}'] = c.number
+            mac[f'CH{c.slot_number}'] = self.channel_range(c.analog_channels
+                                                           + c.digital_channels
+                                                           + c.digital_out_channels)
+
+    def dev_macros(self, dev):
+        """Return the cached per-device macro values used by
+        bpm_macros."""
+        if dev.id in self.dev_macros_cache:
+            return self.dev_macros_cache[dev.id]
+
+        if dev.is_analog():
+            chans = dev.channel.number
+        else:
+            chans = self.channel_range([i.channel for i in dev.inputs])
+
+        mac = {'LN': dev.card.link_node.lcls1_id,
+               'CL': dev.card.crate.location,
+               'DEVICE': dev.mps_name,
+               'AC': dev.card.number,
+               'CH': chans,
+               'AS': dev.card.slot_number,
+               'CPU': dev.card.link_node.cpu}
+        self.dev_macros_cache[dev.id] = mac
+        return mac
+
     def bpm_macros(self):
         """Construct the macros dictionary for the selected device(s) if
         the device(s) are BPM's."""
@@ -56,35 +129,19 @@ class ConfigureMixin:
 
         mac = {'MULTI': multi}
         for i in range(self.sel_devs_model.rowCount()):
-            suf = str(i + 1) if multi else ""
-            dev = self.sel_devs_model.get_device(i)
-
-            mac[f'LN{suf}'] = dev.card.link_node.lcls1_id
-            mac[f'CL{suf}'] = dev.card.crate.location
-            mac[f'DEVICE{suf}'] = self.model.name.getDeviceName(dev)
+            dev_mac = self.dev_macros(self.sel_devs_model.get_device(i))
 
             if multi:
-                if dev.is_analog():
-                    chans = dev.channel.number
-                else:
-                    chans = self.channel_range([i.channel for i in dev.inputs])
-                mac[f'AC{suf}'] = dev.card.number
-                mac[f'CH{suf}'] = chans
+                suf = str(i + 1)
+                for key in ['LN', 'CL', 'DEVICE', 'AC', 'CH']:
+                    mac[key + suf] = dev_mac[key]
+            else:
+                for key in ['LN', 'CL', 'DEVICE', 'AS', 'CPU']:
+                    mac[key] = dev_mac[key]
 
         if not multi:
-            mac['AS'] = dev.card.slot_number
-            mac['CPU'] = dev.card.link_node.cpu
-
-            for i in range(1, 8):
-                mac[f'AC{i}'] = "Slot Empty"
-                mac[f'CH{i}'] = ""
-
-            for c in dev.card.crate.cards:
-                chans = self.channel_range(c.analog_channels
-                                           + c.digital_channels
-                                           + c.digital_out_channels)
-                mac[f'AC{c.slot_number}'] = c.number
-                mac[f'CH{c.slot_number}'] = chans
+            dev = self.sel_devs_model.get_device(0)
+            mac.update(self.crate_macros[dev.card.crate.id])
 
         return mac
 
@@ -108,14 +165,58 @@ class ConfigureMixin:
     @Slot(QModelIndex)
     def dev_selected(self, index: QModelIndex):
         """When a device is clicked in all_devs_tbl, add it to the
-        sel_devs_tbl."""
+        sel_devs_tbl. Ctrl/Shift-clicks only extend the table's
+        selection, which is added with the Add Selected button."""
         if not index.isValid():
             return
+        if QApplication.keyboardModifiers() & (Qt.ControlModifier | Qt.ShiftModifier):
+            return
 
         dev_id = self.all_devs_filter.mapToSource(index).row()
         dev = self.all_devs_model.get_device(dev_id)
         self.sel_devs_model.add_datum(dev)
 
+    def shown_devs(self, rows) -> list:
+        """Return the devices for the given rows of all_devs_filter."""
+        devs = []
+        for r in rows:
+            index = self.all_devs_filter.mapToSource(self.all_devs_filter.index(r, 0))
+            devs.append(self.all_devs_model.get_device(index.row()))
+        return devs
+
+    @Slot()
+    def add_selected_devs(self):
+        """Add every device selected in all_devs_tbl at once."""
+        rows = sorted(i.row() for i in self.ui.all_devs_tbl.selectionModel().selectedRows())
+        self.sel_devs_model.add_data(self.shown_devs(rows))
+
+    @Slot()
+    def add_filtered_devs(self):
+        """Add every device shown in all_devs_tbl (i.e. every device
+        matching the filter) at once."""
+        self.sel_devs_model.add_data(self.shown_devs(range(self.all_devs_filter.rowCount())))
+
+    def add_scoped_devs(self, dev_type: str, area: str):
+        """Add every device of the given type in the given area."""
+        devs = [self.all_devs_model.get_device(i) for i in range(self.all_devs_model.rowCount())]
+        self.sel_devs_model.add_data([d for d in devs
+                                      if d.device_type.name == dev_type and d.area == area])
+
+    @Slot(QPoint)
+    def conf_context_menu(self, pos: QPoint):
+        """Create a context menu for adding sets of devices, scoped to
+        the right-clicked device's type and area."""
+        index = self.ui.all_devs_tbl.indexAt(pos)
+        self.conf_menu.clear()
+        self.conf_menu.addAction("Add Selected Devices", self.add_selected_devs)
+        self.conf_menu.addAction("Add All Shown Devices", self.add_filtered_devs)
+        if index.isValid():
+            dev = self.shown_devs([index.row()])[0]
+            dev_type = dev.device_type.name
+            self.conf_menu.addAction(f"Add All {dev_type} Devices in {dev.area}",
+                                     partial(self.add_scoped_devs, dev_type, dev.area))
+        self.conf_menu.popup(self.ui.all_devs_tbl.viewport().mapToGlobal(pos))
+
     @Slot(QModelIndex)
     def dev_deselect(self, index: QModelIndex):
         """When a device is clicked in sel_devs_tbl, remove it."""
@@ -0,0 +1,60 @@
+from os import path
+from time import strftime
+from qtpy.QtCore import Slot
+from qtpy.QtWidgets import QLabel
+
+
+class DBReloadMixin:
+    def db_reload_init(self, fixed_file: bool = False):
+        """Initializer for reloading the database when a new version is
+        deployed. fixed_file is whether the display was given a DB_FILE,
+        otherwise the newest default database is loaded. The result of
+        the last reload is shown in the footer."""
+        # Imported here so displays without this tab (CUD) skip them
+        from models_pkg.db_reload import DBReloader
+
+        self.db_reload_lbl = QLabel()
+        self.ui.ftr_lyt.insertWidget(self.ui.ftr_lyt.indexOf(self.ui.ftr_ver_lbl),
+                                     self.db_reload_lbl)
+        self.db_reloader = DBReloader(self, self.model, fixed_file)
+
+    def db_reload_connections(self):
+        """Establish connections for the database reloader."""
+        self.db_reloader.loaded.connect(self.apply_db_reload)
+        self.db_reloader.failed.connect(self.db_reload_failed)
+
+    @Slot(object, object)
+    def apply_db_reload(self, model, diff):
+        """Switch the display to a reloaded database. Only the faults,
+        apps, and conditions that changed are resubscribed, and rows are
+        removed and inserted in place, so the tables keep their sorting,
+        filters, and selection. A database with different columns needs
+        a restart."""
+        name = path.basename(model.filename)
+        if diff.restart:
+            self.logger.warning(f"Not reloading {model.filename}, {diff.summary()}")
+            self.db_reload_lbl.setText(f"{name} deployed, restart to load it")
+            self.db_reload_lbl.setToolTip(diff.summary())
+            self.db_reloader.finish()
+            return
+
+        self.model = model
+        self.logic_reload(diff)
+        self.ignore_reload(diff)
+        self.app_status_reload(diff)
+        self.configure_reload()
+        self.filter_expr_reload()
+        self.show_row_count()
+        self.show_ignore_row_count()
+        self.db_reloader.finish(model)
+
+        self.logger.info(f"Reloaded {model.filename}: {diff.summary()}")
+        self.db_reload_lbl.setText(f"{name} loaded at {strftime('%H:%M:%S')}")
+        self.db_reload_lbl.setToolTip(diff.summary())
+
+    @Slot(str)
+    def db_reload_failed(self, message: str):
+        """Keep the running database if a new one can't be loaded."""
+        self.logger.error(message)
+        self.db_reload_lbl.setText("Database reload failed")
+        self.db_reload_lbl.setToolTip(message)
@@ -0,0 +1,125 @@
+from functools import partial
+from qtpy.QtCore import Slot
+from qtpy.QtWidgets import (QComboBox, QPushButton, QInputDialog)
+
+# Presets that are always listed for each table
+LOGIC_PRESETS = {"Faulted": "state:faulted",
+                 "Faulted, Not Ignored": "state:faulted ignored:no",
+                 "Bypassed": "bypassed:yes",
+                 "Timed Out": "state:timeout"}
+IGNORE_PRESETS = {"Ignored": "ignored:yes",
+                  "Ignored by Active Conditions": "ignored:active"}
+
+
+class FilterExprMixin:
+    def filter_expr_init(self):
+        """Initializer for the filter expressions and presets of the
+        Logic and Ignore tables. The filter text boxes take the
+        expressions in models_pkg.filter_expr."""
+        # Imported here so displays without this tab (CUD) skip them
+        from models_pkg.filter_expr import (FILTER_HELP, FilterPresets)
+
+        self.filter_tabs = {}
+        self.preset_btns = {}
+        for name, lyt, edit, proxy, defaults in (
+                ("logic", self.ui.logic_filter_lyt, self.ui.logic_filter_edt,
+                 self.logic_model, LOGIC_PRESETS),
+                ("ignore", self.ui.ignore_filter_lyt, self.ui.ignore_filter_edt,
+                 self.ignore_model, IGNORE_PRESETS)):
+            edit.setPlaceholderText("Filter, e.g. state:faulted area:BSY*")
+            edit.setToolTip(FILTER_HELP)
+
+            cmbx = QComboBox()
+            cmbx.setToolTip("Saved filters")
+            save_btn = QPushButton("Save")
+            save_btn.setToolTip("Save the filter as a preset")
+            del_btn = QPushButton("Delete")
+            del_btn.setToolTip("Delete the selected saved preset")
+
+            for wid in (cmbx, save_btn, del_btn):
+                lyt.insertWidget(lyt.indexOf(edit), wid)
+
+            self.filter_tabs[name] = (edit, proxy, cmbx, FilterPresets(name, defaults))
+            self.preset_btns[name] = (save_btn, del_btn)
+            self.load_presets(name)
+
+    def filter_expr_connections(self):
+        """Establish slot connections for the filter text boxes and the
+        preset widgets."""
+        for name, (edit, _, cmbx, _) in self.filter_tabs.items():
+            save_btn, del_btn = self.preset_btns[name]
+            edit.textChanged.connect(partial(self.apply_filter_expr, name))
+            cmbx.activated.connect(partial(self.select_preset, name))
+            save_btn.clicked.connect(partial(self.save_preset, name))
+            del_btn.clicked.connect(partial(self.delete_preset, name))
+
+    def filter_expr_reload(self):
+        """Compile the filters again after the database is reloaded,
+        since they hold the conditions and classes they matched."""
+        for name, (edit, _, _, _) in self.filter_tabs.items():
+            self.apply_filter_expr(name, edit.text())
+
+    def load_presets(self, name: str, current: str = None):
+        """Fill a table's preset combobox."""
+        cmbx, presets = self.filter_tabs[name][2:]
+        cmbx.clear()
+        cmbx.addItem("Presets")
+        cmbx.addItems(sorted(presets.presets()))
+        if current is not None:
+            cmbx.setCurrentText(current)
+
+    @Slot(str)
+    def apply_filter_expr(self, name: str, text: str):
+        """Compile a table's filter text once and install it as the
+        proxy's "expr" predicate. If the text doesn't compile, the
+        previous filter is kept and the error is shown on the text box."""
+        from models_pkg.filter_expr import (FILTER_HELP, compile_filter)
+
+        edit, proxy = self.filter_tabs[name][:2]
+        try:
+            predicate = compile_filter(text, self.tbl_model)
+        except ValueError as e:
+            edit.setStyleSheet("border: 1px solid red;")
+            edit.setToolTip(f"{e}\n\n{FILTER_HELP}")
+            return
+
+        edit.setStyleSheet("")
+        edit.setToolTip(FILTER_HELP)
+        if predicate is None:
+            proxy.removeFilterPredicate("expr")
+        else:
+            proxy.setFilterPredicate("expr", predicate)
+
+    @Slot(int)
+    def select_preset(self, name: str, index: int):
+        """Put the selected preset in the table's filter text box."""
+        if not index:
+            return
+        edit, _, cmbx, presets = self.filter_tabs[name]
+        edit.setText(presets.presets().get(cmbx.currentText(), ""))
+
+    @Slot()
+    def save_preset(self, name: str):
+        """Ask for a name and save the table's filter text as a preset."""
+        edit, _, cmbx, presets = self.filter_tabs[name]
+        if not edit.text().strip():
+            return
+        current = cmbx.currentText() if cmbx.currentIndex() else ""
+        preset, ok = QInputDialog.getText(self, "Save Filter Preset",
+                                          "Preset name:", text=current)
+        preset = presets.key(preset.strip())
+        if not (ok and preset):
+            return
+        presets.save(preset, edit.text())
+        self.load_presets(name, current=preset)
+
+    @Slot()
+    def delete_preset(self, name: str):
+        """Delete the selected preset if the user saved it. Defaults
+        can be overridden but not deleted."""
+        _, _, cmbx, presets = self.filter_tabs[name]
+        preset = cmbx.currentText()
+        if not cmbx.currentIndex() or preset not in presets.saved():
+            return
+        presets.remove(preset)
+        self.load_presets(name)
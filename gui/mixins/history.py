@@ -0,0 +1,78 @@
+from qtpy.QtCore import (Slot, QTimer)
+from qtpy.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QLabel,
+                            QComboBox, QSpinBox, QCheckBox, QTableView,
+                            QHeaderView, QAbstractItemView)
+from models_pkg.history_model import HistoryTableModel
+
+
+class HistoryMixin:
+    def history_init(self):
+        """Initializer for the Fault History panel in the Logic tab. The
+        panel is hidden until the user checks the History checkbox."""
+        self.hist_tbl_model = HistoryTableModel(self, self.tbl_model)
+
+        self.hist_chck = QCheckBox("Show Fault History")
+        self.ui.logic_filter_lyt.insertWidget(1, self.hist_chck)
+
+        self.hist_mode_cmbx = QComboBox()
+        self.hist_mode_cmbx.addItems(["All Transitions", "First Fault per Destination"])
+        self.hist_window_spbx = QSpinBox()
+        self.hist_window_spbx.setRange(0, 86400)
+        self.hist_window_spbx.setSuffix(" s")
+        self.hist_window_spbx.setSpecialValueText("All")
+        self.hist_window_spbx.setValue(300)
+
+        ctrl_lyt = QHBoxLayout()
+        ctrl_lyt.addWidget(QLabel("Fault History:"))
+        ctrl_lyt.addWidget(self.hist_mode_cmbx)
+        ctrl_lyt.addStretch()
+        ctrl_lyt.addWidget(QLabel("Last"))
+        ctrl_lyt.addWidget(self.hist_window_spbx)
+
+        self.hist_tbl = QTableView()
+        self.hist_tbl.setModel(self.hist_tbl_model)
+        self.hist_tbl.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.hist_tbl.setStyleSheet("font-weight: bold;")
+        self.hist_tbl.verticalHeader().hide()
+        hdr = self.hist_tbl.horizontalHeader()
+        hdr.setSectionResizeMode(QHeaderView.ResizeToContents)
+        hdr.setSectionResizeMode(1, QHeaderView.Stretch)
+
+        self.hist_frame = QWidget()
+        lyt = QVBoxLayout()
+        lyt.setContentsMargins(0, 0, 0, 0)
+        lyt.addLayout(ctrl_lyt)
+        lyt.addWidget(self.hist_tbl)
+        self.hist_frame.setLayout(lyt)
+        self.ui.logic_tab.layout().insertWidget(2, self.hist_frame)
+        self.hist_frame.hide()
+
+        self.hist_timer = QTimer(self)
+        self.hist_timer.setInterval(1000)
+
+    def history_connections(self):
+        """Establish slot connections for the Fault History panel."""
+        self.hist_chck.toggled.connect(self.show_history)
+        self.hist_mode_cmbx.currentIndexChanged.connect(self.refresh_history)
+        self.hist_window_spbx.valueChanged.connect(self.refresh_history)
+        self.hist_timer.timeout.connect(self.refresh_history)
+
+    @Slot(bool)
+    def show_history(self, checked):
+        """Show or hide the Fault History panel. The panel is only
+        refreshed while it is shown."""
+        self.hist_frame.setVisible(checked)
+        if checked:
+            self.refresh_history()
+            self.hist_timer.start()
+        else:
+            self.hist_timer.stop()
+
+    @Slot()
+    def refresh_history(self):
+        """Query the fault history for the selected mode and window."""
+        seconds = self.hist_window_spbx.value() or None
+        if self.hist_mode_cmbx.currentIndex() == 0:
+            self.hist_tbl_model.show_window(seconds)
+        else:
+            self.hist_tbl_model.show_first_faults(seconds)
@@ -1,27 +1,25 @@
 from functools import partial
 from qtpy.QtCore import (Qt, Slot)
-from qtpy.QtWidgets import QHeaderView
-from pydm.widgets import PyDMByteIndicator
-from mps_database.models import Condition
-from models_pkg.logic_model import (MPSSortFilterModel, MPSItemDelegate)
+from qtpy.QtWidgets import (QHeaderView, QCheckBox)
+from models_pkg.logic_model import (MPSViewModel, MPSItemDelegate)
 
 
 class IgnoreMixin:
     def ignore_init(self):
         """Initializer for everything in Ignore Logic tab: Ignore Table
         and Ignore Status Bit Indicators."""
+        # Imported here so displays without this tab (CUD) skip them
+        from resources.widgets import PyDMMonitorByteIndicator
 
-        # Create bit indicators for each Ignore status; exclude duplicates
-        names = []
-        conditions = self.model.config.session.query(Condition).all()
-        for i, con in enumerate(conditions):
-            con_pv = self.model.name.getConditionPV(con)
-            name = con.name.split('_')[0] if "IGNORE" in con.name else con.name
-            if name in names:
+        # Create bit indicators for each Ignore status; exclude duplicates.
+        # Every condition's state is passed to the model's ignore masks
+        self.con_indicators = {}
+        for con in self.tbl_model.con_lst:
+            name = self.tbl_model.con_name(con)
+            if name in self.con_indicators:
                 continue
-            names.append(name)
 
-            wid = PyDMByteIndicator(init_channel=f"ca://{con_pv}")
+            wid = PyDMMonitorByteIndicator(init_channel=f"ca://{con.pv}")
             wid.circles = True
             wid.labels = [name]
             wid.onColor = Qt.yellow
@@ -29,13 +27,19 @@ class IgnoreMixin:
             wid.setStyleSheet("font-weight: bold;")
             wid._indicators[0].setMinimumWidth(30)
             wid.layout().setAlignment(wid._labels[0], Qt.AlignLeft)
+            wid.value_received.connect(partial(self.con_value_changed, wid))
             self.ui.ignore_status_lyt.insertWidget(self.ui.ignore_status_lyt.count() - 1, wid)
+            self.con_indicators[name] = wid
+        self.con_channels = self.condition_channels()
 
-        self.ui.ignore_beampath_cmbx.addItems(names)
+        self.ui.ignore_beampath_cmbx.addItems(list(self.con_indicators))
+
+        self.ignore_active_chck = QCheckBox("Only Ignored by Active Conditions")
+        self.ui.ignore_filter_lyt.insertWidget(4, self.ignore_active_chck)
 
         # Initialize Ignore Table models, delegate, and view
         self.ignore_delegate = MPSItemDelegate(self)
-        self.ignore_model = MPSSortFilterModel(self)
+        self.ignore_model = MPSViewModel(self)
         self.ignore_model.setSourceModel(self.tbl_model)
 
         self.ui.ignore_tbl.setModel(self.ignore_model)
@@ -57,20 +61,72 @@ class IgnoreMixin:
         self.show_ignore_row_count()
 
     def ignore_connections(self):
-        """Establish slot connections for the Context Menu, Filter Text
-        Edit, Beampath Combobox, and the Row Count Label."""
-        self.ui.ignore_filter_edt.textChanged.connect(
-            partial(self.ignore_model.setFilterByColumn, 0))
+        """Establish slot connections for the Context Menu, Beampath
+        Combobox, and the Row Count Label. The Filter Text Edit is
+        connected by filter_expr_connections."""
         self.ui.ignore_tbl.customContextMenuRequested.connect(
             self.custom_context_menu)
 
         self.ui.ignore_beampath_cmbx.currentIndexChanged.connect(self.show_beampath_ign)
         self.ui.ignore_inactive_chck.stateChanged.connect(self.show_inactive_ign)
+        self.ignore_active_chck.stateChanged.connect(self.show_active_ign)
+        for ch in self.con_channels:
+            ch.connect()
 
         # Establish connections for showing the row count
         self.ignore_model.rowsRemoved.connect(self.show_ignore_row_count)
         self.ignore_model.rowsInserted.connect(self.show_ignore_row_count)
         self.ignore_model.layoutChanged.connect(self.show_ignore_row_count)
+        self.ignore_model.modelReset.connect(self.show_ignore_row_count)
+
+    def condition_channels(self) -> list:
+        """Map every condition PV to its bits in the model's ignore
+        masks. The indicators already monitor their PVs and pass their
+        values on; a channel is created for each other PV only."""
+        from pydm.widgets import PyDMChannel
+
+        self.con_bits = {}
+        for i, con in enumerate(self.tbl_model.con_lst):
+            self.con_bits.setdefault(f"ca://{con.pv}", []).append(i)
+
+        shown = {wid.channel for wid in self.con_indicators.values()}
+        return [PyDMChannel(address=address,
+                            value_slot=partial(self.con_value_changed, address))
+                for address in self.con_bits if address not in shown]
+
+    def con_value_changed(self, source, value):
+        """Pass a condition PV's value to the model for each condition
+        using the PV. source is an indicator or a channel address."""
+        address = source if isinstance(source, str) else source.channel
+        for bit in self.con_bits.get(address, ()):
+            self.tbl_model.set_con(value, bit)
+
+    def ignore_reload(self, diff):
+        """Resubscribe the conditions if a reloaded database changed
+        them. The columns are the same, so only the PVs can differ. The
+        model's active conditions were cleared, so indicators keeping
+        their PV pass their last value on again."""
+        if not diff.conditions_changed:
+            return
+        pvs = {}
+        for con in self.tbl_model.con_lst:
+            pvs.setdefault(self.tbl_model.con_name(con), con.pv)
+        kept = []
+        for name, wid in self.con_indicators.items():
+            address = f"ca://{pvs[name]}"
+            if wid.channel == address:
+                kept.append(wid)
+            else:
+                wid.channel = address
+
+        for ch in self.con_channels:
+            ch.disconnect()
+        self.con_channels = self.condition_channels()
+        for ch in self.con_channels:
+            ch.connect()
+        for wid in kept:
+            if wid.value is not None:
+                self.con_value_changed(wid, wid.value)
 
     @Slot(int)
     def show_beampath_ign(self, index):
@@ -82,7 +138,7 @@ class IgnoreMixin:
         else:
             for i in self.tbl_model.conind:
                 self.ui.ignore_tbl.hideColumn(i)
-            index_col = self.tbl_model.conind[0] + index - 1
+            index_col = self.tbl_model.cind + index - 1
             self.ui.ignore_tbl.showColumn(index_col)
 
     @Slot(int)
@@ -97,6 +153,16 @@ class IgnoreMixin:
             self.ui.ignore_tbl.showColumn(self.tbl_model.aind)
             self.ignore_model.removeFilterByColumn(self.tbl_model.aind)
 
+    @Slot(int)
+    def show_active_ign(self, state):
+        """Slot called when the Active Conditions Checkbox is toggled.
+        Determines if only faults ignored by an active condition are
+        shown."""
+        if state:
+            self.ignore_model.setFilterPredicate("ign_active", self.tbl_model.ignored_by_active)
+        else:
+            self.ignore_model.removeFilterPredicate("ign_active")
+
     @Slot()
     def show_ignore_row_count(self):
         """When the number of displayed rows changes, update the row
@@ -1,30 +1,41 @@
 from functools import partial
+from threading import Lock
 from epics import PV
 from epics.dbr import DBE_VALUE
-from qtpy.QtCore import (Qt, Slot)
+from qtpy.QtCore import (Qt, Slot, QEvent, QCoreApplication)
 from qtpy.QtWidgets import QHeaderView
-from models_pkg.logic_model import (LogicTableModel, MPSSortFilterModel,
+from enums import FaultPV
+from models_pkg.logic_model import (LogicTableModel, MPSViewModel,
                                     MPSItemDelegate, IgnoredColDelegate)
+from models_pkg.monitor_filter import MonitorFilter
+from models_pkg.conn_tracker import ConnectionTracker
+from models_pkg.initial_load import InitialLoad
 
 
 class LogicMixin:
+    # Per-family overrides of monitor_filter.DEFAULT_POLICIES
+    monitor_policies = {}
+
     def logic_init(self, cud_mode=False):
         """Initializer for everything in Logic tab: Logic Table Model,
         Logic Item Delegate, and Selection Details."""
-        self.tbl_model = LogicTableModel(self, self.model, self.model.config.Session)
+        self.tbl_model = LogicTableModel(self, self.model)
         self.delegate = MPSItemDelegate(self)
         self.ign_col_delegate = IgnoredColDelegate(self)
 
-        self.logic_model = MPSSortFilterModel(self)
+        self.logic_model = MPSViewModel(self)
         self.logic_model.setSourceModel(self.tbl_model)
 
+        # PV callbacks find their fault's row by name. The row lock is
+        # held while looking up a row and while rows are renumbered
         self.pvs = []
+        self.fault_rows = {}
+        self.row_lock = Lock()
 
         if not cud_mode:
-            self.logic_model.setFilterByColumn(0, "")
             self.ui.logic_tbl.setModel(self.logic_model)
             self.ui.logic_tbl.sortByColumn(0, Qt.AscendingOrder)
-            for i in range(self.tbl_model.conind[0], self.tbl_model.iind):
+            for i in range(self.tbl_model.cind, self.tbl_model.iind):
                 self.ui.logic_tbl.hideColumn(i)
             self.ui.logic_tbl.setItemDelegate(self.delegate)
             self.ui.logic_tbl.setItemDelegateForColumn(self.tbl_model.iind,
@@ -43,51 +54,101 @@ class LogicMixin:
     def logic_connections(self, cud_mode=False):
         """Establish PV and slot connections for the logic model and
         logic tab."""
-        for i, fault in enumerate(self.model.faults):
-            state_pv = PV(fault.name,
-                          callback=partial(self.send_new_val, row=i),
-                          auto_monitor=DBE_VALUE)
-            self.pvs.append(state_pv)
-            byp_pv = PV(f"{fault.name}_SCBYPS",
-                        callback=partial(self.send_new_val, row=i),
-                        auto_monitor=DBE_VALUE)
-            self.pvs.append(byp_pv)
-            byp_exp_pv = PV(f"{fault.name}_SCBYP_END",
-                            callback=partial(self.send_new_val, row=i),
-                            auto_monitor=DBE_VALUE)
-            self.pvs.append(byp_exp_pv)
-            ign_pv = PV(f"{fault.name}_IGNORED",
-                        callback=partial(self.send_new_val, row=i),
-                        auto_monitor=DBE_VALUE)
-            self.pvs.append(ign_pv)
-            act_pv = PV(f"{fault.name}_ACTIVE",
-                        callback=partial(self.send_new_val, row=i),
-                        auto_monitor=DBE_VALUE)
-            self.pvs.append(act_pv)
+        self.monitor_filter = MonitorFilter(self, {
+            FaultPV.STATE: self.send_state,
+            FaultPV.BYP: self.tbl_model.byp_signal.emit,
+            FaultPV.BYP_EXP: self.tbl_model.byp_exp_signal.emit,
+            FaultPV.IGN: self.tbl_model.ign_signal.emit,
+            FaultPV.ACT: self.tbl_model.act_signal.emit},
+            self.monitor_policies)
+
+        # Disconnects and TIMEOUTs are grouped per IOC host
+        self.conn_tracker = ConnectionTracker(self, self.tbl_model, self.monitor_filter)
+
+        self.max_permit_pv = PV("SIOC:SYS0:MP00:MAX_PERMIT.RVAL",
+                                callback=self.send_max_permit,
+                                auto_monitor=DBE_VALUE)
+
+        # The first values of the PVs are published to the proxies at
+        # once, when most faults have reported or after a timeout
+        self.initial_load = InitialLoad(self, self.tbl_model)
+        self.add_fault_pvs(0)
 
         if not cud_mode:
-            # Establish connections for inactive checkbox and filter box
+            # Establish connections for inactive checkbox. The filter box
+            # is connected by filter_expr_connections
             self.ui.inactive_chck.stateChanged.connect(self.show_inactive)
-            self.ui.logic_filter_edt.textChanged.connect(
-                partial(self.logic_model.setFilterByColumn, 0))
 
             # Establish connections for showing the row count
             self.logic_model.rowsRemoved.connect(self.show_row_count)
             self.logic_model.rowsInserted.connect(self.show_row_count)
             self.logic_model.layoutChanged.connect(self.show_row_count)
+            self.logic_model.modelReset.connect(self.show_row_count)
+
+    def add_fault_pvs(self, start: int):
+        """Create the PVs of the faults from row start on."""
+        for row in range(start, len(self.model.faults)):
+            name = self.model.faults[row].name
+            self.fault_rows[name] = row
+            for fam in FaultPV:
+                pv = PV(fam.pv(name),
+                        callback=partial(self.send_new_val, fault=name, fam=fam),
+                        connection_callback=partial(self.send_conn, fault=name, fam=fam),
+                        auto_monitor=DBE_VALUE)
+                self.pvs.append(pv)
+
+    def logic_reload(self, diff):
+        """Apply a reloaded database (self.model) to the Logic table.
+        The PVs of removed faults are closed and PVs are created for the
+        added faults; the other faults keep their PVs and values. Rows
+        are renumbered while holding the row lock, after the values
+        already queued for the old rows are applied."""
+        fams = len(FaultPV)
+        kept = []
+        for row, new in enumerate(diff.fault_rows):
+            pvs = self.pvs[row * fams:(row + 1) * fams]
+            if new is None:
+                for pv in pvs:
+                    pv.disconnect()
+            else:
+                kept += pvs
+
+        with self.row_lock:
+            QCoreApplication.sendPostedEvents(self.tbl_model, QEvent.MetaCall)
+            self.monitor_filter.remap(diff.fault_rows)
+            self.conn_tracker.remap(diff.fault_rows, len(self.model.faults))
+            self.tbl_model.apply_reload(self.model, diff)
+            self.pvs = kept
+            self.fault_rows = {fault.name: row for row, fault in
+                               enumerate(self.model.faults[:len(kept) // fams])}
+        self.add_fault_pvs(len(kept) // fams)
+
+    def send_new_val(self, value, fault: str, fam: FaultPV, **kw):
+        """Function to pass the new value through the monitor filter,
+        which emits the appropriate signal for the PV family."""
+        with self.row_lock:
+            row = self.fault_rows.get(fault)
+            if row is not None:
+                self.monitor_filter.push(fam, value, row)
+
+    def send_state(self, value, row: int):
+        """Pass a state that got through the monitor filter on to the
+        connection tracker, which holds back TIMEOUTs."""
+        self.conn_tracker.push_state(value, row)
+
+    def send_conn(self, conn: bool, fault: str, fam: FaultPV, pv=None, **kw):
+        """Function to pass a PV's connection change to the connection
+        tracker, with the PV's IOC host."""
+        host = pv.host if conn and pv is not None else None
+        with self.row_lock:
+            row = self.fault_rows.get(fault)
+            if row is not None:
+                self.conn_tracker.push_conn(row, fam, conn, host)
 
-    def send_new_val(self, value, pvname: str, row: int, **kw):
-        """Function to emit the appropriate signal based on the pvname."""
-        if pvname[-3:] == "FLT":
-            self.tbl_model.state_signal.emit(value, row)
-        elif pvname[-6:] == "SCBYPS":
-            self.tbl_model.byp_signal.emit(value, row)
-        elif pvname[-9:] == "SCBYP_END":
-            self.tbl_model.byp_exp_signal.emit(value, row)
-        elif pvname[-7:] == "IGNORED":
-            self.tbl_model.ign_signal.emit(value, row)
-        elif pvname[-6:] == "ACTIVE":
-            self.tbl_model.act_signal.emit(value, row)
+    def send_max_permit(self, value, **kw):
+        """Function to emit the max permit signal in the model."""
+        if value is not None:
+            self.tbl_model.max_permit_signal.emit(value)
 
     @Slot(int)
     def show_inactive(self, state):
@@ -177,7 +177,7 @@ class SelectionDetailsMixin:
             for d in dev.card.devices:
                 if d is dev:
                     continue
-                bpm2 = self.model.name.getDeviceName(d)
+                bpm2 = d.mps_name
 
         mac = {}
         mac['MPS_PREFIX'] = dev.card.get_pv_name()
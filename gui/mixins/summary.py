@@ -1,8 +1,8 @@
 from qtpy.QtCore import (Qt, Slot, QPoint)
-from qtpy.QtWidgets import (QHeaderView, QAction, QMenu, QTableView, QGraphicsOpacityEffect)
-from models_pkg.logic_model import MPSSortFilterModel
-from epics import caget
-from epics import PV
+from qtpy.QtWidgets import (QHeaderView, QAction, QMenu, QTableView, QGraphicsOpacityEffect,
+                            QHBoxLayout, QCheckBox, QLabel)
+from models_pkg.logic_model import MPSViewModel
+from models_pkg.tpg_model import TPGModeTable
 
 
 class SummaryMixin:
@@ -10,13 +10,13 @@ class SummaryMixin:
         """Initializer for everything in the Summary tab: Summary table,
         Bypass table, and Custom Context menus."""
         # Initialize the Summary Table and Headers
-        self.summ_model = MPSSortFilterModel(self)
+        self.summ_model = MPSViewModel(self)
         self.summ_model.setSourceModel(self.tbl_model)
         self.summ_model.setFilterByColumn(1, "True")
         self.summ_model.setFilterByColumn(self.tbl_model.iind, "Not Ignored")
         self.summ_model.setFilterByColumn(self.tbl_model.aind, "Y")
         self.ui.summ_tbl.setModel(self.summ_model)
-        for i in range(self.tbl_model.conind[0], self.tbl_model.aind + 1):
+        for i in range(self.tbl_model.cind, self.tbl_model.aind + 1):
             self.ui.summ_tbl.hideColumn(i)
         self.ui.summ_tbl.sortByColumn(2, Qt.AscendingOrder)
         self.ui.summ_tbl.setItemDelegate(self.delegate)
@@ -57,19 +57,21 @@ class SummaryMixin:
                 'SC_SXR':   self.ui.permit_SXR,
                 'SC_LESA':  self.ui.permit_LESA}
 
-            # need this initial call with direct caget, otherwise the initial
-            # run of the callback will not connect to the 'DSTxx_NAME' PVs
-            self.arrange_cud(value=caget('TPG:SYS0:1:MODE'))
-            self.tpg_mode = PV('TPG:SYS0:1:MODE', callback=self.arrange_cud)
+            # Mode and destination name PVs are monitored up front, so
+            # arrange_cud never waits on the network
+            self.tpg_table = TPGModeTable(self, self.TPG_mode_destination_preference)
+            self.tpg_table.changed.connect(self.arrange_cud)
+            self.arrange_cud()
 
         # Initialize the Bypass Table and Headers
-        self.byp_model = MPSSortFilterModel(self)
+        self.byp_model = MPSViewModel(self)
         self.byp_model.setSourceModel(self.tbl_model)
         self.byp_model.setFilterByColumn(self.tbl_model.bind, "Y")
         self.ui.byp_tbl.setModel(self.byp_model)
         for i in range(2, self.tbl_model.aind + 1):
             self.ui.byp_tbl.hideColumn(i)
         self.ui.byp_tbl.showColumn(self.tbl_model.beind)
+        self.ui.byp_tbl.showColumn(self.tbl_model.brind)
         self.ui.byp_tbl.sortByColumn(self.tbl_model.beind, Qt.AscendingOrder)
         self.ui.byp_tbl.setItemDelegate(self.delegate)
 
@@ -81,13 +83,92 @@ class SummaryMixin:
             hdr.setFont(font)
             hdr.setFixedHeight(40)
 
+        # Show how many bypasses are about to expire above the table
+        self.byp_lbl_txt = self.ui.byp_lbl.text()
+        self.tbl_model.byp_schedule.alerts_changed.connect(self.show_byp_alerts)
+        self.tbl_model.byp_schedule.expiring.connect(self.log_byp_expiring)
+
         # Initialize the QAction used by the conext menus
         if not cud_mode:
+            self.outage_init()
+
             self.selected_fault = None
             self.action = QAction("Open fault in Logic tab", self)
             self.menu = QMenu(self)
             self.menu.addAction(self.action)
 
+    def outage_init(self):
+        """Faults that timed out because their application card is
+        offline are hidden from the Summary table and counted under the
+        card instead."""
+        self.collapse_chck = QCheckBox("Collapse Faults of Offline Apps")
+        self.collapse_chck.setChecked(True)
+        self.outage_lbl = QLabel()
+        self.outage_lbl.setWordWrap(True)
+        self.outage_lbl.setStyleSheet("color: rgb(235, 0, 235);")
+
+        # Faults whose PVs disconnected, counted per IOC host
+        self.disconn_lbl = QLabel()
+        self.disconn_lbl.setWordWrap(True)
+
+        lyt = QHBoxLayout()
+        lyt.addWidget(self.collapse_chck)
+        lyt.addWidget(self.outage_lbl, 1)
+        self.ui.summ_frame.layout().insertLayout(1, lyt)
+        self.ui.summ_frame.layout().insertWidget(2, self.disconn_lbl)
+        self.disconn_lbl.hide()
+
+        self.collapse_outages(True)
+        self.show_outages()
+
+    @Slot(bool)
+    def collapse_outages(self, checked: bool):
+        """Hide or show the faults that depend on an offline app."""
+        if checked:
+            self.summ_model.setFilterPredicate(
+                "outage", lambda row: not self.tbl_model.dependent_fault(row))
+        else:
+            self.summ_model.removeFilterPredicate("outage")
+        self.show_outages()
+
+    @Slot()
+    def show_outages(self):
+        """List the offline apps and how many faults each one hides."""
+        outages = self.tbl_model.outages()
+        if not outages:
+            self.outage_lbl.setText("")
+            return
+        shown = "hidden" if self.collapse_chck.isChecked() else "shown"
+        self.outage_lbl.setText(f"Offline apps (timed out faults {shown}): " + ", ".join(
+            f"{self.tbl_model.card_names[c]} - {num} faults"
+            for c, num in sorted(outages.items(), key=lambda o: -o[1])))
+
+    @Slot()
+    def show_disconnects(self):
+        """Show how many faults are disconnected on each IOC host."""
+        rollup = self.conn_tracker.rollup()
+        self.disconn_lbl.setVisible(bool(rollup))
+        self.disconn_lbl.setText("; ".join(f"{num} faults on IOC {host} disconnected"
+                                           for host, num in rollup))
+
+    @Slot()
+    def show_byp_alerts(self):
+        """Update the Bypass table's label with the number of bypasses
+        expiring within the alert lead time."""
+        schedule = self.tbl_model.byp_schedule
+        num = len(schedule.alerted)
+        if not num:
+            self.ui.byp_lbl.setText(self.byp_lbl_txt)
+            return
+        self.ui.byp_lbl.setText(f"{self.byp_lbl_txt} ({num} expiring within "
+                                f"{schedule.alert_lead / 60:.0f} min)")
+
+    @Slot(int)
+    def log_byp_expiring(self, row: int):
+        """Log a warning when a fault's bypass is about to expire."""
+        self.logger.warning(f"Bypass of {self.model.faults[row].name} expires at "
+                            f"{self.tbl_model._data[row][self.tbl_model.beind]}")
+
     def summ_connections(self):
         """Establish connections for the context menus and their action."""
         self.ui.summ_tbl.customContextMenuRequested.connect(
@@ -95,6 +176,9 @@ class SummaryMixin:
         self.ui.byp_tbl.customContextMenuRequested.connect(
             self.custom_context_menu)
         self.action.triggered.connect(self.logic_select)
+        self.collapse_chck.toggled.connect(self.collapse_outages)
+        self.tbl_model.outages_changed.connect(self.show_outages)
+        self.conn_tracker.changed.connect(self.show_disconnects)
 
     def logic_select(self):
         """Set the selected fault in the Logic Tab to open the
@@ -120,11 +204,17 @@ class SummaryMixin:
                                    .index(source_index.row(), 0))
             self.menu.popup(table.viewport().mapToGlobal(pos))
 
-    def arrange_cud(self, value, **kw):
+    @Slot()
+    def arrange_cud(self):
         """
-        callback for changes to the "TPG mode" -- updates the sorting priority
-        of the summary table and shades permit widgets accordingly
+        called when the "TPG mode" or its destinations change -- updates the
+        sorting priority of the summary table and shades permit widgets
+        accordingly
         """
+        value = self.tpg_table.mode
+        if value not in self.TPG_mode_destination_preference:
+            return
+
         # sort by "priority" destination
         priority_destination = self.TPG_mode_destination_preference[value]
         self.ui.summ_tbl.sortByColumn(priority_destination, Qt.AscendingOrder)
@@ -136,11 +226,7 @@ class SummaryMixin:
             self.ui.summ_tbl.showColumn(3)
 
         # shade permit boxes for unsupported destinations
-        allowed_destinations = []
-        for i in range(6):
-            dest_name = caget(f'TPG:SYS0:1:{value}:DST0{i}_NAME')
-            if dest_name != 'NULL':
-                allowed_destinations.append(dest_name)
+        allowed_destinations = self.tpg_table.allowed_dests(value)
 
         for dest_name, dest_permit_obj in self.dest_permit_map.items():
             permit_effect = None
@@ -1,19 +1,60 @@
-from qtpy.QtCore import (Qt, Slot, Signal, QModelIndex, QAbstractTableModel)
+from qtpy.QtCore import (Qt, Slot, Signal, QModelIndex, QAbstractTableModel,
+                         QAbstractItemModel)
 from qtpy.QtWidgets import QStyledItemDelegate
-from sqlalchemy.orm import (sessionmaker, scoped_session)
 from pydm.widgets import PyDMRelatedDisplayButton
 from enums import Statuses
+from pv_cache import app_pv
+from models_pkg.logic_model import row_ranges
+
+
+class RollupNode:
+    """A group, link node, crate, or app in the AppStatusTable's health
+    index. counts holds the number of apps below the node that are
+    online, offline, and disconnected. Apps have app_row set to their
+    row in the table."""
+    __slots__ = ("name", "parent", "children", "row", "app_row", "counts", "keys")
+
+    def __init__(self, name: str, parent=None, app_row: int = None):
+        self.name = name
+        self.parent = parent
+        self.children = []
+        self.keys = {}
+        self.row = 0
+        self.app_row = app_row
+        self.counts = [0, 0, 0]
+
+    def child(self, key, name: str):
+        """Return the child for key, creating it if needed."""
+        node = self.keys.get(key)
+        if node is None:
+            node = self.keys[key] = RollupNode(name, self)
+            self.children.append(node)
+        return node
+
+    def sort(self):
+        """Sort the children by name and number their rows."""
+        self.children.sort(key=lambda n: (len(n.name), n.name))
+        for i, node in enumerate(self.children):
+            node.row = i
+            node.sort()
 
 
 class AppStatusTable(QAbstractTableModel):
     hdr_lst = ["LN", "Group", "Loc", "Slot", "AID", "Type", "Status", "Group Display"]
 
     status_signal = Signal(int, int)
+    rollup_changed = Signal(int)
+
+    # Emitted around rebuilding the health index after a reload
+    index_about_to_reset = Signal()
+    index_reset = Signal()
 
-    def __init__(self, parent, sessionmaker: sessionmaker, apps):
+    # Index of each status in RollupNode.counts
+    count_ind = {Statuses.GRN: 0, Statuses.RED: 1, Statuses.WHT: 2}
+
+    def __init__(self, parent, apps):
         super(AppStatusTable, self).__init__(parent)
         self.apps = apps
-        self.session = scoped_session(sessionmaker)
 
         self.lnind = self.hdr_lst.index("LN")
         self.gind = self.hdr_lst.index("Group")
@@ -23,6 +64,12 @@ class AppStatusTable(QAbstractTableModel):
         self._data = []
         self.status = []
         self.channels = []
+
+        # Health index: group -> link node -> crate -> app. ancestors
+        # holds the group, link node, and crate nodes of every row
+        self.root = RollupNode("")
+        self.leaves = []
+        self.ancestors = []
         self.set_data()
 
         self.status_signal.connect(self.set_status)
@@ -64,28 +111,110 @@ class AppStatusTable(QAbstractTableModel):
     def set_data(self):
         """Set initial data for every app."""
         for app in self.apps:
-            ch = f"{app.link_node.get_cn_prefix()}:APP{app.number}_STATUS"
-
-            lst = [ch] * len(self.hdr_lst)
-            lst[0] = app.link_node.lcls1_id
-            lst[1] = app.link_node.group
-            lst[2] = app.crate.location
-            lst[3] = app.slot_number if app.slot_number != 1 else "RTM"
-            lst[4] = app.number
-            lst[5] = app.type.name
-            lst[7] = (f"$PHYSICS_TOP/mps_configuration/current/display/groups/LinkNodeGroup{app.link_node.group}.ui",
-                      f"Group {app.link_node.group}...")
-
-            self._data.append(lst)
-            self.status.append(Statuses.WHT)
-            self.channels.append(ch)
+            self.add_row(app)
+        self.root.sort()
+
+    def add_row(self, app):
+        """Append a disconnected app's row and add it to the health index."""
+        ch = app_pv(app)
+        self._data.append([ch] * len(self.hdr_lst))
+        self.status.append(Statuses.WHT)
+        self.channels.append(ch)
+        self.set_app(len(self._data) - 1, app)
+        self.index_app(app, len(self._data) - 1)
+
+    def set_app(self, row: int, app):
+        """Set the cells of a row that come from the database."""
+        lst = self._data[row]
+        lst[0] = app.link_node.lcls1_id
+        lst[1] = app.link_node.group
+        lst[2] = app.crate.location
+        lst[3] = app.slot_number if app.slot_number != 1 else "RTM"
+        lst[4] = app.number
+        lst[5] = app.type.name
+        lst[7] = (f"$PHYSICS_TOP/mps_configuration/current/display/groups/LinkNodeGroup{app.link_node.group}.ui",
+                  f"Group {app.link_node.group}...")
+
+    def index_app(self, app, row: int):
+        """Add an app to the health index as disconnected."""
+        group = self.root.child(app.link_node.group, f"Group {app.link_node.group}")
+        node = group.child(app.link_node.id, f"LN {app.link_node.lcls1_id}")
+        crate = node.child(app.crate.id, app.crate.location)
+
+        slot = app.slot_number if app.slot_number != 1 else "RTM"
+        leaf = RollupNode(f"Slot {slot}: {app.type.name} (AID {app.number})", crate, row)
+        crate.children.append(leaf)
+
+        self.leaves.append(leaf)
+        self.ancestors.append((group, node, crate))
+        for n in (group, node, crate, self.root):
+            n.counts[self.count_ind[Statuses.WHT]] += 1
+
+    def recount(self, row: int, old: Statuses, new: Statuses):
+        """Move an app from one status count to another in its crate,
+        link node, and group."""
+        old = self.count_ind[old]
+        new = self.count_ind[new]
+        if old == new:
+            return
+        for node in self.ancestors[row] + (self.root,):
+            node.counts[old] -= 1
+            node.counts[new] += 1
+
+    def apply_reload(self, apps: list, rows: list):
+        """Switch to the application cards of a reloaded database. apps
+        keeps the order of the rows they replace, followed by the added
+        apps, and rows[old_row] is the app's new row or None if it was
+        removed. Removed and added apps are removed and inserted as rows
+        and the health index is rebuilt, keeping every app's status."""
+        self.index_about_to_reset.emit()
+        removed = [row for row, new in enumerate(rows) if new is None]
+        for first, last in reversed(row_ranges(removed)):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._data[first:last + 1]
+            del self.status[first:last + 1]
+            del self.channels[first:last + 1]
+            self.endRemoveRows()
+
+        self.apps = apps
+        self.root = RollupNode("")
+        self.leaves = []
+        self.ancestors = []
+        for row in range(len(self._data)):
+            self.set_app(row, self.apps[row])
+            self.index_app(self.apps[row], row)
+            self.recount(row, Statuses.WHT, self.status[row])
+        if self._data:
+            self.dataChanged.emit(self.index(0, 0),
+                                  self.index(len(self._data) - 1, len(self.hdr_lst) - 1))
+
+        added = self.apps[len(self._data):]
+        if added:
+            first = len(self._data)
+            self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+            for app in added:
+                self.add_row(app)
+            self.endInsertRows()
+        self.root.sort()
+        self.index_reset.emit()
 
     @Slot(int, int)
     def set_status(self, value: int, row: int):
-        """Set the App's Status based on the value passed."""
-        self._data[row][self.sind] = "ONLINE" if value else "OFFLINE"
-        self.status[row] = Statuses.GRN if value else Statuses.RED
+        """Set the App's Status based on the value passed. A value of -1
+        means the status PV disconnected. The counts of the app's crate,
+        link node, and group are updated in place."""
+        if value == -1:
+            txt, status = "DISCONNECTED", Statuses.WHT
+        else:
+            txt, status = ("ONLINE", Statuses.GRN) if value else ("OFFLINE", Statuses.RED)
+        if self._data[row][self.sind] == txt:
+            return
+
+        self.recount(row, self.status[row], status)
+        self._data[row][self.sind] = txt
+        self.status[row] = status
         self.dataChanged.emit(self.index(row, self.sind), self.index(row, self.sind))
+        self.rollup_changed.emit(row)
 
     def less_than(self, left: QModelIndex, right: QModelIndex):
         """Called by MPSSortFilterProxyModel to sort rows based on the
@@ -118,6 +247,102 @@ class AppStatusTable(QAbstractTableModel):
         return self.channels[index.row()]
 
 
+class AppTreeModel(QAbstractItemModel):
+    """Tree view of an AppStatusTable's health index. Groups, link nodes,
+    and crates show how many of their apps are online, offline, and
+    disconnected. Only the changed app and its ancestors are refreshed
+    when an app's status changes."""
+    hdr_lst = ["Name", "Status", "Online", "Offline", "Disconnected"]
+
+    def __init__(self, parent, table: AppStatusTable):
+        super(AppTreeModel, self).__init__(parent)
+        self.table = table
+        self.table.rollup_changed.connect(self.app_changed)
+        self.table.index_about_to_reset.connect(self.beginResetModel)
+        self.table.index_reset.connect(self.endResetModel)
+
+    def node(self, index: QModelIndex) -> RollupNode:
+        """Return the RollupNode for an index."""
+        return index.internalPointer() if index.isValid() else self.table.root
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()):
+        """Return the index of a parent's child."""
+        children = self.node(parent).children
+        if not 0 <= row < len(children):
+            return QModelIndex()
+        return self.createIndex(row, column, children[row])
+
+    def parent(self, index: QModelIndex):
+        """Return the index of the node's parent."""
+        parent = self.node(index).parent
+        if parent is None or parent is self.table.root:
+            return QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()):
+        """Return the number of children of the node."""
+        if parent.column() > 0:
+            return 0
+        return len(self.node(parent).children)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()):
+        """Return the number of columns in the model."""
+        return len(self.hdr_lst)
+
+    def rollup(self, node: RollupNode) -> tuple:
+        """Return the status text and status for a node."""
+        if node.app_row is not None:
+            return (self.table._data[node.app_row][self.table.sind],
+                    self.table.status[node.app_row])
+
+        online, offline, disconnected = node.counts
+        if offline and not online:
+            return ("OFFLINE", Statuses.RED)
+        elif offline:
+            return ("DEGRADED", Statuses.YEL)
+        elif disconnected:
+            return ("DISCONNECTED", Statuses.WHT)
+        return ("ONLINE", Statuses.GRN)
+
+    def data(self, index: QModelIndex, role: Qt.ItemDataRole):
+        """Return the node's name, status, and counts."""
+        if not index.isValid():
+            return
+        node = index.internalPointer()
+        col = index.column()
+        if role == Qt.DisplayRole:
+            if col == 0:
+                return node.name
+            elif col == 1:
+                return self.rollup(node)[0]
+            elif node.app_row is None:
+                return str(node.counts[col - 2])
+        elif role == Qt.TextAlignmentRole and col > 0:
+            return Qt.AlignCenter
+        elif role == Qt.ForegroundRole:
+            if col == 1:
+                return self.rollup(node)[1].brush()
+            elif col == 3 and node.app_row is None and node.counts[1]:
+                return Statuses.RED.brush()
+            return Statuses.GRN.brush()
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: Qt.ItemDataRole):
+        """Set the horizontal header's text."""
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.hdr_lst[section]
+
+    @Slot(int)
+    def app_changed(self, row: int):
+        """Refresh the app's row and its crate, link node, and group."""
+        leaf = self.table.leaves[row]
+        self.dataChanged.emit(self.createIndex(leaf.row, 1, leaf),
+                              self.createIndex(leaf.row, 1, leaf))
+        for node in self.table.ancestors[row]:
+            self.dataChanged.emit(self.createIndex(node.row, 1, node),
+                                  self.createIndex(node.row, len(self.hdr_lst) - 1, node))
+
+
 class RelatedDisplayDelegate(QStyledItemDelegate):
     """Customized QStyledItemDelegate to allow the user to open an
     associated display. Model's data should be in the form of:
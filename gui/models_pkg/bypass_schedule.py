@@ -0,0 +1,161 @@
+from time import (time, mktime, strptime)
+from heapq import (heappush, heappop, heapify)
+from qtpy.QtCore import (QObject, QTimer, Signal, Slot)
+
+# Formats tried, in order, when _SCBYP_END isn't an epoch timestamp
+EXPIRY_FORMATS = ("%Y-%m-%d %H:%M:%S",
+                  "%Y-%m-%dT%H:%M:%S",
+                  "%Y-%m-%d %H:%M",
+                  "%m/%d/%Y %H:%M:%S",
+                  "%m/%d/%y %H:%M:%S",
+                  "%a %b %d %H:%M:%S %Y",
+                  "%b %d, %Y %H:%M:%S")
+
+
+def parse_expiry(value):
+    """Return a bypass expiration as seconds since the epoch, or None if
+    it can't be parsed. Accepts epoch timestamps and the date formats in
+    EXPIRY_FORMATS, ignoring fractional seconds."""
+    try:
+        stamp = float(value)
+    except (TypeError, ValueError):
+        pass
+    else:
+        return stamp if stamp > 0 else None
+
+    text = str(value).strip().split('.')[0]
+    for fmt in EXPIRY_FORMATS:
+        try:
+            return mktime(strptime(text, fmt))
+        except ValueError:
+            continue
+    return None
+
+
+def countdown(seconds: float) -> tuple:
+    """Return the text shown for the time left on a bypass, and the
+    number of seconds until that text changes (None once expired). The
+    text only shows seconds in the last hour, so rows further from
+    expiring change at most once a minute."""
+    if seconds <= 0:
+        return ("Expired", None)
+
+    sec = int(seconds)
+    if sec >= 86400:
+        txt, unit = f"{sec // 86400}d {sec % 86400 // 3600}h", 3600
+    elif sec >= 3600:
+        txt, unit = f"{sec // 3600}h {sec % 3600 // 60:02d}m", 60
+    else:
+        txt, unit = f"{sec // 60}m {sec % 60:02d}s", 1
+    return (txt, seconds % unit or unit)
+
+
+class BypassSchedule(QObject):
+    """Keeps the countdown text of every bypassed fault with an
+    expiration. Rows are kept in a min-heap ordered by the next time
+    their text changes (or their alert is due), and a single timer wakes
+    up for the earliest one, so only rows whose countdown changes are
+    updated. Heap entries are invalidated lazily when a row's expiration
+    changes.
+
+    changed is emitted with a row whose text changed, expiring when a
+    row comes within alert_lead seconds of its expiration, and
+    alerts_changed whenever the set of expiring rows changes. Rows leave
+    that set once they expire."""
+    changed = Signal(int)
+    expiring = Signal(int)
+    alerts_changed = Signal()
+
+    def __init__(self, parent, rows: int, alert_lead: float = 1800):
+        super(BypassSchedule, self).__init__(parent)
+        self.alert_lead = alert_lead
+        self.stamps = [None] * rows
+        self.text = [""] * rows
+        self.due = [None] * rows
+        self.alerted = set()
+        self.heap = []
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.tick)
+
+    def set_expiry(self, row: int, stamp: float = None):
+        """Set or clear (stamp=None) the expiration of a row."""
+        if self.stamps[row] == stamp:
+            return
+        self.stamps[row] = stamp
+        if row in self.alerted:
+            self.alerted.discard(row)
+            self.alerts_changed.emit()
+
+        if stamp is None:
+            self.due[row] = None
+            self.text[row] = ""
+            self.changed.emit(row)
+            return
+        self.refresh(row, time())
+        self.reschedule()
+
+    def remap(self, rows: list, count: int):
+        """Renumber the rows after faults are added or removed.
+        rows[old_row] is the new row, or None for a removed fault, and
+        count is the new number of rows."""
+        stamps, text, due = [None] * count, [""] * count, [None] * count
+        for old, new in enumerate(rows):
+            if new is not None:
+                stamps[new], text[new], due[new] = self.stamps[old], self.text[old], self.due[old]
+        self.stamps, self.text, self.due = stamps, text, due
+
+        alerted = {rows[row] for row in self.alerted if rows[row] is not None}
+        changed = len(alerted) != len(self.alerted)
+        self.alerted = alerted
+        self.heap = [(d, row) for row, d in enumerate(self.due) if d is not None]
+        heapify(self.heap)
+        self.reschedule()
+        if changed:
+            self.alerts_changed.emit()
+
+    def refresh(self, row: int, now: float):
+        """Update a row's text and alert, and push its next due time."""
+        left = self.stamps[row] - now
+        if 0 < left <= self.alert_lead and row not in self.alerted:
+            self.alerted.add(row)
+            self.expiring.emit(row)
+            self.alerts_changed.emit()
+        elif left <= 0 and row in self.alerted:
+            # Expired bypasses are no longer expiring. Done before the
+            # text changes so the cell is repainted without the highlight
+            self.alerted.discard(row)
+            self.alerts_changed.emit()
+
+        txt, next_change = countdown(left)
+        if txt != self.text[row]:
+            self.text[row] = txt
+            self.changed.emit(row)
+
+        due = None if next_change is None else now + next_change
+        if row not in self.alerted and left > self.alert_lead:
+            alert_at = self.stamps[row] - self.alert_lead
+            due = alert_at if due is None else min(due, alert_at)
+        self.due[row] = due
+        if due is not None:
+            heappush(self.heap, (due, row))
+
+    @Slot()
+    def tick(self):
+        """Refresh every row that is due, then wait for the next one."""
+        now = time()
+        while self.heap and self.heap[0][0] <= now:
+            due, row = heappop(self.heap)
+            if self.due[row] == due:
+                self.refresh(row, now)
+        self.reschedule()
+
+    def reschedule(self):
+        """Start the timer for the earliest valid heap entry."""
+        while self.heap and self.due[self.heap[0][1]] != self.heap[0][0]:
+            heappop(self.heap)
+        if not self.heap:
+            self.timer.stop()
+            return
+        self.timer.start(max(0, int((self.heap[0][0] - time()) * 1000) + 1))
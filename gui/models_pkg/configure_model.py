@@ -1,7 +1,7 @@
 from typing import List
 from qtpy.QtCore import (Qt, Signal, QModelIndex, QAbstractTableModel)
 from enums import ConfFiles
-from mps_database.models import Device
+from models_pkg.db_snapshot import Device
 
 
 class ConfigureTableModel(QAbstractTableModel):
@@ -12,7 +12,9 @@ class ConfigureTableModel(QAbstractTableModel):
     def __init__(self, parent, _data: List[Device], save_type=False):
         super(ConfigureTableModel, self).__init__(parent)
         self._data = _data
+        self.positions = {d.id: i for i, d in enumerate(self._data)}
 
+        self.save_type = save_type
         self.type_dict = {}
         if save_type:
             for d in self._data:
@@ -59,17 +61,34 @@ class ConfigureTableModel(QAbstractTableModel):
 
     def add_datum(self, datum: Device):
         """Add a single device to the model."""
-        if datum in self._data:
+        self.add_data([datum])
+
+    def add_data(self, data: List[Device]):
+        """Add multiple devices to the model with one row insertion and
+        one table_changed emission. Devices already in the model are
+        skipped."""
+        new = []
+        for datum in data:
+            if datum.id in self.positions:
+                continue
+            self.positions[datum.id] = len(self._data) + len(new)
+            new.append(datum)
+        if not new:
             return
 
         ind = len(self._data)
-        self.beginInsertRows(QModelIndex(), ind, ind)
-        self._data.append(datum)
+        self.beginInsertRows(QModelIndex(), ind, ind + len(new) - 1)
+        self._data.extend(new)
         self.endInsertRows()
 
-        self.add_type(datum.device_type.name)
+        for datum in new:
+            self.add_type(datum.device_type.name)
         self.table_changed.emit(self.table_type())
 
+    def contains(self, datum: Device) -> bool:
+        """Return whether the device is in the model."""
+        return datum.id in self.positions
+
     def remove_type(self, dev_type: str):
         """Remove the given device type from the type dictionary."""
         if dev_type not in self.type_dict:
@@ -79,10 +98,14 @@ class ConfigureTableModel(QAbstractTableModel):
             del self.type_dict[dev_type]
 
     def remove_datum(self, index: int):
-        """Remove a single device from the model."""
+        """Remove a single device from the model. The other devices keep
+        their order, which numbers the devices in the BPM embed."""
         datum = self._data[index]
         self.beginRemoveRows(QModelIndex(), index, index)
         del self._data[index]
+        del self.positions[datum.id]
+        for row in range(index, len(self._data)):
+            self.positions[self._data[row].id] = row
         self.endRemoveRows()
 
         self.remove_type(datum.device_type.name)
@@ -96,11 +119,25 @@ class ConfigureTableModel(QAbstractTableModel):
         ind = len(self._data) - 1
         self.beginRemoveRows(QModelIndex(), 0, ind)
         self._data = []
+        self.positions.clear()
         self.endRemoveRows()
 
         self.type_dict.clear()
         self.table_changed.emit(ConfFiles['DEF'])
 
+    def set_data(self, data: List[Device]):
+        """Replace every device in the model, e.g. after the database is
+        reloaded."""
+        self.beginResetModel()
+        self._data = list(data)
+        self.positions = {d.id: i for i, d in enumerate(self._data)}
+        self.type_dict.clear()
+        if self.save_type:
+            for d in self._data:
+                self.add_type(d.device_type.name)
+        self.endResetModel()
+        self.table_changed.emit(self.table_type())
+
     def get_device(self, index: int):
         """Return the requested device."""
         return self._data[index]
@@ -0,0 +1,123 @@
+from threading import Lock
+from qtpy.QtCore import (QObject, QTimer, Signal, Slot)
+from enums import FaultPV
+
+
+class ConnectionTracker(QObject):
+    """Aggregates the connection events of every fault's PVs, and the
+    faults going to TIMEOUT, per IOC host. Events arrive on the CA
+    threads and are applied in the GUI thread by flush() as one grouped
+    update per interval, so an IOC restart costs a single model update
+    instead of one per fault.
+
+    A fault is disconnected while any of its PVs is. changed is emitted
+    after every flush that changed the disconnected faults."""
+    changed = Signal()
+
+    def __init__(self, parent, model, monitor_filter, interval: float = 0.25):
+        super(ConnectionTracker, self).__init__(parent)
+        self.model = model
+        self.monitor_filter = monitor_filter
+
+        rows = len(self.model.model.faults)
+        self.down_fams = [set() for _ in range(rows)]
+        self.hosts = [None] * rows
+        self.down = {}
+        self.down_host = {}
+
+        self._lock = Lock()
+        self._events = []
+        self._timeouts = set()
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.flush)
+        self.timer.start(int(interval * 1000))
+
+    def push_conn(self, row: int, fam: FaultPV, conn: bool, host: str = None):
+        """Called from the PV connection callbacks."""
+        with self._lock:
+            self._events.append((row, fam, conn, host))
+
+    def push_state(self, value: int, row: int):
+        """Called with the values that passed the MonitorFilter. TIMEOUTs
+        are held for the next flush, other states are sent right away and
+        cancel a held TIMEOUT for the same fault."""
+        with self._lock:
+            if value == -1:
+                self._timeouts.add(row)
+                return
+            self._timeouts.discard(row)
+        self.model.state_signal.emit(value, row)
+
+    @Slot()
+    def flush(self):
+        """Apply the held events as grouped model updates."""
+        with self._lock:
+            events, self._events = self._events, []
+            timeouts, self._timeouts = self._timeouts, set()
+
+        was_down = {}
+        for row, fam, conn, host in events:
+            was_down.setdefault(row, bool(self.down_fams[row]))
+            if conn:
+                self.down_fams[row].discard(fam)
+                if host and (fam == FaultPV.STATE or self.hosts[row] is None):
+                    self.hosts[row] = host.split(':')[0]
+            else:
+                self.down_fams[row].add(fam)
+
+        went_down, came_up = [], []
+        for row, down in was_down.items():
+            if down == bool(self.down_fams[row]):
+                continue
+            if down:
+                came_up.append(row)
+                host = self.down_host.pop(row)
+                self.down[host].discard(row)
+                if not self.down[host]:
+                    del self.down[host]
+            else:
+                went_down.append(row)
+                host = self.down_host[row] = self.hosts[row] or "unknown IOC"
+                self.down.setdefault(host, set()).add(row)
+
+        if went_down:
+            # Values after reconnecting must reach the model even if
+            # they equal the last value sent before the disconnect
+            self.monitor_filter.forget(went_down)
+            self.model.set_disconnected(sorted(went_down))
+        if timeouts:
+            self.model.set_states(sorted(timeouts), -1)
+        if went_down or came_up:
+            self.changed.emit()
+
+    def remap(self, rows: list, count: int):
+        """Renumber the rows after faults are added or removed.
+        rows[old_row] is the new row, or None for a removed fault, and
+        count is the new number of rows. Held events of removed faults
+        are dropped."""
+        down_fams = [set() for _ in range(count)]
+        hosts = [None] * count
+        for old, new in enumerate(rows):
+            if new is not None:
+                down_fams[new], hosts[new] = self.down_fams[old], self.hosts[old]
+        self.down_fams, self.hosts = down_fams, hosts
+
+        self.down_host = {rows[row]: host for row, host in self.down_host.items()
+                          if rows[row] is not None}
+        self.down = {}
+        for row, host in self.down_host.items():
+            self.down.setdefault(host, set()).add(row)
+
+        with self._lock:
+            self._events = [(rows[row], fam, conn, host)
+                            for row, fam, conn, host in self._events
+                            if rows[row] is not None]
+            self._timeouts = {rows[row] for row in self._timeouts if rows[row] is not None}
+        self.changed.emit()
+
+    def rollup(self) -> list:
+        """Return (host, number of disconnected faults) for every IOC
+        host with disconnected faults, largest first."""
+        return sorted(((host, len(rows)) for host, rows in self.down.items()),
+                      key=lambda d: -d[1])
@@ -0,0 +1,239 @@
+from os import (path, stat)
+from glob import glob
+from logging import getLogger
+from threading import Thread
+from qtpy.QtCore import (QObject, QTimer, QFileSystemWatcher, Signal, Slot)
+from pv_cache import (PVManifest, app_pv, file_hash, write_cache)
+from models_pkg.mps_model import MPSModel
+from models_pkg.logic_model import LogicTableModel
+
+
+def db_signature(filename: str):
+    """Return what identifies a version of a database file (its real
+    path, modification time, and size), or None if it doesn't exist."""
+    try:
+        st = stat(filename)
+    except OSError:
+        return None
+    return (path.realpath(filename), st.st_mtime, st.st_size)
+
+
+def fault_info(model: MPSModel, fault) -> tuple:
+    """Return everything shown for a fault, to find changed faults."""
+    dev = model.fault_to_dev(fault.fault)
+    states = tuple((st.device_state.value, st.device_state.description,
+                    tuple((cl.beam_destination.name, cl.beam_class.name)
+                          for cl in st.allowed_classes))
+                   for st in fault.fault.states)
+    return (fault.description, states, dev.area,
+            app_pv(dev.card) if dev.card is not None else None,
+            tuple(ign.condition.name for ign in dev.ignore_conditions))
+
+
+def app_info(app) -> tuple:
+    """Return everything shown for an application card."""
+    return (app.link_node.lcls1_id, app.link_node.group, app.crate.location,
+            app.slot_number, app.type.name)
+
+
+def columns(model: MPSModel) -> list:
+    """Return the destination and condition columns of a model's
+    LogicTableModel."""
+    cols = list(model.dest_lst)
+    for con in model.db.conditions:
+        name = LogicTableModel.con_name(con)
+        if name not in cols:
+            cols.append(name)
+    return cols
+
+
+def match_rows(old: list, new: list, key) -> tuple:
+    """Match two lists by key. Returns the new items in row order (the
+    matched items in the old order, followed by the added items) and
+    the new row of every old item, or None if it was removed."""
+    new_keys = {key(item): item for item in new}
+    old_keys = set()
+    items, rows = [], []
+    for item in old:
+        k = key(item)
+        old_keys.add(k)
+        match = new_keys.get(k)
+        rows.append(None if match is None else len(items))
+        if match is not None:
+            items.append(match)
+    items += [item for item in new if key(item) not in old_keys]
+    return items, rows
+
+
+class DBDiff:
+    """The differences between the running MPSModel and a reloaded one.
+    Faults are matched by PV name, application cards by status PV, and
+    conditions by name and PV.
+
+    fault_rows[old_row] and app_rows[old_row] are the new rows of the
+    faults and apps, or None for removed ones. The new model's faults
+    and cards are put in that order, followed by the added ones, so rows
+    only move when rows above them are removed. card_ids and state_ids
+    map the old database ids of the matched cards and fault states to
+    the new ones.
+
+    If the reloaded database can't be applied to the running display
+    (its columns changed), restart holds the reason."""
+    def __init__(self, old: MPSModel, new: MPSModel):
+        self.restart = None
+        if old.dest_lst != new.dest_lst:
+            self.restart = "the beam destinations changed"
+        elif columns(old) != columns(new):
+            self.restart = "the ignore conditions changed"
+        elif len({f.name for f in new.faults}) != len(new.faults):
+            self.restart = "fault PV names are not unique"
+        if self.restart:
+            return
+
+        faults, self.fault_rows = match_rows(old.faults, new.faults, lambda f: f.name)
+        apps, self.app_rows = match_rows(old.db.cards, new.db.cards, app_pv)
+        kept_faults = sum(row is not None for row in self.fault_rows)
+        kept_apps = sum(row is not None for row in self.app_rows)
+
+        self.added_faults = len(faults) - kept_faults
+        self.removed_faults = len(old.faults) - kept_faults
+        self.changed_faults = sum(
+            fault_info(old, o) != fault_info(new, faults[row])
+            for o, row in zip(old.faults, self.fault_rows) if row is not None)
+        self.added_apps = len(apps) - kept_apps
+        self.removed_apps = len(old.db.cards) - kept_apps
+        self.changed_apps = sum(app_info(o) != app_info(apps[row])
+                                for o, row in zip(old.db.cards, self.app_rows)
+                                if row is not None)
+        self.conditions_changed = ([(c.name, c.pv) for c in old.db.conditions]
+                                   != [(c.name, c.pv) for c in new.db.conditions])
+
+        self.card_ids = {o.id: apps[row].id for o, row in zip(old.db.cards, self.app_rows)
+                         if row is not None}
+        self.state_ids = {}
+        for o, row in zip(old.faults, self.fault_rows):
+            if row is None:
+                continue
+            values = {st.device_state.value: st.id for st in faults[row].fault.states}
+            for st in o.fault.states:
+                if st.device_state.value in values:
+                    self.state_ids[st.id] = values[st.device_state.value]
+
+        # new.faults is the snapshot's list
+        new.faults[:] = faults
+        new.db.cards[:] = apps
+
+    def summary(self) -> str:
+        """Return the changes as text."""
+        if self.restart:
+            return f"restart required: {self.restart}"
+        parts = [f"faults: {self.added_faults} added, {self.removed_faults} removed, "
+                 f"{self.changed_faults} changed",
+                 f"apps: {self.added_apps} added, {self.removed_apps} removed, "
+                 f"{self.changed_apps} changed"]
+        if self.conditions_changed:
+            parts.append("condition PVs changed")
+        return "; ".join(parts)
+
+
+class DBReloader(QObject):
+    """Watches the database file (or, without a DB_FILE, the default
+    database directory) and loads a new version in a background thread.
+    File events are debounced, since deploying a file takes more than
+    one write. loaded is emitted in the GUI thread with the new MPSModel
+    and its DBDiff against the running model, and failed with a message
+    if the new file can't be loaded.
+
+    One file is loaded at a time, and the next load is diffed against
+    the model passed to finish(), which must be called once loaded is
+    handled."""
+    loaded = Signal(object, object)
+    failed = Signal(str)
+
+    logger = getLogger(__name__)
+
+    def __init__(self, parent, model: MPSModel, fixed_file: bool = False,
+                 delay: float = 5.0):
+        super(DBReloader, self).__init__(parent)
+        self.model = model
+        self.fixed_file = fixed_file
+        self.signature = db_signature(model.filename)
+        self.building = False
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(int(delay * 1000))
+        self.timer.timeout.connect(self.check)
+        self.failed.connect(self.finish)
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.schedule)
+        self.watcher.directoryChanged.connect(self.schedule)
+        self.watch()
+
+    def target(self) -> str:
+        """Return the file the display should be showing."""
+        if self.fixed_file:
+            return self.model.filename
+        files = glob(path.join(path.dirname(self.model.filename), "mps_config*.db"))
+        return files[0] if files else self.model.filename
+
+    def watch(self):
+        """Watch the database file, its directory, and the directory
+        above it (where a "current" link is replaced). Files that are
+        replaced drop out of the watcher, so this is repeated after
+        every change."""
+        directory = path.dirname(path.abspath(self.model.filename))
+        paths = [self.model.filename, directory, path.dirname(directory)]
+        watched = set(self.watcher.files() + self.watcher.directories())
+        new = [p for p in paths if p not in watched and path.exists(p)]
+        if new:
+            self.watcher.addPaths(new)
+
+    @Slot(str)
+    def schedule(self, changed: str = ""):
+        """Restart the debounce timer after a file event."""
+        self.timer.start()
+
+    @Slot()
+    def check(self):
+        """Start loading the target file if it changed since the running
+        model was loaded."""
+        self.watch()
+        if self.building:
+            self.timer.start()
+            return
+
+        filename = self.target()
+        signature = db_signature(filename)
+        if signature is None or signature == self.signature:
+            return
+        self.signature = signature
+        self.building = True
+        self.logger.info(f"Loading {filename}")
+        Thread(target=self.build, args=(filename,), daemon=True).start()
+
+    def build(self, filename: str):
+        """Load the new model and diff it, in the background thread."""
+        try:
+            model = MPSModel(filename)
+            if model.filename != filename:
+                self.failed.emit(f"{filename} is not a database")
+                return
+            # Cached before the diff puts the faults in the display's order
+            write_cache(file_hash(filename), PVManifest.from_model(model))
+            diff = DBDiff(self.model, model)
+        except Exception as e:
+            self.failed.emit(f"Couldn't load {filename}: {e}")
+        else:
+            self.loaded.emit(model, diff)
+
+    @Slot()
+    def finish(self, model: MPSModel = None):
+        """Called once a load is handled, with the new model if the
+        display switched to it. Changes that came in while loading are
+        checked for after the debounce delay."""
+        self.building = False
+        if model is not None:
+            self.model = model
+        self.watch()
@@ -0,0 +1,251 @@
+from typing import (List, Dict, Tuple, Optional)
+from dataclasses import dataclass
+from mps_database.models import (BeamClass as DBBeamClass, FaultState as DBFaultState,
+                                 Condition as DBCondition, Device as DBDevice,
+                                 ApplicationCard as DBApplicationCard)
+
+# Read-only copies of the mps_database objects the display uses. The
+# attribute names match the ORM's, so code written against the ORM
+# objects works on them unchanged. Cards and devices reference each
+# other, so they keep the default repr.
+
+
+@dataclass(eq=False)
+class BeamClass:
+    __slots__ = ("id", "name", "number")
+    id: int
+    name: str
+    number: int
+
+
+@dataclass(eq=False)
+class BeamDestination:
+    __slots__ = ("id", "name")
+    id: int
+    name: str
+
+
+@dataclass(eq=False)
+class AllowedClass:
+    __slots__ = ("beam_class", "beam_destination")
+    beam_class: BeamClass
+    beam_destination: BeamDestination
+
+
+@dataclass(eq=False)
+class DeviceState:
+    __slots__ = ("description", "value")
+    description: str
+    value: int
+
+
+@dataclass(eq=False)
+class FaultState:
+    __slots__ = ("id", "device_state", "allowed_classes")
+    id: int
+    device_state: DeviceState
+    allowed_classes: Tuple[AllowedClass, ...]
+
+
+@dataclass(eq=False)
+class Fault:
+    __slots__ = ("id", "states")
+    id: int
+    states: Tuple[FaultState, ...]
+
+
+@dataclass(eq=False)
+class FaultObject:
+    """The MpsName fault object: the fault and its PV name."""
+    __slots__ = ("name", "description", "fault")
+    name: str
+    description: str
+    fault: Fault
+
+
+@dataclass(eq=False)
+class Condition:
+    """An ignore condition. pv is the condition's PV from MpsName."""
+    __slots__ = ("id", "name", "description", "pv")
+    id: int
+    name: str
+    description: str
+    pv: str
+
+
+@dataclass(eq=False)
+class IgnoreCondition:
+    __slots__ = ("condition",)
+    condition: Condition
+
+
+@dataclass(eq=False)
+class Channel:
+    __slots__ = ("number",)
+    number: int
+
+
+@dataclass(eq=False)
+class DeviceInput:
+    __slots__ = ("channel",)
+    channel: Channel
+
+
+@dataclass(eq=False)
+class DeviceType:
+    __slots__ = ("name",)
+    name: str
+
+
+@dataclass(eq=False)
+class LinkNode:
+    __slots__ = ("id", "lcls1_id", "group", "cpu", "cn_prefix")
+    id: int
+    lcls1_id: int
+    group: int
+    cpu: str
+    cn_prefix: str
+
+    def get_cn_prefix(self) -> str:
+        return self.cn_prefix
+
+
+@dataclass(eq=False)
+class Crate:
+    __slots__ = ("id", "location")
+    id: int
+    location: str
+
+
+@dataclass(eq=False, repr=False)
+class ApplicationCard:
+    __slots__ = ("id", "number", "slot_number", "link_node", "crate", "type",
+                 "pv_name", "analog_channels", "digital_channels",
+                 "digital_out_channels", "devices")
+    id: int
+    number: int
+    slot_number: int
+    link_node: LinkNode
+    crate: Crate
+    type: DeviceType
+    pv_name: str
+    analog_channels: Tuple[Channel, ...]
+    digital_channels: Tuple[Channel, ...]
+    digital_out_channels: Tuple[Channel, ...]
+    devices: List["Device"]
+
+    def get_pv_name(self) -> str:
+        return self.pv_name
+
+
+@dataclass(eq=False, repr=False)
+class Device:
+    """A device. mps_name is the device's name from MpsName. Analog
+    devices have a channel, digital devices have inputs."""
+    __slots__ = ("id", "description", "area", "device_type", "card", "analog",
+                 "channel", "inputs", "ignore_conditions", "mps_name")
+    id: int
+    description: str
+    area: str
+    device_type: DeviceType
+    card: Optional[ApplicationCard]
+    analog: bool
+    channel: Optional[Channel]
+    inputs: Tuple[DeviceInput, ...]
+    ignore_conditions: Tuple[IgnoreCondition, ...]
+    mps_name: str
+
+    def is_analog(self) -> bool:
+        return self.analog
+
+
+class DBSnapshot:
+    """Everything the display reads from the database, copied once into
+    the dataclasses above. Building the snapshot is the only database
+    I/O; afterwards the session can be closed and no lazy relationship
+    loads can happen from the GUI thread."""
+    def __init__(self, session, names, faults: list):
+        self.device_types = {}
+        self.beam_classes = [BeamClass(bc.id, bc.name, bc.number)
+                             for bc in session.query(DBBeamClass).all()]
+        classes = {bc.id: bc for bc in self.beam_classes}
+        dests = {}
+
+        self.fault_states: Dict[int, FaultState] = {}
+        for st in session.query(DBFaultState).all():
+            allowed = []
+            for cl in st.allowed_classes:
+                dest = cl.beam_destination
+                if dest.id not in dests:
+                    dests[dest.id] = BeamDestination(dest.id, dest.name)
+                allowed.append(AllowedClass(classes[cl.beam_class.id], dests[dest.id]))
+            self.fault_states[st.id] = FaultState(
+                st.id, DeviceState(st.device_state.description, st.device_state.value),
+                tuple(allowed))
+
+        self.conditions = [Condition(con.id, con.name, con.description,
+                                     names.getConditionPV(con))
+                           for con in session.query(DBCondition).all()]
+        conditions = {con.id: con for con in self.conditions}
+
+        self.link_nodes = {}
+        self.crates = {}
+        self.cards = [self.freeze_card(card) for card in
+                      session.query(DBApplicationCard).all()]
+        cards = {card.id: card for card in self.cards}
+
+        self.devices = []
+        self.device_ids = {}
+        for dev in session.query(DBDevice).all():
+            analog = dev.is_analog()
+            card = cards.get(dev.card.id) if dev.card is not None else None
+            frozen = Device(
+                dev.id, dev.description, dev.area, self.device_type(dev.device_type.name),
+                card, analog,
+                Channel(dev.channel.number) if analog else None,
+                () if analog else tuple(DeviceInput(Channel(i.channel.number))
+                                        for i in dev.inputs),
+                tuple(IgnoreCondition(conditions[ign.condition.id])
+                      for ign in dev.ignore_conditions),
+                names.getDeviceName(dev))
+            if card is not None:
+                card.devices.append(frozen)
+            self.devices.append(frozen)
+            self.device_ids[dev.id] = frozen
+
+        # Faults keep their order; their device and inputs are looked up
+        # by fault id
+        self.faults = []
+        self.fault_devs: Dict[int, Device] = {}
+        self.fault_inputs: Dict[int, list] = {}
+        for flt in faults:
+            dev = names.getDeviceFromFault(flt.fault)
+            self.fault_devs[flt.fault.id] = self.device_ids[dev.id]
+            self.fault_inputs[flt.fault.id] = list(names.getInputsFromDevice(dev, flt.fault))
+            fault = Fault(flt.fault.id, tuple(self.fault_states[s.id] for s in flt.fault.states))
+            self.faults.append(FaultObject(flt.name, flt.description, fault))
+
+    def device_type(self, name: str) -> DeviceType:
+        """Return the shared DeviceType for a type name."""
+        if name not in self.device_types:
+            self.device_types[name] = DeviceType(name)
+        return self.device_types[name]
+
+    def freeze_card(self, card) -> ApplicationCard:
+        """Copy an application card, without its devices. Link nodes and
+        crates are shared by their cards."""
+        ln = card.link_node
+        if ln.id not in self.link_nodes:
+            self.link_nodes[ln.id] = LinkNode(ln.id, ln.lcls1_id, ln.group,
+                                              ln.cpu, ln.get_cn_prefix())
+        if card.crate.id not in self.crates:
+            self.crates[card.crate.id] = Crate(card.crate.id, card.crate.location)
+
+        return ApplicationCard(
+            card.id, card.number, card.slot_number,
+            self.link_nodes[ln.id], self.crates[card.crate.id],
+            self.device_type(card.type.name), card.get_pv_name(),
+            tuple(Channel(ch.number) for ch in card.analog_channels),
+            tuple(Channel(ch.number) for ch in card.digital_channels),
+            tuple(Channel(ch.number) for ch in card.digital_out_channels),
+            [])
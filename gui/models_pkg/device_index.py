@@ -0,0 +1,102 @@
+from bisect import bisect_left
+from typing import List
+from qtpy.QtCore import (QModelIndex, QSortFilterProxyModel)
+from models_pkg.db_snapshot import Device
+
+
+class DeviceIndex:
+    """In-memory search index over devices, built once from the
+    database. Each field maps every suffix of its lowercase text to the
+    ids of the devices with that text. The suffixes are kept sorted, so
+    a term found anywhere in the text (mid-word or across separators,
+    e.g. "IN20:221") is a binary search for the suffixes starting with
+    it, as the plain substring filter matched.
+
+    Queries are whitespace separated terms that must all match. A term
+    is either matched against every field, or field:term to match one
+    field, e.g. "type:BPMS area:BSY"."""
+    fields = ("desc", "type", "area", "ln", "card")
+    aliases = {"desc": "desc", "description": "desc", "name": "desc",
+               "type": "type", "area": "area",
+               "ln": "ln", "link": "ln", "linknode": "ln",
+               "card": "card"}
+
+    def __init__(self, devices: List[Device]):
+        self.ids = set()
+        self.suffixes = {f: {} for f in self.fields}
+        for dev in devices:
+            self.add(dev)
+        self.sorted_suffixes = {f: sorted(self.suffixes[f]) for f in self.fields}
+
+    def add(self, dev: Device):
+        """Add a device's fields to the suffix maps."""
+        card = dev.card
+        values = {"desc": dev.description,
+                  "type": dev.device_type.name,
+                  "area": dev.area,
+                  "ln": card.link_node.lcls1_id if card else "",
+                  "card": card.number if card else ""}
+
+        self.ids.add(dev.id)
+        for field, value in values.items():
+            text = str(value).lower()
+            for i in range(len(text)):
+                self.suffixes[field].setdefault(text[i:], set()).add(dev.id)
+
+    def match(self, field: str, term: str) -> set:
+        """Return the ids of devices with term anywhere in field. An
+        empty term matches every device."""
+        if not term:
+            return set(self.ids)
+        ids = set()
+        suffixes = self.sorted_suffixes[field]
+        i = bisect_left(suffixes, term)
+        while i < len(suffixes) and suffixes[i].startswith(term):
+            ids |= self.suffixes[field][suffixes[i]]
+            i += 1
+        return ids
+
+    def search(self, query: str):
+        """Return the set of device ids matching every term in the
+        query, or None if the query is empty."""
+        result = None
+        for term in query.lower().split():
+            field, sep, prefix = term.partition(':')
+            if sep and field in self.aliases:
+                ids = self.match(self.aliases[field], prefix)
+            else:
+                ids = set()
+                for f in self.fields:
+                    ids |= self.match(f, term)
+
+            result = ids if result is None else result & ids
+            if not result:
+                break
+        return result
+
+
+class DeviceFilterModel(QSortFilterProxyModel):
+    """QSortFilterProxyModel for a ConfigureTableModel that filters rows
+    using a DeviceIndex query instead of matching strings per row."""
+    def __init__(self, parent, index: DeviceIndex):
+        super(DeviceFilterModel, self).__init__(parent)
+        self.dev_index = index
+        self.query = ""
+        self.accepted = None
+
+    def setQuery(self, query: str):
+        """Set the query used to filter rows."""
+        self.query = query
+        self.accepted = self.dev_index.search(query)
+        self.invalidateFilter()
+
+    def setIndex(self, index: DeviceIndex):
+        """Replace the search index and run the query against it."""
+        self.dev_index = index
+        self.setQuery(self.query)
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex):
+        """Accept rows whose device matched the query."""
+        if self.accepted is None:
+            return True
+        return self.sourceModel().get_device(source_row).id in self.accepted
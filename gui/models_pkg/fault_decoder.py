@@ -0,0 +1,69 @@
+from base_enums import (Statuses, ColKind)
+from models_pkg.db_snapshot import DBSnapshot
+
+
+class FaultDecoder:
+    """Turns the values of a fault's PVs into the text and status shown
+    for them. Doesn't depend on a Qt model, so it is shared by the
+    LogicTableModel and the command-line snapshot."""
+    def __init__(self, db: DBSnapshot, dest_cols: dict):
+        self.db = db
+        self.dest_cols = dest_cols
+        self._state_info = {}
+
+        # Beam class numbers by class name
+        self.class_nums = {bc.name: bc.number for bc in self.db.beam_classes}
+
+        # Max permit value for determining fault status. Until the
+        # MAX_PERMIT PV connects, assume the max permit is Full
+        self.speed_limit = max(self.class_nums.values()) - 1
+
+    def state_info(self, value: int):
+        """Return the FaultState's description, its allowed classes
+        (excluding Full) as (column, class name, class number) tuples,
+        and the lowest allowed class number. Returns None if the
+        FaultState is not in the database. Results are cached since the
+        database does not change at runtime."""
+        if value in self._state_info:
+            return self._state_info[value]
+
+        curr_state = self.db.fault_states.get(value)
+        if curr_state is None:
+            info = None
+        else:
+            classes = tuple((self.dest_cols[cl.beam_destination.name],
+                             cl.beam_class.name, cl.beam_class.number)
+                            for cl in curr_state.allowed_classes
+                            if cl.beam_class.name != "Full")
+            info = (curr_state.device_state.description, classes,
+                    min((cl[2] for cl in classes), default=float('inf')))
+        self._state_info[value] = info
+        return info
+
+    def class_status(self, cl_num: float) -> Statuses:
+        """Return the status for a state's lowest allowed class number.
+        Find Beam Class values in MPS Beam Class Definitions display."""
+        if cl_num < 2:
+            return Statuses.RED
+        elif cl_num < self.speed_limit:
+            return Statuses.YEL
+        return Statuses.GRN
+
+    def state_text(self, value: int) -> tuple:
+        """Return the state's text, status, and allowed classes as
+        (column, class name, class number) tuples."""
+        if value == 0:
+            return ("OK", Statuses.GRN, ())
+        elif value == -1:
+            return ("TIMEOUT", Statuses.MAG, ())
+        info = self.state_info(value)
+        if info is None:
+            return ("DB_ERROR", Statuses.MAG, ())
+        return (info[0], self.class_status(info[2]), info[1])
+
+    @staticmethod
+    def flag_text(kind: ColKind, value) -> str:
+        """Return the text shown for a Bypassed, Ignored or Active value."""
+        if kind == ColKind.IGN:
+            return "Ignored" if value else "Not Ignored"
+        return "Y" if value else "N"
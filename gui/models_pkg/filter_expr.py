@@ -0,0 +1,233 @@
+import re
+from shlex import split
+from fnmatch import translate
+from operator import (eq, ne, lt, le, gt, ge)
+from qtpy.QtCore import QSettings
+from enums import Statuses
+
+FILTER_HELP = """Space-separated terms, all of which must match:
+  word                  description contains word (also for words
+                        like BPMS:LI21 that don't start with a field)
+  fault:GLOB            description matches GLOB
+  pv:GLOB               fault PV matches GLOB
+  area:GLOB             device area matches GLOB
+  state:faulted|major|minor|ok|error|timeout|disconnected|GLOB
+  dest:DEST             fault limits DEST
+  dest:DEST>=CLASS      fault limits DEST to CLASS or lower
+                        (also <=, >, <, =, !=)
+  bypassed:yes|no    active:yes|no    ignored:yes|no|active
+  cond:GLOB             fault is ignored by a matching condition
+Prefix a term with - to negate it, separate alternatives with commas
+(area:BSY*,L2B) and quote values with spaces. Globs use * and ?."""
+
+# Terms are [-]field:value for a field in FIELDS; anything else is a
+# description search
+TERM = re.compile(r"(?P<neg>-?)(?P<field>[a-z]+):(?P<value>.*)", re.I)
+DEST = re.compile(r"(?P<dest>[^<>=!]+)(?:(?P<op><=|>=|!=|=|<|>)(?P<cls>.+))?")
+
+# Destination comparisons are by how far the fault limits the beam, so
+# ">=" means "limits to this class or a lower class number"
+DEST_OPS = {">=": le, ">": lt, "<=": ge, "<": gt, "=": eq, "!=": ne}
+
+YES = ("yes", "y", "true", "1")
+NO = ("no", "n", "false", "0")
+
+STATES = {"faulted": lambda status, state: status.faulted(),
+          "major": lambda status, state: status == Statuses.RED,
+          "minor": lambda status, state: status == Statuses.YEL,
+          "ok": lambda status, state: status == Statuses.GRN,
+          "error": lambda status, state: status == Statuses.MAG,
+          "timeout": lambda status, state: state == -1,
+          "disconnected": lambda status, state: status == Statuses.WHT}
+
+
+def pattern(value: str):
+    """Return a case-insensitive match function for comma-separated
+    glob alternatives."""
+    alts = [translate(alt) for alt in value.split(',') if alt]
+    return re.compile('|'.join(alts), re.I).match
+
+
+def yes_no(field: str, value: str) -> bool:
+    """Return the boolean of a yes/no value."""
+    if value.lower() in YES:
+        return True
+    elif value.lower() in NO:
+        return False
+    raise ValueError(f"'{field}:' expects yes or no, not '{value}'")
+
+
+def text_term(value: str, cell):
+    """Match a glob against the string cell(row) returns."""
+    match = pattern(value)
+    return lambda row: match(cell(row)) is not None
+
+
+def state_term(model, value: str):
+    """Match status keywords or globs against the state's text."""
+    checks = []
+    for alt in value.split(','):
+        if alt.lower() in STATES:
+            check = STATES[alt.lower()]
+            checks.append(lambda row, check=check:
+                          check(model.status[row], model.states[row]))
+        elif alt:
+            checks.append(text_term(alt, lambda row: model._data[row][1]))
+    return lambda row: any(check(row) for check in checks)
+
+
+def dest_term(model, value: str):
+    """Match the destinations a fault limits, optionally comparing the
+    class it limits them to."""
+    m = DEST.fullmatch(value)
+    if m is None:
+        raise ValueError(f"Bad destination term 'dest:{value}'")
+
+    match = pattern(m["dest"])
+    cols = [model.hdr_dict[d] for d in model.model.dest_lst if match(d)]
+    if not cols:
+        raise ValueError(f"No destination matches '{m['dest']}' "
+                         f"(destinations: {', '.join(model.model.dest_lst)})")
+
+    # Cells hold the allowed class name, or '-' when the destination
+    # isn't limited (Full)
+    class_nums = model.decoder.class_nums
+    nums = dict(class_nums)
+    nums['-'] = max(class_nums.values())
+
+    if m["op"] is None:
+        return lambda row: any(model._data[row][c] in class_nums for c in cols)
+
+    by_name = {name.lower(): num for name, num in class_nums.items()}
+    target = by_name.get(m["cls"].lower())
+    if target is None:
+        raise ValueError(f"Unknown beam class '{m['cls']}' "
+                         f"(classes: {', '.join(class_nums)})")
+    op = DEST_OPS[m["op"]]
+
+    def term(row):
+        for c in cols:
+            num = nums.get(model._data[row][c])
+            if num is not None and op(num, target):
+                return True
+        return False
+    return term
+
+
+def flag_term(model, value: str, field: str, col: int, on: str, off: str):
+    """Match a yes/no column. Faults whose value is unknown ('?') match
+    neither."""
+    txt = on if yes_no(field, value) else off
+    return lambda row: model._data[row][col] == txt
+
+
+def ignored_term(model, value: str):
+    """Match the Ignored column, or 'active' for faults ignored by an
+    active condition."""
+    if value.lower() == "active":
+        return model.ignored_by_active
+    return flag_term(model, value, "ignored", model.iind, "Ignored", "Not Ignored")
+
+
+def cond_term(model, value: str):
+    """Match faults that are ignored by any matching condition."""
+    match = pattern(value)
+    mask = 0
+    for con in model.con_lst:
+        if match(con.name) or match(model.con_name(con)):
+            mask |= 1 << model.con_bit[con.id]
+    if not mask:
+        raise ValueError(f"No condition matches '{value}'")
+    return lambda row: bool(model.ign_mask[row] & mask)
+
+
+# Compilers for each field, called with the model and the term's value.
+# The model's lists are looked up on every call since some of them are
+# replaced rather than updated
+FIELDS = {"fault": lambda model, v: text_term(v, lambda row: model._data[row][0]),
+          "pv": lambda model, v: text_term(v, lambda row: model.channels[row]),
+          "area": lambda model, v: text_term(v, lambda row: model.row_area[row]),
+          "state": state_term,
+          "dest": dest_term,
+          "bypassed": lambda model, v: flag_term(model, v, "bypassed", model.bind, "Y", "N"),
+          "active": lambda model, v: flag_term(model, v, "active", model.aind, "Y", "N"),
+          "ignored": ignored_term,
+          "cond": cond_term}
+
+
+def compile_term(word: str, model):
+    """Return the predicate for a single term. Words that don't start
+    with a known field (e.g. a device name like BPMS:LI21) are
+    description searches."""
+    m = TERM.fullmatch(word)
+    if m is None or m["field"].lower() not in FIELDS:
+        neg = word.startswith('-') and len(word) > 1
+        txt = (word[1:] if neg else word).lower()
+        term = (lambda row: txt in model._data[row][0].lower())
+    else:
+        neg = bool(m["neg"])
+        field = m["field"].lower()
+        if not m["value"]:
+            raise ValueError(f"'{field}:' needs a value")
+        term = FIELDS[field](model, m["value"])
+
+    if neg:
+        return lambda row: not term(row)
+    return term
+
+
+def compile_filter(text: str, model):
+    """Compile a filter expression into a predicate over the rows of a
+    LogicTableModel, or None if the expression is empty. Raises
+    ValueError with a message for the user if it can't be compiled.
+    See FILTER_HELP for the syntax. Text with unbalanced quotes (e.g.
+    an apostrophe in a description search) is split on whitespace."""
+    try:
+        words = split(text)
+    except ValueError:
+        words = text.split()
+
+    terms = [compile_term(word, model) for word in words]
+    if not terms:
+        return None
+    elif len(terms) == 1:
+        return terms[0]
+    return lambda row: all(term(row) for term in terms)
+
+
+class FilterPresets:
+    """Named filter expressions for one table. Saved presets persist
+    between sessions with QSettings; the defaults are always listed and
+    can be overridden by saving a preset with the same name."""
+    def __init__(self, table: str, defaults: dict = None):
+        self.settings = QSettings("SLAC", "sc_mps_gui")
+        self.group = f"filter_presets/{table}"
+        self.defaults = defaults or {}
+
+    def saved(self) -> dict:
+        """Return the presets saved by the user."""
+        self.settings.beginGroup(self.group)
+        presets = {key: str(self.settings.value(key))
+                   for key in self.settings.childKeys()}
+        self.settings.endGroup()
+        return presets
+
+    def presets(self) -> dict:
+        """Return the defaults and the saved presets."""
+        presets = dict(self.defaults)
+        presets.update(self.saved())
+        return presets
+
+    def save(self, name: str, text: str):
+        """Save a preset, replacing any with the same name."""
+        self.settings.setValue(f"{self.group}/{self.key(name)}", text)
+
+    def remove(self, name: str):
+        """Remove a saved preset."""
+        self.settings.remove(f"{self.group}/{self.key(name)}")
+
+    @staticmethod
+    def key(name: str) -> str:
+        """Return the settings key for a name; QSettings treats slashes
+        as groups."""
+        return name.replace('/', '-').replace('\\', '-')
@@ -0,0 +1,174 @@
+from time import (time, strftime, localtime)
+from array import array
+from qtpy.QtCore import (Qt, QModelIndex, QAbstractTableModel)
+from enums import (Statuses, ColKind)
+
+
+class FaultHistory:
+    """Fixed-size ring buffer of fault transitions. Each entry is stored
+    across four preallocated arrays (row, column kind, value code, and
+    timestamp), so memory stays bounded and appends are O(1). Entries
+    are appended in time order, so time-window queries use a binary
+    search over the timestamps."""
+    def __init__(self, size: int = 65536):
+        self.size = size
+        self.rows = array('i', [0]) * size
+        self.kinds = array('b', [0]) * size
+        self.codes = array('i', [0]) * size
+        self.stamps = array('d', [0.0]) * size
+        self.head = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, row: int, kind: ColKind, code: int, stamp: float = None):
+        """Add a transition, overwriting the oldest one if full."""
+        i = self.head
+        self.rows[i] = row
+        self.kinds[i] = kind.value
+        self.codes[i] = code
+        self.stamps[i] = time() if stamp is None else stamp
+
+        self.head = (i + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def clear(self):
+        """Forget all transitions."""
+        self.head = 0
+        self.count = 0
+
+    def remap(self, rows: list, codes: dict = None):
+        """Renumber the rows after faults are added or removed.
+        rows[old_row] is the new row, or None to drop the row's entries.
+        codes optionally renumbers the state codes (FaultState ids)."""
+        codes = codes or {}
+        kept = 0
+        for n in range(self.count):
+            i = self._pos(n)
+            row = rows[self.rows[i]]
+            if row is None:
+                continue
+            j = self._pos(kept)
+            self.rows[j] = row
+            self.kinds[j] = self.kinds[i]
+            self.codes[j] = self.codes[i]
+            if self.kinds[i] in (ColKind.STATE.value, ColKind.CONN.value):
+                self.codes[j] = codes.get(self.codes[i], self.codes[i])
+            self.stamps[j] = self.stamps[i]
+            kept += 1
+        self.head = (self.head - self.count + kept) % self.size
+        self.count = kept
+
+    def _pos(self, n: int) -> int:
+        """Return the array position of the n-th oldest entry."""
+        return (self.head - self.count + n) % self.size
+
+    def entry(self, n: int) -> tuple:
+        """Return the n-th oldest entry as (row, kind, code, timestamp)."""
+        i = self._pos(n)
+        return (self.rows[i], ColKind(self.kinds[i]), self.codes[i], self.stamps[i])
+
+    def bisect(self, stamp: float) -> int:
+        """Return the index of the oldest entry at or after stamp."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.stamps[self._pos(mid)] < stamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def since(self, seconds: float = None, limit: int = None):
+        """Yield the entries from the last `seconds` seconds, oldest
+        first. Yields every entry if seconds is None. If limit is given,
+        only the newest `limit` entries are yielded."""
+        start = 0 if seconds is None else self.bisect(time() - seconds)
+        if limit is not None:
+            start = max(start, self.count - limit)
+        for n in range(start, self.count):
+            yield self.entry(n)
+
+
+class HistoryTableModel(QAbstractTableModel):
+    """Table of the transitions recorded by a LogicTableModel's
+    FaultHistory. Shows either every transition in a time window (newest
+    first) or the first fault for each destination."""
+    hdr_lst = ["Time", "Fault", "Column", "Value"]
+
+    kind_names = {ColKind.STATE: "State",
+                  ColKind.BYP: "Bypassed",
+                  ColKind.IGN: "Ignored",
+                  ColKind.ACT: "Active",
+                  ColKind.CONN: "Reconnected"}
+
+    def __init__(self, parent, logic_model, max_rows: int = 2000):
+        super(HistoryTableModel, self).__init__(parent)
+        self.logic_model = logic_model
+        self.max_rows = max_rows
+        self._data = []
+        self.status = []
+
+    def rowCount(self, index: QModelIndex = QModelIndex()):
+        """Return the number of rows in the model."""
+        return len(self._data)
+
+    def columnCount(self, index: QModelIndex = QModelIndex()):
+        """Return the number of columns in the model."""
+        return len(self.hdr_lst)
+
+    def data(self, index: QModelIndex, role: Qt.ItemDataRole):
+        """Return the index's text and colors."""
+        if not index.isValid():
+            return
+        elif role == Qt.DisplayRole:
+            return self._data[index.row()][index.column()]
+        elif role == Qt.TextAlignmentRole and index.column() != 1:
+            return Qt.AlignCenter
+        elif role == Qt.BackgroundRole:
+            return Statuses.BGD.brush()
+        elif role == Qt.ForegroundRole:
+            if index.column() == 3:
+                return self.status[index.row()].brush()
+            return Statuses.GRN.brush()
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: Qt.ItemDataRole):
+        """Set the horizontal header's text."""
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.hdr_lst[section]
+
+    def make_row(self, row: int, kind: ColKind, code: int, stamp: float):
+        """Return the cells and status for a single transition."""
+        txt, status = self.logic_model.history_text(kind, code)
+        return ([strftime("%m/%d %H:%M:%S", localtime(stamp)),
+                 self.logic_model.model.faults[row].description,
+                 self.kind_names[kind], txt], status)
+
+    def show_window(self, seconds: float = None):
+        """Show every transition from the last `seconds`, newest first."""
+        history = self.logic_model.history
+        rows = [self.make_row(*e) for e in history.since(seconds, self.max_rows)]
+        rows.reverse()
+        self.reset_rows(rows)
+
+    def show_first_faults(self, seconds: float = None):
+        """Show the first fault for each destination in the window."""
+        rows = []
+        firsts = self.logic_model.first_faults(seconds)
+        for dest in self.logic_model.model.dest_lst:
+            if dest not in firsts:
+                continue
+            cells, status = self.make_row(*firsts[dest])
+            cells[2] = dest
+            rows.append((cells, status))
+        self.reset_rows(rows)
+
+    def reset_rows(self, rows: list):
+        """Replace the model's contents."""
+        self.beginResetModel()
+        self._data = [r[0] for r in rows]
+        self.status = [r[1] for r in rows]
+        self.endResetModel()
@@ -0,0 +1,65 @@
+from time import perf_counter
+from logging import getLogger
+from qtpy.QtCore import (QObject, QTimer, Signal, Slot)
+
+
+class InitialLoad(QObject):
+    """The startup phase in which the first value of every fault's PVs
+    arrives. The LogicTableModel takes the values without notifying its
+    views until the given fraction of faults have reported a state, no
+    more faults have reported for settle seconds (e.g. an IOC is down),
+    or the timeout passes. The values are then published with one reset,
+    so each proxy filters and sorts once instead of once per value.
+
+    finished is emitted with the seconds the phase took and the fraction
+    of faults that had reported."""
+    finished = Signal(float, float)
+
+    logger = getLogger(__name__)
+
+    def __init__(self, parent, model, fraction: float = 0.98,
+                 settle: float = 1.0, timeout: float = 10.0, interval: float = 0.25):
+        super(InitialLoad, self).__init__(parent)
+        self.model = model
+        self.fraction = fraction
+        self.settle = settle
+        self.timeout = timeout
+        self.start = perf_counter()
+        self.elapsed = None
+
+        # The reported fraction at the last check and when it last grew
+        self.reported = 0.0
+        self.reported_at = self.start
+
+        self.model.begin_bulk_load()
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.check)
+        self.timer.start(int(interval * 1000))
+
+    @Slot()
+    def check(self):
+        """End the phase once enough faults have reported, the reports
+        have settled, or the timeout has passed."""
+        now = perf_counter()
+        reported = self.model.reported_fraction()
+        if reported > self.reported:
+            self.reported, self.reported_at = reported, now
+
+        if (reported >= self.fraction
+                or (reported and now - self.reported_at >= self.settle)
+                or now - self.start >= self.timeout):
+            self.finish()
+
+    @Slot()
+    def finish(self):
+        """End the phase now."""
+        if self.elapsed is not None:
+            return
+        self.timer.stop()
+        self.model.end_bulk_load()
+        self.elapsed = perf_counter() - self.start
+
+        reported = self.model.reported_fraction()
+        self.logger.info(f"Initial load took {self.elapsed:.2f} s, "
+                         f"{reported:.0%} of faults reported")
+        self.finished.emit(self.elapsed, reported)
@@ -1,15 +1,27 @@
 from logging import getLogger
 from platform import system
-from qtpy.QtCore import (Qt, Slot, Signal, QModelIndex, QAbstractTableModel,
-                         QEvent, QSortFilterProxyModel)
+from qtpy.QtCore import (Qt, Slot, Signal, QObject, QModelIndex, QAbstractTableModel,
+                         QAbstractProxyModel, QEvent, QSortFilterProxyModel)
 from qtpy.QtWidgets import (QStyledItemDelegate, QApplication, QToolTip)
 from qtpy.QtGui import QPalette
-from sqlalchemy.exc import NoResultFound
-from sqlalchemy.orm import (sessionmaker, scoped_session)
-from epics import caget
-from mps_database.models import (Condition, FaultState)
-from enums import Statuses
+from models_pkg.db_snapshot import Condition
+from enums import (Statuses, ColKind)
 from models_pkg.mps_model import MPSModel
+from models_pkg.fault_decoder import FaultDecoder
+from models_pkg.history_model import FaultHistory
+from models_pkg.bypass_schedule import (BypassSchedule, parse_expiry)
+from models_pkg.view_engine import ViewEngine
+
+
+def row_ranges(rows: list) -> list:
+    """Return the sorted rows as (first, last) ranges of consecutive rows."""
+    ranges = []
+    for row in rows:
+        if ranges and ranges[-1][1] == row - 1:
+            ranges[-1][1] = row
+        else:
+            ranges.append([row, row])
+    return [tuple(r) for r in ranges]
 
 
 class LogicTableModel(QAbstractTableModel):
@@ -20,40 +32,97 @@ class LogicTableModel(QAbstractTableModel):
     byp_exp_signal = Signal(str, int)
     ign_signal = Signal(int, int)
     act_signal = Signal(int, int)
+    max_permit_signal = Signal(int)
+    outages_changed = Signal()
+
+    # Column kinds populated by the _SCBYPS, _SCBYP_END, _IGNORED, and
+    # _ACTIVE PVs, and column kinds sorted in descending order
+    pv_kinds = (ColKind.BYP, ColKind.BYP_EXP, ColKind.IGN, ColKind.ACT)
+    rev_sort_kinds = (ColKind.STATE, ColKind.DEST, ColKind.COND, ColKind.BYP, ColKind.ACT)
 
-    def __init__(self, parent, model: MPSModel, sessionmaker: sessionmaker):
+    # Lists holding a value for every fault, in row order
+    row_lists = ("_data", "status", "states", "channels", "ign_mask", "row_class",
+                 "byp_exp_stamp", "row_card", "row_area", "reconnecting")
+
+    def __init__(self, parent, model: MPSModel, history_size: int = 65536,
+                 byp_alert_lead: float = 1800):
         super(LogicTableModel, self).__init__(parent)
         self.model = model
-        self.session = scoped_session(sessionmaker)
 
         self.conind = []
+        self.con_lst = self.model.db.conditions
 
         self.hdr_lst = (["Fault", "State"] + self.model.dest_lst)
-        for con in self.model.config.session.query(Condition).all():
-            name = con.name.split('_')[0] if "IGNORE" in con.name else con.name
+        for con in self.con_lst:
+            name = self.con_name(con)
             if name in self.hdr_lst:
                 continue
             self.hdr_lst.append(name)
             self.conind.append(len(self.hdr_lst) - 1)
-        self.hdr_lst += ["Bypassed", "Bypass Exp Date", "Ignored", "Active"]
+        self.hdr_lst += ["Bypassed", "Bypass Exp Date", "Time Remaining",
+                         "Ignored", "Active"]
 
         self.bind = self.hdr_lst.index("Bypassed")
         self.beind = self.hdr_lst.index("Bypass Exp Date")
+        self.brind = self.hdr_lst.index("Time Remaining")
         self.iind = self.hdr_lst.index("Ignored")
         self.aind = self.hdr_lst.index("Active")
+        self.cind = len(self.model.dest_lst) + 2
+
+        # Precompute header indices and the kind of every column
+        self.hdr_dict = {hdr: i for i, hdr in enumerate(self.hdr_lst)}
+        self.col_kind = ([ColKind.DESC, ColKind.STATE]
+                         + [ColKind.DEST] * len(self.model.dest_lst)
+                         + [ColKind.COND] * len(self.conind)
+                         + [ColKind.BYP, ColKind.BYP_EXP, ColKind.BYP_REM,
+                            ColKind.IGN, ColKind.ACT])
+
+        # Every condition gets a bit in the ignore masks. ign_mask holds
+        # the conditions each fault is ignored by and con_active holds
+        # the conditions that are currently active
+        self.con_bit = {con.id: i for i, con in enumerate(self.con_lst)}
+        self.con_col = [self.hdr_dict[self.con_name(con)] for con in self.con_lst]
+        self.ign_mask = []
+        self.con_active = 0
 
         self._data = []
         self.status = []
+        self.states = []
         self.channels = []
+        self.history = FaultHistory(history_size)
+        self.decoder = FaultDecoder(self.model.db, self.hdr_dict)
+        self.row_class = []
+
+        # Bypass expirations are parsed once into epoch timestamps. The
+        # schedule keeps the countdowns of the bypassed faults
+        self.byp_exp_stamp = []
+        self.byp_schedule = BypassSchedule(self, len(self.model.faults), byp_alert_lead)
+        self.byp_schedule.changed.connect(self.set_byp_rem)
 
-        # Get max permit value for determining fault status
-        self.speed_limit = caget("SIOC:SYS0:MP00:MAX_PERMIT.RVAL") - 1
+        # Faults on each application card (through their device), and
+        # the cards that are currently offline
+        self.card_rows = {}
+        self.card_names = {}
+        self.row_card = []
+        self.cards_down = set()
+
+        # Area of every fault's device, used by filter expressions
+        self.row_area = []
+
+        # Whether each fault's PVs disconnected since its last state
+        self.reconnecting = []
 
         self.set_data()
+
+        # Keeps the rows shown by every MPSViewModel over this model
+        self.view_engine = ViewEngine(self)
+        self.bulk_loading = False
+
         self.state_signal.connect(self.set_state)
         self.byp_signal.connect(self.set_byp)
         self.byp_exp_signal.connect(self.set_byp_exp)
         self.ign_signal.connect(self.set_ign)
+        self.max_permit_signal.connect(self.set_max_permit)
         self.act_signal.connect(self.set_act)
 
     def rowCount(self, index: QModelIndex = QModelIndex()):
@@ -78,25 +147,29 @@ class LogicTableModel(QAbstractTableModel):
         elif role == Qt.ForegroundRole:
             row = index.row()
             col = index.column()
-            txt = index.data()
+            kind = self.col_kind[col]
+            txt = self._data[row][col]
 
-            if col == 1 and self.status[row].error():
+            if kind == ColKind.DESC:
+                return
+            elif kind == ColKind.STATE and self.status[row].error():
                 return self.status[row].brush()
-
-            elif 2 <= col < self.conind[0] and txt != '-':
+            elif kind == ColKind.DEST and txt != '-':
                 return self.status[row].brush()
-
-            elif col in self.conind and txt == "Is In":
+            elif kind == ColKind.COND and txt == "Is In":
                 return Statuses.YEL.brush()
-
-            elif col == self.iind and txt == "Ignored":
+            elif kind == ColKind.IGN and txt == "Ignored":
                 return Statuses.YEL.brush()
-
-            elif self.bind <= col <= self.aind and txt == '?':
+            elif kind == ColKind.BYP_REM and row in self.byp_schedule.alerted:
+                return Statuses.YEL.brush()
+            elif kind in self.pv_kinds and txt == '?':
                 return Statuses.WHT.brush()
+            return Statuses.GRN.brush()
 
-            elif col != 0:
-                return Statuses.GRN.brush()
+    @staticmethod
+    def con_name(con: Condition) -> str:
+        """Return the column name used for the given Condition."""
+        return con.name.split('_')[0] if "IGNORE" in con.name else con.name
 
     def headerData(self, section: int, orientation: Qt.Orientation,
                    role: Qt.ItemDataRole):
@@ -105,183 +178,471 @@ class LogicTableModel(QAbstractTableModel):
             return self.hdr_lst[section]
 
     def set_data(self):
-        """Set initial data for each fault. Populate each fault with the
-        description, the PV name, and default values for bypass, ignore,
-        and active cells. Set the color to white (for disconnected)."""
+        """Set initial data for each fault."""
         for fault in self.model.faults:
-            lst = [fault.name] * len(self.hdr_lst)
-            lst[0] = fault.description
-            lst[1] = fault.name
-            lst[self.bind] = "?"
-            lst[self.beind] = "None"
-            lst[self.iind] = "?"
-            lst[self.aind] = "?"
-
-            for i in self.conind:
-                lst[i] = '-'
-            dev = self.model.fault_to_dev(fault.fault)
-            for con in dev.ignore_conditions:
-                col = self.conind[0] + max(0, con.condition.id - 3)
+            self.add_row(fault)
+
+    def add_row(self, fault):
+        """Append a row for a fault. Populate it with the description,
+        the PV name, and default values for bypass, ignore, and active
+        cells. Set the color to white (for disconnected)."""
+        lst = [fault.name] * len(self.hdr_lst)
+        lst[1] = fault.name
+        lst[self.bind] = "?"
+        lst[self.beind] = "None"
+        lst[self.brind] = ""
+        lst[self.iind] = "?"
+        lst[self.aind] = "?"
+
+        self._data.append(lst)
+        self.ign_mask.append(0)
+        self.status.append(Statuses.WHT)
+        self.states.append(None)
+        self.row_class.append(None)
+        self.byp_exp_stamp.append(None)
+        self.channels.append(fault.name)
+        self.row_card.append(None)
+        self.row_area.append("")
+        self.reconnecting.append(False)
+        self.set_fault(len(self._data) - 1, fault)
+
+    def set_fault(self, row: int, fault):
+        """Set the cells of a row that come from the database: the
+        description and the conditions that ignore the fault, and index
+        the fault by its device's card and area."""
+        lst = self._data[row]
+        lst[0] = fault.description
+        for i in self.conind:
+            lst[i] = '-'
+        dev = self.model.fault_to_dev(fault.fault)
+        self.index_card(dev.card, row)
+        self.row_area[row] = dev.area or ""
+        mask = 0
+        for con in dev.ignore_conditions:
+            mask |= 1 << self.con_bit[con.condition.id]
+        for bit, col in enumerate(self.con_col):
+            if mask >> bit & 1:
                 lst[col] = "Is In"
+        self.ign_mask[row] = mask
 
-            self._data.append(lst)
-            self.status.append(Statuses.WHT)
-            self.channels.append(fault.name)
+    def index_card(self, card, row: int):
+        """Add the fault in row to its application card's faults."""
+        if card is None:
+            self.row_card[row] = None
+            return
+        if card.id not in self.card_rows:
+            slot = card.slot_number if card.slot_number != 1 else "RTM"
+            self.card_rows[card.id] = []
+            self.card_names[card.id] = f"{card.crate.location} Slot {slot} (AID {card.number})"
+        self.card_rows[card.id].append(row)
+        self.row_card[row] = card.id
+
+    def apply_reload(self, model: MPSModel, diff):
+        """Switch to a reloaded database with the same columns, using a
+        db_reload.DBDiff. The new model's faults keep the order of the
+        rows they replace, followed by the added faults. Removed faults
+        are removed as rows and added faults are inserted, and every
+        other row is refreshed from the new database in place, keeping
+        its PV values, bypass countdown, and history.
+
+        States are FaultState ids, which the new database may renumber.
+        The current state and the history were both decoded with the old
+        database, so both are mapped through diff.state_ids; a state
+        without a match is kept as is until the next monitor."""
+        rows = diff.fault_rows
+        removed = [row for row, new in enumerate(rows) if new is None]
+        for first, last in reversed(row_ranges(removed)):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            for name in self.row_lists:
+                del getattr(self, name)[first:last + 1]
+            self.endRemoveRows()
+        self.history.remap(rows, diff.state_ids)
+        self.byp_schedule.remap(rows, len(model.faults))
+
+        self.model = model
+        self.con_lst = self.model.db.conditions
+        self.con_bit = {con.id: i for i, con in enumerate(self.con_lst)}
+        self.con_col = [self.hdr_dict[self.con_name(con)] for con in self.con_lst]
+        if diff.conditions_changed:
+            self.con_active = 0
+
+        speed_limit = self.decoder.speed_limit
+        self.decoder = FaultDecoder(self.model.db, self.hdr_dict)
+        self.decoder.speed_limit = speed_limit
+
+        # Cards are renumbered by the new database
+        self.cards_down = {diff.card_ids[c] for c in self.cards_down if c in diff.card_ids}
+        self.card_rows = {}
+        self.card_names = {}
+
+        # Refresh the remaining rows, decoding their states again with
+        # the new database's ids
+        for row in range(len(self._data)):
+            self.set_fault(row, self.model.faults[row])
+            value, self.states[row] = self.states[row], None
+            if value is not None:
+                self.update_state(diff.state_ids.get(value, value), row)
+        if self._data:
+            self.cells_changed(self.index(0, 0),
+                               self.index(len(self._data) - 1, len(self.hdr_lst) - 1))
+
+        added = self.model.faults[len(self._data):]
+        if added:
+            first = len(self._data)
+            self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+            for fault in added:
+                self.add_row(fault)
+            self.endInsertRows()
+        self.outages_changed.emit()
+
+    def begin_bulk_load(self):
+        """Start taking values without notifying the views, e.g. while
+        the first value of every PV arrives at startup. The proxies keep
+        their filter and sort results from before until end_bulk_load."""
+        self.bulk_loading = True
+
+    def end_bulk_load(self):
+        """Publish the values taken since begin_bulk_load with a single
+        reset, so each proxy filters and sorts once."""
+        if not self.bulk_loading:
+            return
+        self.bulk_loading = False
+        self.beginResetModel()
+        self.endResetModel()
+        self.outages_changed.emit()
+
+    def reported_fraction(self) -> float:
+        """Return the fraction of faults that have a state."""
+        if not self.states:
+            return 1.0
+        return 1 - self.states.count(None) / len(self.states)
+
+    def cells_changed(self, top_left: QModelIndex, bottom_right: QModelIndex):
+        """Emit dataChanged for the cells unless loading in bulk."""
+        if not self.bulk_loading:
+            self.dataChanged.emit(top_left, bottom_right)
 
     @Slot(int, int)
     def set_state(self, value: int, row: int):
         """Called when a Fault's state changes. Set the Fault's
         description and beam destinations based on the current state."""
-        self._data[row][1:self.conind[0]] = ["-"] * (self.conind[0] - 1)
+        if not self.update_state(value, row):
+            return
+        if self.row_card[row] in self.cards_down:
+            self.outages_changed.emit()
+        self.cells_changed(self.index(row, 1),
+                           self.index(row, self.cind - 1))
+
+    def set_states(self, rows: list, value: int):
+        """Set the same state for many faults (e.g. every fault of an
+        IOC timing out) with a single dataChanged over the rows."""
+        changed = [row for row in rows if self.update_state(value, row)]
+        if not changed:
+            return
+        if self.cards_down:
+            self.outages_changed.emit()
+        self.cells_changed(self.index(min(changed), 1),
+                           self.index(max(changed), self.cind - 1))
+
+    def update_state(self, value: int, row: int) -> bool:
+        """Update the row's cells for a new state without notifying the
+        views. Returns whether the state changed. The first state after
+        the fault's PVs reconnect is recorded in the history as its own
+        transition; the first state at startup isn't recorded."""
+        if self.states[row] == value:
+            return False
+        if self.states[row] is not None:
+            self.history.append(row, ColKind.STATE, value)
+        elif self.reconnecting[row]:
+            self.history.append(row, ColKind.CONN, value)
+            self.reconnecting[row] = False
+        self.states[row] = value
+
+        self._data[row][1:self.cind] = ["-"] * (self.cind - 1)
         self.status[row] = Statuses.GRN
+        self.row_class[row] = None
 
         if value == 0:
             # Analog 'OK' State: all cells should be represented as '-'
-            self.dataChanged.emit(self.index(row, 1),
-                                  self.index(row, self.conind[0] - 1))
-            return
+            return True
         elif value == -1:
             # Timeout State: all cells should be represented as 'TIMEOUT'
-            self._data[row][1:self.conind[0]] = ["TIMEOUT"] * (self.conind[0] - 1)
+            self._data[row][1:self.cind] = ["TIMEOUT"] * (self.cind - 1)
             self.status[row] = Statuses.MAG
-            self.dataChanged.emit(self.index(row, 1),
-                                  self.index(row, self.conind[0] - 1))
-            return
+            return True
 
-        try:
-            curr_state = (self.session.query(FaultState)
-                          .filter(FaultState.id == value).one())
-        except NoResultFound:
+        info = self.state_info(value)
+        if info is None:
             # Database Error State: all cells should be "DB_ERROR"
-            self._data[row][1:self.conind[0]] = ["DB_ERROR"] * (self.conind[0] - 1)
+            self._data[row][1:self.cind] = ["DB_ERROR"] * (self.cind - 1)
             self.status[row] = Statuses.MAG
-            self.dataChanged.emit(self.index(row, 1),
-                                  self.index(row, self.conind[0] - 1))
+            return True
+        self._data[row][1] = info[0]
+        for col, cl_name, _ in info[1]:
+            self._data[row][col] = cl_name
+        self.row_class[row] = info[2]
+        self.status[row] = self.class_status(info[2])
+        return True
+
+    def set_disconnected(self, rows: list):
+        """Called when the PVs of many faults disconnect at once. Reset
+        the rows to their disconnected (white) state with a single
+        dataChanged; their values are set again once they reconnect."""
+        for row in rows:
+            self.states[row] = None
+            self.reconnecting[row] = True
+            self.row_class[row] = None
+            self.status[row] = Statuses.WHT
+            self._data[row][1:self.cind] = ["DISCONNECTED"] * (self.cind - 1)
+            for col in (self.bind, self.iind, self.aind):
+                self._data[row][col] = "?"
+            self.schedule_byp(row)
+        if self.cards_down:
+            self.outages_changed.emit()
+        self.cells_changed(self.index(min(rows), 1),
+                           self.index(max(rows), len(self.hdr_lst) - 1))
+
+    def state_info(self, value: int):
+        """Return the decoder's cached info for a FaultState."""
+        return self.decoder.state_info(value)
+
+    def class_status(self, cl_num: float) -> Statuses:
+        """Return the status for a state's lowest allowed class number."""
+        return self.decoder.class_status(cl_num)
+
+    @Slot(int)
+    def set_max_permit(self, value: int):
+        """Called when the MPS max permit changes. Re-evaluate the
+        status of every row in one pass and emit a single dataChanged."""
+        if value - 1 == self.decoder.speed_limit:
             return
-        else:
-            self._data[row][1] = curr_state.device_state.description
+        self.decoder.speed_limit = value - 1
 
-        for cl in curr_state.allowed_classes:
-            if cl.beam_class.name == "Full":
+        new_status = [s if c is None else self.class_status(c)
+                      for s, c in zip(self.status, self.row_class)]
+        if new_status == self.status:
+            return
+        self.status = new_status
+        self.cells_changed(self.index(0, 1),
+                           self.index(len(self._data) - 1, self.cind - 1))
+
+    def history_text(self, kind: ColKind, code: int):
+        """Return the text and status shown for a transition recorded
+        in the fault history."""
+        if kind in (ColKind.STATE, ColKind.CONN):
+            return self.decoder.state_text(code)[:2]
+
+        txt = self.decoder.flag_text(kind, code)
+        if kind in (ColKind.BYP, ColKind.IGN):
+            return (txt, Statuses.YEL if code else Statuses.GRN)
+        return (txt, Statuses.GRN if code else Statuses.WHT)
+
+    def first_faults(self, seconds: float = None) -> dict:
+        """Return the first state transition that limited each
+        destination within the last `seconds` (or the whole history) as
+        {destination: (row, kind, code, timestamp)}."""
+        firsts = {}
+        for entry in self.history.since(seconds):
+            if entry[1] not in (ColKind.STATE, ColKind.CONN):
+                continue
+            info = self.state_info(entry[2])
+            if not info:
                 continue
+            for col, _, _ in info[1]:
+                firsts.setdefault(self.hdr_lst[col], entry)
+            if len(firsts) == len(self.model.dest_lst):
+                break
+        return firsts
+
+    def set_con(self, value: int, bit: int):
+        """Called when a Condition's state changes. Update the mask of
+        active conditions and refresh the condition columns so views
+        filtering on ignored_by_active are re-evaluated."""
+        active = self.con_active | (1 << bit) if value else self.con_active & ~(1 << bit)
+        if active == self.con_active:
+            return
+        self.con_active = active
+        if self.conind and self._data:
+            self.cells_changed(self.index(0, self.conind[0]),
+                               self.index(len(self._data) - 1, self.conind[-1]))
+
+    def set_card_down(self, card_id: int, down: bool):
+        """Called when an application card goes offline or comes back.
+        Only the card's own faults are refreshed, so views hiding
+        dependent faults re-filter just those rows."""
+        if down == (card_id in self.cards_down):
+            return
+        if down:
+            self.cards_down.add(card_id)
+        else:
+            self.cards_down.discard(card_id)
 
-            col = self.hdr_lst.index(cl.beam_destination.name)
-            self._data[row][col] = cl.beam_class.name
+        for row in self.card_rows.get(card_id, []):
+            self.cells_changed(self.index(row, 1), self.index(row, 1))
+        self.outages_changed.emit()
 
-            # Find Beam Class values in MPS Beam Class Definitions display
-            if self.status[row] == Statuses.RED:
-                # Status already accounted for
-                continue
-            if cl.beam_class.number < 2:
-                self.status[row] = Statuses.RED
-            elif cl.beam_class.number < self.speed_limit:
-                self.status[row] = Statuses.YEL
+    def dependent_fault(self, row: int) -> bool:
+        """Return whether the fault timed out because its card is offline."""
+        return self.states[row] == -1 and self.row_card[row] in self.cards_down
+
+    def outages(self) -> dict:
+        """Return the number of dependent faults of each offline card."""
+        return {card_id: sum(self.states[r] == -1 for r in self.card_rows.get(card_id, []))
+                for card_id in self.cards_down}
 
-        self.dataChanged.emit(self.index(row, 1),
-                              self.index(row, self.conind[0] - 1))
+    def ignored_by_active(self, row: int) -> bool:
+        """Return whether the fault is ignored by an active condition."""
+        return bool(self.ign_mask[row] & self.con_active)
 
     @Slot(int, int)
     def set_byp(self, value: int, row: int):
         """Sets the 'Bypassed' cell for the given row."""
-        self._data[row][self.bind] = "Y" if value else "N"
-        self.dataChanged.emit(self.index(row, self.bind),
-                              self.index(row, self.bind))
+        txt = self.decoder.flag_text(ColKind.BYP, value)
+        if self._data[row][self.bind] == txt:
+            return
+        if self._data[row][self.bind] != "?":
+            self.history.append(row, ColKind.BYP, int(bool(value)))
+        self._data[row][self.bind] = txt
+        self.cells_changed(self.index(row, self.bind),
+                           self.index(row, self.bind))
+        self.schedule_byp(row)
 
     @Slot(str, int)
     def set_byp_exp(self, value: str, row: int):
         """Sets the 'Bypass Exp Date' cells for the given row."""
+        if self._data[row][self.beind] == value:
+            return
         self._data[row][self.beind] = value
-        self.dataChanged.emit(self.index(row, self.beind),
-                              self.index(row, self.beind))
+        self.byp_exp_stamp[row] = parse_expiry(value)
+        self.cells_changed(self.index(row, self.beind),
+                           self.index(row, self.beind))
+        self.schedule_byp(row)
+
+    def schedule_byp(self, row: int):
+        """Track the row's bypass expiration while it is bypassed."""
+        bypassed = self._data[row][self.bind] == "Y"
+        self.byp_schedule.set_expiry(row, self.byp_exp_stamp[row] if bypassed else None)
+
+    @Slot(int)
+    def set_byp_rem(self, row: int):
+        """Sets the 'Time Remaining' cell when its countdown changes."""
+        self._data[row][self.brind] = self.byp_schedule.text[row]
+        self.cells_changed(self.index(row, self.brind),
+                           self.index(row, self.brind))
 
     @Slot(int, int)
     def set_ign(self, value: int, row: int):
         """Sets the 'Ignored' cell for the given row."""
-        self._data[row][self.iind] = "Ignored" if bool(value) else "Not Ignored"
-        self.dataChanged.emit(self.index(row, self.iind),
-                              self.index(row, self.iind))
+        txt = self.decoder.flag_text(ColKind.IGN, value)
+        if self._data[row][self.iind] == txt:
+            return
+        if self._data[row][self.iind] != "?":
+            self.history.append(row, ColKind.IGN, int(bool(value)))
+        self._data[row][self.iind] = txt
+        self.cells_changed(self.index(row, self.iind),
+                           self.index(row, self.iind))
 
     @Slot(int, int)
     def set_act(self, value: int, row: int):
         """Sets the 'Active' cell for the given row."""
-        self._data[row][self.aind] = "Y" if value else "N"
-        self.dataChanged.emit(self.index(row, self.aind),
-                              self.index(row, self.aind))
-
-    def less_than(self, left: QModelIndex, right: QModelIndex):
-        """Called by MPSSortFilterProxyModel to sort rows based on the
-        app's status."""
-        left_state = left.data()
-        right_state = right.data()
-
-        if 0 < left.column() < self.conind[0]:
-            left_state = self.status[left.row()].num()
-            right_state = self.status[right.row()].num()
+        txt = self.decoder.flag_text(ColKind.ACT, value)
+        if self._data[row][self.aind] == txt:
+            return
+        if self._data[row][self.aind] != "?":
+            self.history.append(row, ColKind.ACT, int(bool(value)))
+        self._data[row][self.aind] = txt
+        self.cells_changed(self.index(row, self.aind),
+                           self.index(row, self.aind))
+
+    def sort_key(self, row: int, col: int):
+        """Return the key used to sort a cell. Status columns sort by
+        the row's status, expiration columns by the parsed expiration,
+        and everything else by the cell's text."""
+        kind = self.col_kind[col]
+        if kind in (ColKind.STATE, ColKind.DEST):
+            txt = self._data[row][col]
+            state = self.status[row].num()
 
             # Reduce priority of Ignored faults
-            if self._data[left.row()][self.iind] == "Ignored":
-                left_state -= .5
-            if self._data[right.row()][self.iind] == "Ignored":
-                right_state -= .5
+            if self._data[row][self.iind] == "Ignored":
+                state -= .5
 
             # Reduce priority of fault if the sort destination is Full
             # Increase priority of fault if the cell is not a '-'
-            if left.column() != 1:
-                if left.data() == '-' and left_state > 0:
-                    left_state /= 10
-                elif left.data() != '-':
-                    left_state += .35
-
-                if right.data() == '-' and right_state > 0:
-                    right_state /= 10
-                elif right.data() != '-':
-                    right_state += .35
-
-        if (0 < left.column() < self.conind[-1]
-                or left.column() == self.bind
-                or left.column() == self.aind):
-            return right_state < left_state
-
-        return left_state < right_state
-
-    def filter_accepts_row(self, row: int, parent: QModelIndex, filters: dict):
-        """Called by MPSSortFilterProxyModel to filter out rows based on
-        the table's needs."""
-        for col, text in filters.items():
-            if col == 1:
-                if not self.status[row].faulted():
-                    return False
-            else:
-                if text not in str(self._data[row][col]).lower():
-                    return False
-        return True
+            if kind == ColKind.DEST:
+                if txt == '-' and state > 0:
+                    state /= 10
+                elif txt != '-':
+                    state += .35
+            return state
+        elif kind in (ColKind.BYP_EXP, ColKind.BYP_REM):
+            # Sort by the parsed expiration, with unknown dates last
+            return self.byp_exp_stamp[row] or float('inf')
+        return self._data[row][col]
+
+    def filter_accepts_term(self, row: int, col: int, text: str) -> bool:
+        """Return whether a row passes one column filter. The state
+        column accepts faulted rows, other columns rows whose text
+        contains the filter's text."""
+        if self.col_kind[col] == ColKind.STATE:
+            return self.status[row].faulted()
+        return text in str(self._data[row][col]).lower()
 
     def middle_click_data(self, index: QModelIndex):
         """Method called by the ItemDelegate. Returns the data to be
         sent to the clipboard."""
         if index.column() == 0:
-            return index.data()
+            return self._data[index.row()][0]
         return self.channels[index.row()]
 
 
-class MPSSortFilterModel(QSortFilterProxyModel):
-    """Customized QSortFilterProxyModel to allow the user to sort and
-    filter the customized QAbstractTableModel. Allows for functionality
-    for the summary table, bypass table, and logic table."""
-    def __init__(self, parent):
-        super(MPSSortFilterModel, self).__init__(parent)
+class ProxyFilters:
+    """Column filters and named predicates shared by the proxies over
+    the Logic and App Status tables. Subclasses re-evaluate their rows
+    in refilter."""
+    def init_filters(self):
         self.filters = {}
+        self.predicates = {}
+
+    def refilter(self):
+        """Re-evaluate the filters after they change."""
+        raise NotImplementedError
 
     def setFilterByColumn(self, column: int, text: str):
         """Sets the filters to be used on individual columns."""
         self.filters[column] = text.lower()
-        self.invalidateFilter()
+        self.refilter()
 
     def removeFilterByColumn(self, column: int):
         """Removes the filters from a given column."""
         if column in self.filters:
             del self.filters[column]
-            self.invalidateFilter()
+            self.refilter()
+
+    def setFilterPredicate(self, name: str, predicate):
+        """Sets a named filter that accepts a source row if
+        predicate(row) is True."""
+        self.predicates[name] = predicate
+        self.refilter()
+
+    def removeFilterPredicate(self, name: str):
+        """Removes the named filter."""
+        if name in self.predicates:
+            del self.predicates[name]
+            self.refilter()
+
+
+class MPSSortFilterModel(ProxyFilters, QSortFilterProxyModel):
+    """Customized QSortFilterProxyModel to allow the user to sort and
+    filter the customized QAbstractTableModel. Used for the App Status
+    table; the views over the LogicTableModel are MPSViewModels."""
+    def __init__(self, parent):
+        super(MPSSortFilterModel, self).__init__(parent)
+        self.init_filters()
+
+    def refilter(self):
+        """Re-evaluate the filters after they change."""
+        self.invalidateFilter()
 
     def lessThan(self, left: QModelIndex, right: QModelIndex):
         """Override QSortFilterProxyModel's lessThan method to sort
@@ -291,9 +652,164 @@ class MPSSortFilterModel(QSortFilterProxyModel):
     def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex):
         """Override QSortFilterProxyModel's filterAcceptsRow method to
         filter out rows based on the table's needs."""
+        for predicate in self.predicates.values():
+            if not predicate(source_row):
+                return False
         return self.sourceModel().filter_accepts_row(source_row, source_parent, self.filters)
 
 
+class MPSViewModel(ProxyFilters, QAbstractProxyModel):
+    """Thin proxy for the summary table, bypass table, logic table, and
+    ignore table. The LogicTableModel's ViewEngine keeps the source rows
+    the view shows, in order, in self.rows, and tells the proxy which
+    rows to insert, remove or move; the proxy only maps through the
+    list, so selections survive updates."""
+    def __init__(self, parent):
+        super(MPSViewModel, self).__init__(parent)
+        self.init_filters()
+        self.engine = None
+        self.accepted = bytearray()
+        self.rows = []
+        self.sort_column = -1
+        self.sort_order = Qt.AscendingOrder
+
+    def setSourceModel(self, model: LogicTableModel):
+        """Set the source model and register with its view engine."""
+        self.beginResetModel()
+        if self.engine is not None:
+            self.engine.unregister(self)
+        super(MPSViewModel, self).setSourceModel(model)
+        self.engine = model.view_engine
+        self.engine.register(self)
+        self.endResetModel()
+
+    def refilter(self):
+        """Re-evaluate the filters after they change."""
+        if self.engine is not None:
+            self.engine.refresh(self)
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.AscendingOrder):
+        """Called by the view to sort on a column."""
+        self.sort_column, self.sort_order = column, order
+        if self.engine is not None:
+            self.engine.resort(self)
+
+    def position(self, source_row: int):
+        """Return the proxy row of a source row, or None if the view
+        doesn't show it."""
+        return self.engine.locate(self, source_row)
+
+    def renumber(self, rows: list):
+        """Replace the source row numbers after rows are added to or
+        removed from the model. The proxy rows don't change."""
+        self.rows = rows
+
+    def end_reset(self):
+        """Finish a reset once the engine has rebuilt self.rows."""
+        self.endResetModel()
+
+    def place(self, source_row: int, old, new):
+        """Move a source row from proxy row old to proxy row new, where
+        either may be None for a row that joins or leaves the view."""
+        if old is None and new is None:
+            return
+        if old is None:
+            self.beginInsertRows(QModelIndex(), new, new)
+            self.rows.insert(new, source_row)
+            self.endInsertRows()
+        elif new is None:
+            self.beginRemoveRows(QModelIndex(), old, old)
+            del self.rows[old]
+            self.endRemoveRows()
+        elif new != old:
+            self.beginMoveRows(QModelIndex(), old, old, QModelIndex(),
+                               new + 1 if new > old else new)
+            del self.rows[old]
+            self.rows.insert(new, source_row)
+            self.endMoveRows()
+
+    def update(self, rows: list):
+        """Show a new list of source rows: remove the rows that left,
+        reorder the ones that stayed, then insert the ones that joined."""
+        new = set(rows)
+        left = [i for i, row in enumerate(self.rows) if row not in new]
+        for first, last in reversed(row_ranges(left)):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.rows[first:last + 1]
+            self.endRemoveRows()
+
+        old = set(self.rows)
+        kept = [row for row in rows if row in old]
+        if kept != self.rows:
+            self.layoutAboutToBeChanged.emit()
+            persistent = self.persistentIndexList()
+            cells = [(self.rows[i.row()], i.column()) for i in persistent]
+            positions = {row: pos for pos, row in enumerate(kept)}
+            self.rows = kept
+            self.changePersistentIndexList(persistent, [self.index(positions[row], col)
+                                                        for row, col in cells])
+            self.layoutChanged.emit()
+
+        joined = [i for i, row in enumerate(rows) if row not in old]
+        for first, last in row_ranges(joined):
+            self.beginInsertRows(QModelIndex(), first, last)
+            self.rows[first:first] = rows[first:last + 1]
+            self.endInsertRows()
+
+    def forward(self, first: int, last: int, left: int, right: int):
+        """Emit dataChanged for the shown rows among the changed source
+        rows first to last. Large ranges repaint every row."""
+        if last - first >= self.engine.batch_rows:
+            shown = [0, len(self.rows) - 1] if self.rows else []
+        else:
+            shown = [pos for pos in map(self.position, range(first, last + 1))
+                     if pos is not None]
+        if shown:
+            self.dataChanged.emit(self.createIndex(min(shown), left),
+                                  self.createIndex(max(shown), right))
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()):
+        if (parent.isValid() or not 0 <= row < len(self.rows)
+                or not 0 <= column < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index: QModelIndex = None):
+        if index is None:
+            return QObject.parent(self)
+        return QModelIndex()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().columnCount()
+
+    def mapToSource(self, index: QModelIndex):
+        if not index.isValid():
+            return QModelIndex()
+        return self.sourceModel().index(self.rows[index.row()], index.column())
+
+    def mapFromSource(self, index: QModelIndex):
+        if not index.isValid():
+            return QModelIndex()
+        pos = self.position(index.row())
+        if pos is None:
+            return QModelIndex()
+        return self.index(pos, index.column())
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: Qt.ItemDataRole = Qt.DisplayRole):
+        """Pass the header through; vertical sections are source rows."""
+        if orientation == Qt.Vertical:
+            if not 0 <= section < len(self.rows):
+                return None
+            section = self.rows[section]
+        return self.sourceModel().headerData(section, orientation, role)
+
+
 class MPSItemDelegate(QStyledItemDelegate):
     """Customized QStyledItemDelegate to allow the user to copy
     some fault information from the table. Mimics functionality from
@@ -0,0 +1,122 @@
+from time import monotonic
+from threading import Lock
+from typing import (Callable, Dict, NamedTuple)
+from qtpy.QtCore import (QObject, QTimer, Slot)
+from enums import FaultPV
+
+
+class MonitorPolicy(NamedTuple):
+    """Filtering policy for one family of PVs. min_interval is the
+    minimum number of seconds between values passed to the model."""
+    dedup: bool = True
+    min_interval: float = 0.0
+
+
+DEFAULT_POLICIES = {FaultPV.STATE: MonitorPolicy(min_interval=0.25),
+                    FaultPV.BYP: MonitorPolicy(),
+                    FaultPV.BYP_EXP: MonitorPolicy(),
+                    FaultPV.IGN: MonitorPolicy(),
+                    FaultPV.ACT: MonitorPolicy()}
+
+
+class MonitorFilter(QObject):
+    """Sits between the epics.PV callbacks and the model's signals.
+    Identical consecutive values are dropped and values arriving faster
+    than the family's min_interval are held back, with the most recent
+    value being sent once the interval has passed."""
+    def __init__(self, parent, emitters: Dict[FaultPV, Callable],
+                 policies: Dict[FaultPV, MonitorPolicy] = None):
+        super(MonitorFilter, self).__init__(parent)
+        self.emitters = emitters
+        self.policies = dict(DEFAULT_POLICIES)
+        if policies:
+            self.policies.update(policies)
+
+        self._lock = Lock()
+        self._sent = {}
+        self._times = {}
+        self._pending = {}
+
+        self.dropped = {fam: 0 for fam in FaultPV}
+        self.throttled = {fam: 0 for fam in FaultPV}
+
+        intervals = [p.min_interval for p in self.policies.values() if p.min_interval > 0]
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.flush)
+        if intervals:
+            self.timer.start(int(min(intervals) * 1000))
+
+    def push(self, fam: FaultPV, value, row: int):
+        """Called from the PV callbacks. Emit the value if it passes the
+        family's policy, otherwise count it as suppressed."""
+        policy = self.policies[fam]
+        key = (fam, row)
+
+        with self._lock:
+            if policy.dedup and key in self._sent and self._sent[key] == value:
+                if self._pending.pop(key, None) is not None:
+                    self.throttled[fam] += 1
+                self.dropped[fam] += 1
+                return
+
+            now = monotonic()
+            if now - self._times.get(key, float('-inf')) < policy.min_interval:
+                if key in self._pending:
+                    self.throttled[fam] += 1
+                self._pending[key] = value
+                return
+
+            if self._pending.pop(key, None) is not None:
+                self.throttled[fam] += 1
+            self._sent[key] = value
+            self._times[key] = now
+
+        self.emitters[fam](value, row)
+
+    @Slot()
+    def flush(self):
+        """Send held-back values whose family interval has passed."""
+        now = monotonic()
+        ready = []
+        with self._lock:
+            for key, value in self._pending.items():
+                if now - self._times[key] >= self.policies[key[0]].min_interval:
+                    ready.append((key, value))
+            for key, value in ready:
+                del self._pending[key]
+                self._sent[key] = value
+                self._times[key] = now
+
+        for (fam, row), value in ready:
+            self.emitters[fam](value, row)
+
+    def forget(self, rows: list):
+        """Forget the last values sent for the rows, e.g. after their PVs
+        disconnect, so the next values are always passed on."""
+        rows = set(rows)
+        with self._lock:
+            for values in (self._sent, self._times, self._pending):
+                for key in [k for k in values if k[1] in rows]:
+                    del values[key]
+
+    def remap(self, rows: list):
+        """Renumber the rows after faults are added or removed.
+        rows[old_row] is the new row, or None to forget the row."""
+        with self._lock:
+            for values in (self._sent, self._times, self._pending):
+                remapped = {(fam, rows[row]): v for (fam, row), v in values.items()
+                            if rows[row] is not None}
+                values.clear()
+                values.update(remapped)
+
+    def suppressed(self) -> dict:
+        """Return the number of suppressed values for each family."""
+        return {fam.name: {"dropped": self.dropped[fam],
+                           "throttled": self.throttled[fam]}
+                for fam in FaultPV}
+
+    def report(self) -> str:
+        """Return the suppressed values of each family as text."""
+        counts = ", ".join(f"{fam.name} {c['dropped']} / {c['throttled']}"
+                           for fam, c in zip(FaultPV, self.suppressed().values()))
+        return f"Monitor values suppressed (dropped / throttled): {counts}"
@@ -5,6 +5,7 @@ from sqlalchemy.exc import DatabaseError
 from mps_database.models import (Fault, BeamDestination)
 from mps_database.mps_config import MPSConfig
 from mps_database.tools.mps_names import MpsName
+from models_pkg.db_snapshot import DBSnapshot
 
 
 class MPSModel:
@@ -12,13 +13,7 @@ class MPSModel:
         """Establish logger and establish connection to mps_database."""
         logger = getLogger(__name__)
 
-        if filename and path.exists(filename):
-            self.filename = filename
-        else:
-            if filename:
-                logger.error("File does not exist. Using default .db file.")
-            self.filename = self.set_filename()
-
+        self.filename = self.find_file(filename)
         try:
             self.config = MPSConfig(self.filename)
             self.name = MpsName(self.config.session)
@@ -30,8 +25,20 @@ class MPSModel:
 
         self.get_faults()
         self.get_dests()
+        self.freeze()
 
-    def set_filename(self):
+    @classmethod
+    def find_file(cls, filename=None):
+        """Return the file MPSModel loads for filename: the file if it
+        exists, otherwise the default database."""
+        if filename and path.exists(filename):
+            return filename
+        if filename:
+            getLogger(__name__).error("File does not exist. Using default .db file.")
+        return cls.set_filename()
+
+    @staticmethod
+    def set_filename():
         """Finds default database filename."""
         phys_top = path.expandvars("$PHYSICS_TOP")
         phys_top += "/mps_configuration/current/"
@@ -50,11 +57,20 @@ class MPSModel:
         self.dest_lst.insert(4, self.dest_lst.pop(0))
         self.dest_lst.insert(1, self.dest_lst.pop(0))
 
+    def freeze(self):
+        """Copy everything the display uses into a DBSnapshot and close
+        the database session. After this no code reads the database, so
+        self.config and self.name are released."""
+        self.db = DBSnapshot(self.config.session, self.name, self.faults)
+        self.faults = self.db.faults
+        self.config.session.close()
+        self.config = None
+        self.name = None
+
     def fault_to_dev(self, fault):
-        """Get a models.Device object from a models.Fault object."""
-        return self.name.getDeviceFromFault(fault)
+        """Get a Device from a Fault."""
+        return self.db.fault_devs[fault.id]
 
     def fault_to_inp(self, fault):
-        """Get a list of Inputs from a models.Device object."""
-        dev = self.name.getDeviceFromFault(fault)
-        return self.name.getInputsFromDevice(dev, fault)
+        """Get the input PV names of a Fault's Device."""
+        return self.db.fault_inputs[fault.id]
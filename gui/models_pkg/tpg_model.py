@@ -0,0 +1,47 @@
+from functools import partial
+from epics import PV
+from epics.dbr import DBE_VALUE
+from qtpy.QtCore import (QObject, Signal)
+
+
+class TPGModeTable(QObject):
+    """Keeps the current TPG mode and the allowed destinations of every
+    mode in memory. All mode and destination name PVs are monitored up
+    front, so lookups never touch the network. The changed signal is
+    emitted (and delivered in the GUI thread) whenever the current mode
+    or one of its destination names changes."""
+    prefix = "TPG:SYS0:1"
+    num_dests = 6
+
+    changed = Signal()
+
+    def __init__(self, parent, modes):
+        super(TPGModeTable, self).__init__(parent)
+        self.mode = None
+        self.dest_names = {mode: [None] * self.num_dests for mode in modes}
+
+        self.pvs = [PV(f"{self.prefix}:MODE",
+                       callback=self.set_mode,
+                       auto_monitor=DBE_VALUE)]
+        for mode in modes:
+            for i in range(self.num_dests):
+                self.pvs.append(PV(f"{self.prefix}:{mode}:DST0{i}_NAME",
+                                   callback=partial(self.set_dest_name, mode=mode, ind=i),
+                                   auto_monitor=DBE_VALUE))
+
+    def set_mode(self, value, **kw):
+        """Callback for the MODE PV."""
+        self.mode = value
+        self.changed.emit()
+
+    def set_dest_name(self, value, mode: str, ind: int, **kw):
+        """Callback for the DST0{ind}_NAME PVs of the given mode."""
+        self.dest_names[mode][ind] = value
+        if mode == self.mode:
+            self.changed.emit()
+
+    def allowed_dests(self, mode: str = None) -> list:
+        """Return the destinations allowed by the given mode, or by the
+        current mode if none is given."""
+        names = self.dest_names.get(mode or self.mode, [])
+        return [n for n in names if n and n != 'NULL']
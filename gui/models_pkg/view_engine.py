@@ -0,0 +1,259 @@
+from itertools import compress
+from qtpy.QtCore import (QObject, Qt, Slot, QModelIndex)
+
+
+class ViewEngine(QObject):
+    """Maintains the filtered, sorted rows of every MPSViewModel over a
+    LogicTableModel. The engine is the only listener to the model's
+    changes. For each batch of changed rows it updates the sort keys in
+    use once, tests each filter term once per row (views using the same
+    term or predicate share the result), and hands every view whose rows
+    changed its new row list. The views only map through those lists,
+    so they never filter or sort themselves."""
+    def __init__(self, model):
+        super(ViewEngine, self).__init__(model)
+        self.model = model
+        self.views = []
+        self.keys = {}
+
+        # Batches of changed rows up to this size update the views row
+        # by row; larger ones rebuild the views' row lists
+        self.batch_rows = 32
+
+        self.model.dataChanged.connect(self.rows_changed)
+        self.model.modelAboutToBeReset.connect(self.begin_reset)
+        self.model.modelReset.connect(self.end_reset)
+        self.model.rowsAboutToBeRemoved.connect(self.rows_about_to_be_removed)
+        self.model.rowsRemoved.connect(self.rows_removed)
+        self.model.rowsInserted.connect(self.rows_inserted)
+
+    def register(self, view):
+        """Start maintaining the rows of a view."""
+        if view not in self.views:
+            self.views.append(view)
+        view.accepted = bytearray(self.test(view, row, {})
+                                  for row in range(self.model.rowCount()))
+        view.rows = self.ordered(view)
+
+    def unregister(self, view):
+        """Stop maintaining the rows of a view."""
+        if view in self.views:
+            self.views.remove(view)
+            self.prune_keys()
+
+    def refresh(self, view):
+        """Re-test a view's filters on every row, e.g. after the view's
+        filters change."""
+        view.accepted = bytearray(self.test(view, row, {})
+                                  for row in range(self.model.rowCount()))
+        view.update(self.ordered(view))
+
+    def resort(self, view):
+        """Reorder a view's rows after its sort column or order changes."""
+        self.prune_keys()
+        view.update(self.ordered(view))
+
+    def test(self, view, row: int, terms: dict) -> bool:
+        """Return whether the view accepts the row. terms caches the
+        result of each predicate and column filter for the row, so other
+        views using them don't evaluate them again."""
+        for predicate in view.predicates.values():
+            result = terms.get(predicate)
+            if result is None:
+                result = terms[predicate] = bool(predicate(row))
+            if not result:
+                return False
+        for term in view.filters.items():
+            result = terms.get(term)
+            if result is None:
+                result = terms[term] = self.model.filter_accepts_term(row, *term)
+            if not result:
+                return False
+        return True
+
+    def sort_keys(self, col: int) -> list:
+        """Return the sort keys of a column. They are computed for every
+        row the first time any view sorts on the column."""
+        keys = self.keys.get(col)
+        if keys is None:
+            keys = self.keys[col] = [self.model.sort_key(row, col)
+                                     for row in range(self.model.rowCount())]
+        return keys
+
+    def prune_keys(self):
+        """Drop the sort keys of columns no view sorts on."""
+        used = {view.sort_column for view in self.views}
+        for col in [c for c in self.keys if c not in used]:
+            del self.keys[col]
+
+    def descending(self, view) -> bool:
+        """Return whether the view's rows are in descending key order.
+        Columns in rev_sort_kinds sort their keys in reverse."""
+        col = view.sort_column
+        return ((view.sort_order == Qt.DescendingOrder)
+                != (col >= 0 and self.model.col_kind[col] in self.model.rev_sort_kinds))
+
+    def ordered(self, view) -> list:
+        """Return the rows the view accepts, in the view's sort order.
+        Ties keep the model's row order, as in a QSortFilterProxyModel."""
+        rows = list(compress(range(self.model.rowCount()), view.accepted))
+        if view.sort_column >= 0:
+            rows.sort(key=self.sort_keys(view.sort_column).__getitem__,
+                      reverse=self.descending(view))
+        return rows
+
+    @Slot()
+    def begin_reset(self):
+        """Reset the views along with the model."""
+        for view in self.views:
+            view.beginResetModel()
+
+    @Slot()
+    def end_reset(self):
+        """Rebuild every view's rows after the model is reset, testing
+        each row's terms once for all views."""
+        self.keys.clear()
+        count = self.model.rowCount()
+        for view in self.views:
+            view.accepted = bytearray(count)
+        for row in range(count):
+            terms = {}
+            for view in self.views:
+                view.accepted[row] = self.test(view, row, terms)
+        for view in self.views:
+            view.rows = self.ordered(view)
+            view.end_reset()
+
+    @Slot(QModelIndex, int, int)
+    def rows_about_to_be_removed(self, parent: QModelIndex, first: int, last: int):
+        """Remove the rows from the views while they still exist."""
+        for view in self.views:
+            view.update([row for row in view.rows if not first <= row <= last])
+
+    @Slot(QModelIndex, int, int)
+    def rows_removed(self, parent: QModelIndex, first: int, last: int):
+        """Renumber the rows after the removed ones."""
+        count = last - first + 1
+        for keys in self.keys.values():
+            del keys[first:last + 1]
+        for view in self.views:
+            del view.accepted[first:last + 1]
+            view.renumber([row - count if row > last else row for row in view.rows])
+
+    @Slot(QModelIndex, int, int)
+    def rows_inserted(self, parent: QModelIndex, first: int, last: int):
+        """Renumber the rows after the inserted ones, then test the
+        inserted rows and add the accepted ones to the views."""
+        count = last - first + 1
+        rows = range(first, last + 1)
+        for col, keys in self.keys.items():
+            keys[first:first] = [self.model.sort_key(row, col) for row in rows]
+        for view in self.views:
+            view.renumber([row + count if row >= first else row for row in view.rows])
+            view.accepted[first:first] = bytearray(count)
+        for row in rows:
+            terms = {}
+            for view in self.views:
+                view.accepted[row] = self.test(view, row, terms)
+        for view in self.views:
+            view.update(self.ordered(view))
+
+    @Slot(QModelIndex, QModelIndex)
+    def rows_changed(self, top_left: QModelIndex, bottom_right: QModelIndex, *args):
+        """Update the sort keys and the filter results of the changed
+        rows. In small batches each changed row is moved, inserted or
+        removed on its own; larger batches rebuild the row lists of the
+        views whose rows changed."""
+        first, last = top_left.row(), bottom_right.row()
+        rows = range(first, last + 1)
+
+        # Previous sort keys of the changed rows whose keys changed
+        old_keys = {}
+        for col, keys in self.keys.items():
+            for row in rows:
+                key = self.model.sort_key(row, col)
+                if key != keys[row]:
+                    old_keys.setdefault(col, {})[row] = keys[row]
+                    keys[row] = key
+
+        terms = [{} for _ in rows]
+        small = len(rows) <= self.batch_rows
+        for view in self.views:
+            accepted = view.accepted
+            results = [self.test(view, row, row_terms) for row, row_terms in zip(rows, terms)]
+            moved = old_keys.get(view.sort_column, {})
+            if small:
+                moved = dict(moved)
+                for row, result in zip(rows, results):
+                    if result != accepted[row] or row in moved:
+                        self.place(view, row, result, moved)
+            elif moved or any(r != a for r, a in zip(results, accepted[first:last + 1])):
+                accepted[first:last + 1] = bytearray(results)
+                view.update(self.ordered(view))
+            view.forward(first, last, top_left.column(), bottom_right.column())
+
+    def lookup(self, view, pending: dict):
+        """Return a function giving the sort key of a row in the view's
+        row list. Rows in pending haven't been placed yet, so they are
+        still where their previous key (pending[row]) sorts them."""
+        if view.sort_column < 0:
+            return int
+        keys = self.keys[view.sort_column]
+        if not pending:
+            return keys.__getitem__
+        return lambda row: pending.get(row, keys[row])
+
+    def search(self, view, row: int, key, lookup) -> int:
+        """Return the position in the view's rows at which a row with
+        the sort key sorts."""
+        rows = view.rows
+        descending = self.descending(view)
+        lo, hi = 0, len(rows)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            other = rows[mid]
+            other_key = lookup(other)
+            if other_key == key:
+                before = other < row
+            elif descending:
+                before = key < other_key
+            else:
+                before = other_key < key
+            if before:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def locate(self, view, row: int):
+        """Return the position of a source row in the view's rows, or
+        None if the view doesn't show it."""
+        if not view.accepted[row]:
+            return None
+        lookup = self.lookup(view, {})
+        pos = self.search(view, row, lookup(row), lookup)
+        if pos < len(view.rows) and view.rows[pos] == row:
+            return pos
+        return None
+
+    def place(self, view, row: int, accepted: bool, moved: dict):
+        """Move, insert or remove one changed row in the view. moved
+        holds the previous sort keys of the batch's rows that haven't
+        been placed yet; the row is removed from it."""
+        old = None
+        if view.accepted[row]:
+            lookup = self.lookup(view, moved)
+            old = self.search(view, row, lookup(row), lookup)
+        moved.pop(row, None)
+        view.accepted[row] = accepted
+
+        new = None
+        if accepted:
+            # Search the rows without this one for its new position
+            if old is not None:
+                del view.rows[old]
+            lookup = self.lookup(view, moved)
+            new = self.search(view, row, lookup(row), lookup)
+            if old is not None:
+                view.rows.insert(old, row)
+        view.place(row, old, new)
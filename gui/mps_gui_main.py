@@ -1,6 +1,12 @@
 from logging import getLogger
-from subprocess import run
+from qtpy.QtCore import (Slot, QTimer)
 from pydm import Display
+from enums import Statuses
+from version import get_version
+from ui_cache import load_cached_ui
+from startup_profile import StartupProfile
+from memory_profile import MemoryProfile
+from pv_cache import (PVManifest, file_hash, read_cache, write_cache, prefetch)
 from models_pkg.mps_model import MPSModel
 from mixins.summary import SummaryMixin
 from mixins.logic import LogicMixin
@@ -8,16 +14,24 @@ from mixins.selection_detail import SelectionDetailsMixin
 from mixins.configure import ConfigureMixin
 from mixins.ignore import IgnoreMixin
 from mixins.app_status import AppStatusMixin
+from mixins.history import HistoryMixin
+from mixins.filter_expr import FilterExprMixin
+from mixins.db_reload import DBReloadMixin
 
 
 class MpsGuiDisplay(Display, SummaryMixin, LogicMixin, SelectionDetailsMixin,
-                    ConfigureMixin, IgnoreMixin, AppStatusMixin):
+                    ConfigureMixin, IgnoreMixin, AppStatusMixin, HistoryMixin,
+                    FilterExprMixin, DBReloadMixin):
     def git_version(self):
-        git_cmd = run("git describe --tags",
-                      text=True,
-                      shell=True,
-                      capture_output=True)
-        return git_cmd.stdout.strip()
+        return get_version()
+
+    def load_ui(self, macros=None):
+        """Load the display's widgets from the cached compiled .ui file,
+        falling back to PyDM's loader if it can't be compiled."""
+        if self.ui:
+            return self.ui
+        if not load_cached_ui(self, self.ui_filepath(), macros):
+            super(MpsGuiDisplay, self).load_ui(macros=macros)
 
     def __init__(self, parent=None, args=[], macros=None, ui_filename=None):
 
@@ -25,33 +39,99 @@ class MpsGuiDisplay(Display, SummaryMixin, LogicMixin, SelectionDetailsMixin,
         if 'CUD' in macros:
             cud_mode = (macros['CUD'] == "True")
 
+        # PROFILE_STARTUP is the import time log written by the launcher
+        profile = StartupProfile('PROFILE_STARTUP' in macros,
+                                 macros.get('PROFILE_STARTUP'))
+
+        # PROFILE_MEMORY is the number of seconds between memory reports
+        # (0 for a single report after startup). Tracing starts here so
+        # the widgets from the .ui file are included
+        mem_profile = MemoryProfile('PROFILE_MEMORY' in macros)
+
+        # The PVs of a database seen before start connecting while the
+        # .ui file and the database load
+        with profile.phase("PV prefetch"):
+            db_file = MPSModel.find_file(macros.get('DB_FILE'))
+            db_hash = file_hash(db_file)
+            manifest = read_cache(db_hash)
+            if manifest is not None:
+                prefetch(manifest, faults_only=cud_mode)
+
+        Statuses.set_palette(high_contrast=cud_mode)
         if cud_mode:
             ui_filename = 'mps_cud_main.ui'
         else:
             ui_filename = __file__.replace(".py", ".ui")
 
-        super(MpsGuiDisplay, self).__init__(parent=parent, args=args,
-                                            macros=macros, ui_filename=ui_filename)
+        with profile.phase("Display (load .ui)"):
+            super(MpsGuiDisplay, self).__init__(parent=parent, args=args,
+                                                macros=macros, ui_filename=ui_filename)
         self.logger = getLogger(__name__)
 
-        if 'DB_FILE' in macros:
-            self.model = MPSModel(macros['DB_FILE'])
-        else:
-            self.model = MPSModel()
+        with profile.phase("MPSModel"):
+            self.model = MPSModel(db_file)
+            if manifest is None:
+                write_cache(db_hash, PVManifest.from_model(self.model))
 
-        self.logic_init(cud_mode=cud_mode)
-        self.summary_init(cud_mode=cud_mode)
+        with profile.phase("logic_init"):
+            self.logic_init(cud_mode=cud_mode)
+        with profile.phase("summary_init"):
+            self.summary_init(cud_mode=cud_mode)
         if not cud_mode:
-            self.ui.ftr_ver_lbl.setText(self.git_version())
-            self.configure_init()
-            self.selection_init()
-            self.ignore_init()
-            self.app_status_init()
+            with profile.phase("git_version"):
+                self.ui.ftr_ver_lbl.setText(self.git_version())
+            with profile.phase("configure_init"):
+                self.configure_init()
+            with profile.phase("selection_init"):
+                self.selection_init()
+            with profile.phase("ignore_init"):
+                self.ignore_init()
+            with profile.phase("app_status_init"):
+                self.app_status_init()
+            with profile.phase("history_init"):
+                self.history_init()
+            with profile.phase("filter_expr_init"):
+                self.filter_expr_init()
+            with profile.phase("db_reload_init"):
+                self.db_reload_init('DB_FILE' in macros)
 
-        self.logic_connections(cud_mode=cud_mode)
-        if not cud_mode:
-            self.configure_connections()
-            self.selection_connections()
-            self.summ_connections()
-            self.ignore_connections()
-            self.app_status_connections()
+        with profile.phase("connections"):
+            self.logic_connections(cud_mode=cud_mode)
+            if not cud_mode:
+                self.configure_connections()
+                self.selection_connections()
+                self.summ_connections()
+                self.ignore_connections()
+                self.app_status_connections()
+                self.history_connections()
+                self.filter_expr_connections()
+                self.db_reload_connections()
+
+        self.profile = profile
+        if profile.enabled:
+            print(profile.report(), flush=True)
+            self.initial_load.finished.connect(self.print_initial_load)
+
+        self.mem_profile = mem_profile
+        if self.mem_profile.enabled:
+            self.print_memory_report()
+            interval = float(macros['PROFILE_MEMORY'] or 0)
+            if interval > 0:
+                self.mem_timer = QTimer(self)
+                self.mem_timer.timeout.connect(self.print_memory_report)
+                self.mem_timer.start(int(interval * 1000))
+
+    @Slot(float, float)
+    def print_initial_load(self, seconds: float, reported: float):
+        """Print when the Summary became stable: once the first values
+        of the PVs were published to the tables."""
+        print(f"Initial load: {seconds:.3f} s, {reported:.0%} of faults reported\n"
+              f"  {self.profile.elapsed():8.3f} s  First stable Summary (since profile start)\n"
+              f"{self.monitor_filter.report()}", flush=True)
+
+    @Slot()
+    def print_memory_report(self):
+        """Print the memory profile, with the growth since the first
+        report, and the monitor values suppressed so far."""
+        print(self.mem_profile.report(self.tbl_model), flush=True)
+        print(self.monitor_filter.report(), flush=True)
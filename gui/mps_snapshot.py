@@ -0,0 +1,181 @@
+"""Print the current state of every MPS fault without opening the display.
+
+Usage:
+    python gui/mps_snapshot.py [--dbfile DB_FILE] [--format {json,csv}]
+                               [--timeout SECONDS] [--faulted]
+
+Connects to the same PVs as the Logic tab, decodes them with the same
+FaultDecoder as the LogicTableModel, and writes one row per fault to
+stdout as soon as all of its PVs have reported. Faults whose PVs haven't
+reported when the timeout expires are written with "?" for the missing
+values.
+"""
+import sys
+from csv import writer
+from json import dumps
+from time import monotonic
+from queue import (Queue, Empty)
+from functools import partial
+from argparse import ArgumentParser
+from epics import PV
+from epics.dbr import DBE_VALUE
+from base_enums import (FaultPV, ColKind, Statuses)
+from pv_cache import (PVManifest, file_hash, read_cache, write_cache, prefetch)
+from models_pkg.mps_model import MPSModel
+from models_pkg.fault_decoder import FaultDecoder
+
+
+class FaultSnapshot:
+    """Reads the fault PVs once and yields a decoded record per fault."""
+    flag_kinds = {FaultPV.BYP: ColKind.BYP,
+                  FaultPV.IGN: ColKind.IGN,
+                  FaultPV.ACT: ColKind.ACT}
+
+    def __init__(self, model: MPSModel, timeout: float = 1.0):
+        self.model = model
+        self.timeout = timeout
+
+        # Destinations are keyed by name rather than by table column
+        self.decoder = FaultDecoder(self.model.db,
+                                    {d: d for d in self.model.dest_lst})
+
+    def record(self, row: int, values: dict) -> dict:
+        """Return the decoded record for a fault's PV values."""
+        fault = self.model.faults[row]
+        rec = {"fault": fault.description, "pv": fault.name}
+
+        if FaultPV.STATE in values:
+            state, status, classes = self.decoder.state_text(values[FaultPV.STATE])
+            rec["state"], rec["status"] = state, status.name
+        else:
+            classes = ()
+            rec["state"], rec["status"] = "?", "WHT"
+        rec["classes"] = {dest: '-' for dest in self.model.dest_lst}
+        rec["classes"].update((dest, cl_name) for dest, cl_name, _ in classes)
+
+        for fam, key in ((FaultPV.BYP, "bypassed"), (FaultPV.BYP_EXP, "bypass_exp"),
+                         (FaultPV.IGN, "ignored"), (FaultPV.ACT, "active")):
+            if fam not in values:
+                rec[key] = "?"
+            elif fam == FaultPV.BYP_EXP:
+                rec[key] = str(values[fam])
+            else:
+                rec[key] = self.decoder.flag_text(self.flag_kinds[fam], values[fam])
+        return rec
+
+    def read(self):
+        """Yield (row, record) for every fault, in the order they resolve.
+        The max permit decides which states count as faulted, so resolved
+        faults are held until MAX_PERMIT reports. If it doesn't report
+        before the timeout, the max permit is assumed to be Full."""
+        events = Queue()
+        values = [{} for _ in self.model.faults]
+        deadline = monotonic() + self.timeout
+
+        def put(value, row, fam, **kw):
+            events.put((row, fam, value))
+
+        pvs = [PV("SIOC:SYS0:MP00:MAX_PERMIT.RVAL",
+                  callback=partial(put, row=None, fam=None),
+                  auto_monitor=DBE_VALUE)]
+        for row, fault in enumerate(self.model.faults):
+            for fam in FaultPV:
+                pvs.append(PV(fam.pv(fault.name),
+                              callback=partial(put, row=row, fam=fam),
+                              auto_monitor=DBE_VALUE))
+
+        max_permit = None
+        held = []
+        pending = set(range(len(values)))
+        while pending or held:
+            try:
+                row, fam, value = events.get(timeout=max(deadline - monotonic(), 0))
+            except Empty:
+                break
+            if value is None:
+                continue
+            if fam is None:
+                if max_permit is None:
+                    max_permit = value
+                    self.decoder.speed_limit = max_permit - 1
+                    for held_row in held:
+                        yield (held_row, self.record(held_row, values[held_row]))
+                    held = []
+                continue
+            if row not in pending or fam in values[row]:
+                continue
+            values[row][fam] = value
+            if len(values[row]) == len(FaultPV):
+                pending.discard(row)
+                if max_permit is None:
+                    held.append(row)
+                else:
+                    yield (row, self.record(row, values[row]))
+
+        for pv in pvs:
+            pv.clear_callbacks()
+        for row in held + sorted(pending):
+            yield (row, self.record(row, values[row]))
+
+
+def faulted(rec: dict) -> bool:
+    """Return whether the record is faulted (as in the Summary, which
+    includes TIMEOUT and DB_ERROR), bypassed or ignored."""
+    return (Statuses[rec["status"]].faulted()
+            or rec["bypassed"] == "Y" or rec["ignored"] == "Ignored")
+
+
+def write_json(records, out):
+    """Stream the records to out as a JSON array."""
+    out.write("[")
+    for i, rec in enumerate(records):
+        out.write(("," if i else "") + "\n" + dumps(rec))
+        out.flush()
+    out.write("\n]\n")
+
+
+def write_csv(records, out, dests: list):
+    """Stream the records to out as CSV, one column per destination."""
+    csv = writer(out)
+    csv.writerow(["fault", "pv", "state", "status"] + dests
+                 + ["bypassed", "bypass_exp", "ignored", "active"])
+    for rec in records:
+        csv.writerow([rec["fault"], rec["pv"], rec["state"], rec["status"]]
+                     + [rec["classes"][d] for d in dests]
+                     + [rec["bypassed"], rec["bypass_exp"], rec["ignored"], rec["active"]])
+        out.flush()
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("-d", "--dbfile", default=None)
+    parser.add_argument("-f", "--format", choices=("json", "csv"), default="json")
+    parser.add_argument("-t", "--timeout", type=float, default=1.0,
+                        help="seconds to wait for the PVs (default: 1)")
+    parser.add_argument("--faulted", action="store_true",
+                        help="only show faulted, bypassed or ignored faults")
+    args = parser.parse_args()
+
+    # Connect to the cached fault PVs while the database loads
+    filename = MPSModel.find_file(args.dbfile)
+    db_hash = file_hash(filename)
+    manifest = read_cache(db_hash)
+    if manifest is not None:
+        prefetch(manifest, faults_only=True)
+    model = MPSModel(filename)
+    if manifest is None:
+        write_cache(db_hash, PVManifest.from_model(model))
+    snapshot = FaultSnapshot(model, args.timeout)
+
+    records = (rec for _, rec in snapshot.read())
+    if args.faulted:
+        records = filter(faulted, records)
+
+    if args.format == "csv":
+        write_csv(records, sys.stdout, model.dest_lst)
+    else:
+        write_json(records, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Cache of the PVs the display subscribes to, per database file.
+
+Usage:
+    python gui/pv_cache.py [--dbfile DB_FILE] [--list]
+
+The PV names come from the database (fault PVs, application card status
+PVs, and condition PVs), so they are only known once MPSModel has loaded
+it. They are saved per hash of the database file's contents, so the next
+launch with the same file can start connecting to them while MPSModel is
+still loading. Run as part of deploying a database to build its entry,
+or with --list to print every PV with its table, row, and role.
+"""
+import re
+import sys
+from os import (path, listdir, makedirs, replace, remove)
+from json import (dumps, loads)
+from hashlib import sha1
+from typing import (List, NamedTuple)
+from logging import getLogger
+from argparse import ArgumentParser
+from epics import ca
+from base_enums import FaultPV
+
+logger = getLogger(__name__)
+
+GUI_DIR = path.dirname(path.abspath(__file__))
+CACHE_DIR = path.join(GUI_DIR, ".pv_cache")
+
+# Bumped when the cached format changes, so older entries are ignored
+FORMAT = 1
+
+# Number of database files kept in the cache
+KEEP = 5
+
+
+def app_pv(app) -> str:
+    """Return the status PV of an application card."""
+    return f"{app.link_node.get_cn_prefix()}:APP{app.number}_STATUS"
+
+
+class PVManifest(NamedTuple):
+    """The PVs of a database, in the display's row order. Every fault
+    has a PV per FaultPV family, so only the fault names are stored."""
+    faults: List[str]
+    apps: List[str]
+    conditions: List[str]
+
+    @classmethod
+    def from_model(cls, model):
+        """Build the manifest of a loaded MPSModel."""
+        return cls([fault.name for fault in model.faults],
+                   [app_pv(app) for app in model.db.cards],
+                   [con.pv for con in model.db.conditions])
+
+    def pvs(self, faults_only: bool = False) -> list:
+        """Return (PV, table, row, role) for every PV, or only for the
+        fault PVs (all the CUD and mps_snapshot.py subscribe to)."""
+        pvs = [(fam.pv(name), "fault", row, fam.name)
+               for row, name in enumerate(self.faults) for fam in FaultPV]
+        if not faults_only:
+            pvs += [(pv, "app", row, "STATUS") for row, pv in enumerate(self.apps)]
+            pvs += [(pv, "condition", bit, "CONDITION")
+                    for bit, pv in enumerate(self.conditions)]
+        return pvs
+
+
+def file_hash(filename: str) -> str:
+    """Return the SHA-1 of the file's contents."""
+    digest = sha1()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path(digest: str) -> str:
+    """Return the path of the manifest for a database hash."""
+    return path.join(CACHE_DIR, f"pvs_{digest}.json")
+
+
+def read_cache(digest: str):
+    """Return the cached PVManifest for a database hash, or None."""
+    try:
+        with open(cache_path(digest)) as f:
+            data = loads(f.read())
+    except (OSError, ValueError):
+        return None
+    if data.get("format") != FORMAT:
+        return None
+    return PVManifest(data["faults"], data["apps"], data["conditions"])
+
+
+def write_cache(digest: str, manifest: PVManifest):
+    """Save the manifest, keeping the KEEP most recently written ones.
+    Failing to write (e.g. a read-only install) only costs speed."""
+    try:
+        makedirs(CACHE_DIR, exist_ok=True)
+        target = cache_path(digest)
+        with open(target + ".tmp", 'w') as f:
+            f.write(dumps(dict(manifest._asdict(), format=FORMAT),
+                          separators=(',', ':')))
+        replace(target + ".tmp", target)
+
+        entry = re.compile(r"pvs_[0-9a-f]{40}\.json$")
+        old = sorted((path.join(CACHE_DIR, name) for name in listdir(CACHE_DIR)
+                      if entry.match(name)), key=path.getmtime, reverse=True)
+        for stale in old[KEEP:]:
+            remove(stale)
+    except OSError as e:
+        logger.warning(f"Couldn't cache the PVs of the database: {e}")
+
+
+def prefetch(manifest: PVManifest, faults_only: bool = False) -> int:
+    """Create a CA channel for every PV in the manifest without waiting
+    for it to connect. The PVs created later for the same names reuse
+    the channels, so their searches overlap with loading the database.
+    A stale manifest only costs unused channels. Returns the number of
+    channels created."""
+    pvs = manifest.pvs(faults_only)
+    for pv, *_ in pvs:
+        ca.create_channel(pv, connect=False, auto_cb=True)
+    return len(pvs)
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("-d", "--dbfile", default=None)
+    parser.add_argument("-l", "--list", action="store_true",
+                        help="print every PV with its table, row, and role")
+    args = parser.parse_args()
+
+    from models_pkg.mps_model import MPSModel
+    filename = MPSModel.find_file(args.dbfile)
+    digest = file_hash(filename)
+    manifest = read_cache(digest)
+    if manifest is None:
+        manifest = PVManifest.from_model(MPSModel(filename))
+        write_cache(digest, manifest)
+        print(f"Cached the PVs of {filename}", file=sys.stderr)
+
+    if args.list:
+        for pv, table, row, role in manifest.pvs():
+            print(pv, table, row, role)
+
+
+if __name__ == "__main__":
+    main()
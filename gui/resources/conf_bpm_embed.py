@@ -7,6 +7,7 @@ from qtpy.QtWidgets import (QWidget, QTableWidgetItem, QHBoxLayout, QVBoxLayout,
 from pydm import Display
 from pydm.widgets import (PyDMLabel, PyDMByteIndicator)
 from resources.widgets import (PyDMMultiLineEdit, PyDMMultiCheckbox)
+from ui_cache import load_cached_ui
 
 
 class ConfBPM(Display):
@@ -48,6 +49,14 @@ class ConfBPM(Display):
         hdr.setSectionResizeMode(QHeaderView.ResizeToContents)
         self.ui.multi_dev_tbl.setHorizontalHeaderLabels(["Set Value To"] + self.devs)
 
+    def load_ui(self, macros=None):
+        """Load the widgets from the cached compiled .ui file, falling
+        back to PyDM's loader if it can't be compiled."""
+        if self.ui:
+            return self.ui
+        if not load_cached_ui(self, self.ui_filepath(), macros):
+            super(ConfBPM, self).load_ui(macros=macros)
+
     def populate_cell(self, row, col):
         """Populate the given cell. Rows 0-3 are static text, while
         other rows are dynamic Read/Write widgets."""
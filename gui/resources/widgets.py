@@ -1,6 +1,6 @@
 from epics import caget_many
-from qtpy.QtCore import (Slot, Property)
-from pydm.widgets import (PyDMChannel, PyDMCheckbox, PyDMLineEdit)
+from qtpy.QtCore import (Slot, Signal, Property)
+from pydm.widgets import (PyDMChannel, PyDMCheckbox, PyDMLineEdit, PyDMByteIndicator)
 
 
 class PyDMMultiCheckbox(PyDMCheckbox):
@@ -127,3 +127,13 @@ class PyDMMultiLineEdit(PyDMLineEdit):
                 channel.write_access_slot = self.writeAccessChanged
             channel.connect()
             self._channels.append(channel)
+
+
+class PyDMMonitorByteIndicator(PyDMByteIndicator):
+    """PyDMByteIndicator that also emits every value it receives, so
+    the value can be used elsewhere without subscribing to the PV again."""
+    value_received = Signal(object)
+
+    def value_changed(self, new_val):
+        super(PyDMMonitorByteIndicator, self).value_changed(new_val)
+        self.value_received.emit(new_val)
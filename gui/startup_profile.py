@@ -0,0 +1,65 @@
+from time import perf_counter
+from contextlib import contextmanager
+
+
+class StartupProfile:
+    """Records how long each startup phase of the display takes. When
+    log_file is given, it is the PYTHONPROFILEIMPORTTIME output of the
+    process and the slowest imports are included in the report. A
+    profile without a log file does nothing."""
+    def __init__(self, enabled: bool = False, log_file: str = None):
+        self.enabled = enabled
+        self.log_file = log_file
+        self.phases = []
+        self.start = perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Context manager timing a single startup phase."""
+        if not self.enabled:
+            yield
+            return
+
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, perf_counter() - start))
+
+    def elapsed(self) -> float:
+        """Return the seconds since the profile started."""
+        return perf_counter() - self.start
+
+    def import_times(self, top: int = 15) -> list:
+        """Return the slowest top-level imports as (package, seconds),
+        parsed from the import time log."""
+        times = []
+        try:
+            with open(self.log_file) as f:
+                for line in f:
+                    if not line.startswith("import time:"):
+                        continue
+                    fields = line[len("import time:"):].split("|")
+                    if len(fields) != 3 or not fields[1].strip().isdigit():
+                        continue
+                    name = fields[2].rstrip()
+                    # Nested imports are indented under their parent
+                    if name.startswith("  "):
+                        continue
+                    times.append((name.strip(), int(fields[1]) / 1e6))
+        except (OSError, TypeError):
+            return []
+        return sorted(times, key=lambda t: t[1], reverse=True)[:top]
+
+    def report(self) -> str:
+        """Return the import and startup phase breakdown as text."""
+        lines = []
+        imports = self.import_times()
+        if imports:
+            lines.append("Slowest imports (cumulative):")
+            lines += [f"  {t:8.3f} s  {name}" for name, t in imports]
+
+        lines.append("Startup phases:")
+        lines += [f"  {t:8.3f} s  {name}" for name, t in self.phases]
+        lines.append(f"  {self.elapsed():8.3f} s  Total (since profile start)")
+        return "\n".join(lines)
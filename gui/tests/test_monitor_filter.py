@@ -0,0 +1,53 @@
+"""Unit tests of the MonitorFilter.
+
+Usage (from the gui/ directory):
+    python -m unittest discover tests
+"""
+import sys
+import unittest
+from os import path
+from time import sleep
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from qtpy.QtCore import QCoreApplication
+from enums import FaultPV
+from models_pkg.monitor_filter import (MonitorFilter, MonitorPolicy)
+
+INTERVAL = 0.05
+
+
+class TestMonitorFilter(unittest.TestCase):
+    def setUp(self):
+        self.app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+        self.sent = []
+        emitters = {fam: (lambda value, row, fam=fam: self.sent.append((fam, value, row)))
+                    for fam in FaultPV}
+        policies = {FaultPV.STATE: MonitorPolicy(min_interval=INTERVAL)}
+        self.filter = MonitorFilter(None, emitters, policies)
+        self.filter.timer.stop()
+
+    def test_last_value_wins(self):
+        """A value held back inside the interval isn't sent after a newer
+        value that arrived once the interval had passed."""
+        self.filter.push(FaultPV.STATE, 1, 0)
+        self.filter.push(FaultPV.STATE, 2, 0)
+        sleep(INTERVAL * 2)
+        self.filter.push(FaultPV.STATE, 3, 0)
+        sleep(INTERVAL * 2)
+        self.filter.flush()
+
+        self.assertEqual(self.sent[-1], (FaultPV.STATE, 3, 0))
+        self.assertEqual([v for _, v, _ in self.sent], [1, 3])
+        self.assertEqual(self.filter.throttled[FaultPV.STATE], 1)
+
+    def test_duplicates_dropped(self):
+        self.filter.push(FaultPV.BYP, 0, 4)
+        self.filter.push(FaultPV.BYP, 0, 4)
+        self.filter.push(FaultPV.BYP, 1, 4)
+
+        self.assertEqual([v for _, v, _ in self.sent], [0, 1])
+        self.assertEqual(self.filter.dropped[FaultPV.BYP], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
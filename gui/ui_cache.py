@@ -0,0 +1,119 @@
+import re
+from os import (path, listdir, makedirs, replace, remove)
+from io import StringIO
+from string import Template
+from hashlib import sha1
+from functools import partial
+from logging import getLogger
+from qtpy import uic
+from pydm.utilities import macro
+
+logger = getLogger(__name__)
+
+GUI_DIR = path.dirname(path.abspath(__file__))
+CACHE_DIR = path.join(GUI_DIR, ".ui_cache")
+UI_DIRS = (GUI_DIR, path.join(GUI_DIR, "resources"))
+
+# Compiled forms already loaded in this process, keyed by file hash
+_compiled = {}
+
+
+def file_hash(ui_path: str) -> str:
+    """Return the SHA-1 of the .ui file's contents."""
+    with open(ui_path, 'rb') as f:
+        return sha1(f.read()).hexdigest()
+
+
+def cache_path(ui_path: str, digest: str) -> str:
+    """Return the path of the compiled form for a .ui file's hash."""
+    name = path.splitext(path.basename(ui_path))[0]
+    return path.join(CACHE_DIR, f"{name}_{digest}.py")
+
+
+def compile_ui(ui_path: str) -> str:
+    """Compile the .ui file to Python with uic and return the code."""
+    code = StringIO()
+    uic.compileUi(ui_path, code)
+    return code.getvalue()
+
+
+def write_cache(ui_path: str, digest: str, code: str):
+    """Save the compiled form, replacing older versions of the same file.
+    Failing to write (e.g. a read-only install) only costs speed."""
+    try:
+        makedirs(CACHE_DIR, exist_ok=True)
+        target = cache_path(ui_path, digest)
+        with open(target + ".tmp", 'w') as f:
+            f.write(code)
+        replace(target + ".tmp", target)
+
+        name = path.splitext(path.basename(ui_path))[0]
+        stale = re.compile(rf"{re.escape(name)}_[0-9a-f]{{40}}\.py$")
+        for old in listdir(CACHE_DIR):
+            if stale.match(old) and old != path.basename(target):
+                remove(path.join(CACHE_DIR, old))
+    except OSError as e:
+        logger.warning(f"Couldn't cache compiled {ui_path}: {e}")
+
+
+def compiled_ui(ui_path: str):
+    """Return (code, class name) of the compiled form for the .ui file.
+    The form is read from the cache if the file hasn't changed since it
+    was compiled, otherwise it is compiled and cached."""
+    digest = file_hash(ui_path)
+    if digest in _compiled:
+        return _compiled[digest]
+
+    target = cache_path(ui_path, digest)
+    if path.exists(target):
+        with open(target) as f:
+            code = f.read()
+    else:
+        code = compile_ui(ui_path)
+        write_cache(ui_path, digest, code)
+
+    class_name = re.search(r"^class\s*(\S*)\(", code, re.MULTILINE).group(1)
+    _compiled[digest] = (code, class_name)
+    return _compiled[digest]
+
+
+def load_cached_ui(display, ui_path: str, macros: dict = None) -> bool:
+    """Build the display's widgets from the cached form of ui_path, the
+    same way PyDM does from a freshly compiled one. Returns False if the
+    form couldn't be compiled, so the caller can fall back to PyDM's own
+    .ui loading."""
+    if not ui_path or not hasattr(uic, "compileUi"):
+        return False
+    try:
+        code, class_name = compiled_ui(ui_path)
+    except Exception as e:
+        logger.warning(f"Loading {ui_path} without the cache: {e}")
+        return False
+
+    if macros:
+        code = macro.replace_macros_in_template(Template(code), macros).getvalue()
+    ui_globals = {}
+    exec(code, ui_globals)
+    klass = ui_globals[class_name]
+
+    # Widgets resolve their relative file paths against the loaded file
+    display._loaded_file = ui_path
+    display.retranslateUi = partial(klass.retranslateUi, display)
+    klass.setupUi(display, display)
+    display.ui = display
+    return True
+
+
+def build():
+    """Compile every .ui file in the gui directory into the cache. Run as
+    part of installing a release so the first launch skips uic."""
+    for ui_dir in UI_DIRS:
+        for name in sorted(listdir(ui_dir)):
+            if name.endswith(".ui"):
+                ui_path = path.join(ui_dir, name)
+                compiled_ui(ui_path)
+                print(f"Compiled {path.relpath(ui_path, GUI_DIR)}")
+
+
+if __name__ == "__main__":
+    build()
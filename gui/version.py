@@ -0,0 +1,39 @@
+from os import path
+from functools import lru_cache
+from subprocess import (run, SubprocessError)
+
+GUI_DIR = path.dirname(path.abspath(__file__))
+VERSION_FILE = path.join(GUI_DIR, "VERSION")
+
+
+def git_describe() -> str:
+    """Return the output of `git describe --tags` for the gui/ directory,
+    or an empty string if git is unavailable."""
+    try:
+        git_cmd = run(["git", "describe", "--tags"],
+                      cwd=GUI_DIR,
+                      text=True,
+                      capture_output=True,
+                      timeout=2)
+    except (OSError, SubprocessError):
+        return ""
+    return git_cmd.stdout.strip()
+
+
+@lru_cache(maxsize=None)
+def get_version() -> str:
+    """Return the application's version. Uses the VERSION file written
+    at release time if there is one, so startup doesn't have to spawn
+    git. The result is cached for the rest of the session."""
+    if path.exists(VERSION_FILE):
+        with open(VERSION_FILE) as f:
+            return f.read().strip()
+    return git_describe()
+
+
+if __name__ == "__main__":
+    # Write the VERSION file, e.g. when installing a release
+    version = git_describe()
+    with open(VERSION_FILE, 'w') as f:
+        f.write(version + "\n")
+    print(version)
@@ -5,13 +5,18 @@ cd "$(dirname "${BASH_SOURCE[0]}")"
 usage(){
     echo "LCLS-SC MPS GUI launcher"
     echo "Usage:" 1>&2
-    echo "  sc_mps_gui.bash [ -c | --cud ] [ -d | --dbfile DB_FILE ]" 1>&2
+    echo "  sc_mps_gui.bash [ -c | --cud ] [ -d | --dbfile DB_FILE ] [ -p | --profile-startup ]" 1>&2
+    echo "                  [ -m | --profile-memory SECONDS ]" 1>&2
     echo "" 1>&2
     echo "Examples:" 1>&2
     echo "  sc_mps_gui.bash" 1>&2
     echo "  sc_mps_gui.bash  --dbfile ~/database/my_file.db" 1>&2
     echo "For the MPS CUD use:" 1>&2
     echo "  sc_mps_gui.bash  --cud" 1>&2
+    echo "To print import and init times on startup use:" 1>&2
+    echo "  sc_mps_gui.bash  --profile-startup" 1>&2
+    echo "To print a memory report after startup and then every 10 minutes use:" 1>&2
+    echo "  sc_mps_gui.bash  --profile-memory 600" 1>&2
 }
 exit_abnormal(){
     usage
@@ -20,6 +25,8 @@ exit_abnormal(){
 
 CUD_MODE="False"
 DB_FILE=""
+PROFILE_STARTUP="False"
+PROFILE_MEMORY=""
 
 while [ $# -gt 0 ]
 do
@@ -27,6 +34,9 @@ do
         -d | --dbfile) DB_FILE="$2" 
                        shift ;;
         -c | --cud) CUD_MODE="True" ;;
+        -p | --profile-startup) PROFILE_STARTUP="True" ;;
+        -m | --profile-memory) PROFILE_MEMORY="$2"
+                               shift ;;
         -h | --help) exit_abnormal ;;
         *) exit_abnormal
     esac
@@ -40,6 +50,23 @@ then
     MACROS+=", DB_FILE=$DB_FILE"
 fi
 
+if [[ -n $PROFILE_MEMORY ]]
+then
+    MACROS+=", PROFILE_MEMORY=$PROFILE_MEMORY"
+fi
+
+if [[ $PROFILE_STARTUP == "True" ]]
+then
+    # Python writes the import times to stderr, the display reads them back
+    IMPORT_LOG=$(mktemp /tmp/sc_mps_gui_imports.XXXXXX)
+    MACROS+=", PROFILE_STARTUP=$IMPORT_LOG"
+    PYTHONPROFILEIMPORTTIME=1 pydm --hide-nav-bar --hide-status-bar --hide-menu-bar \
+        -m "$MACROS" \
+        gui/mps_gui_main.py 2> "$IMPORT_LOG"
+    echo "Import times and other stderr output kept in $IMPORT_LOG"
+    exit 0
+fi
+
 pydm --hide-nav-bar --hide-status-bar --hide-menu-bar \
     -m "$MACROS" \
     gui/mps_gui_main.py
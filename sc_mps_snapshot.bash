@@ -0,0 +1,35 @@
+#!/bin/bash
+
+cd "$(dirname "${BASH_SOURCE[0]}")"
+
+usage(){
+    echo "LCLS-SC MPS fault snapshot"
+    echo "Usage:" 1>&2
+    echo "  sc_mps_snapshot.bash [ -d | --dbfile DB_FILE ] [ -f | --format json|csv ]" 1>&2
+    echo "                       [ -t | --timeout SECONDS ] [ --faulted ]" 1>&2
+    echo "" 1>&2
+    echo "Examples:" 1>&2
+    echo "  sc_mps_snapshot.bash" 1>&2
+    echo "  sc_mps_snapshot.bash  --format csv --faulted" 1>&2
+    echo "  sc_mps_snapshot.bash  --dbfile ~/database/my_file.db" 1>&2
+}
+exit_abnormal(){
+    usage
+    exit 1
+}
+
+ARGS=()
+
+while [ $# -gt 0 ]
+do
+    case $1 in
+        -d | --dbfile | -f | --format | -t | --timeout) ARGS+=("$1" "$2")
+                                                        shift ;;
+        --faulted) ARGS+=("$1") ;;
+        -h | --help) exit_abnormal ;;
+        *) exit_abnormal
+    esac
+    shift
+done
+
+python gui/mps_snapshot.py "${ARGS[@]}"